@@ -21,7 +21,10 @@ from models import ScrapedContent, ScrapingBatch, SourceAttribution, ContentType
 from validator import ContentValidator, SafetyChecker, ValidationResult
 from fetcher import EnhancedFetcher, FetchResult
 from extractor import EnhancedContentExtractor, ExtractionResult
+from boilerplate import BoilerplateLearner
+from keyword_matcher import RELEVANCE_MATCHER
 from s3_uploader import S3ContentUploader
+from staging import LocalStagingStore, StagingSyncer
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +40,13 @@ class ScraperConfig:
     custom_selectors: Dict[str, str] = field(default_factory=dict)
     archive_bypass_enabled: bool = True
     validation_required: bool = True
+    learn_boilerplate: bool = False  # Strip per-site template blocks learned across pages (opt in per scraper)
+    stream_parse: bool = False  # Parse pages incrementally while they download (needs a supported beautifulsoup4)
+    stop_at_article_end: bool = False  # Stop reading once a complete <article> is parsed; JSON-LD/meta after it are lost and content is truncated
+    stage_uploads: bool = False  # Stage batches locally and upload them in the background (see finish_uploads)
+    staging_dir: Optional[str] = None  # Default: $UT_STAGING_DIR or cache/staging (the temp dir where read-only)
+    run_id: Optional[str] = None  # Upload run the journal and rollback use (default: a new id per scraper)
+    journal_dir: Optional[str] = None  # Default: cache/upload_journals (the temp dir where read-only)
 
 
 @dataclass
@@ -57,9 +67,13 @@ class BaseArticleScraper(ABC):
     def __init__(self, config: ScraperConfig):
         self.config = config
         self.validator = ContentValidator()
-        self.safety_checker = SafetyChecker()
-        self.extractor = EnhancedContentExtractor()
-        self.s3_uploader = S3ContentUploader()
+        self.safety_checker = SafetyChecker(self.validator)
+        self.boilerplate_learner = BoilerplateLearner() if config.learn_boilerplate else None
+        self.extractor = EnhancedContentExtractor(boilerplate_learner=self.boilerplate_learner)
+        self.s3_uploader = S3ContentUploader(run_id=config.run_id, journal_dir=config.journal_dir)
+        self.staging_syncer = (
+            StagingSyncer(LocalStagingStore(config.staging_dir), self.s3_uploader) if config.stage_uploads else None
+        )
 
         # Statistics
         self.stats = {
@@ -68,6 +82,7 @@ class BaseArticleScraper(ABC):
             "extracted": 0,
             "validated": 0,
             "uploaded": 0,
+            "staged": 0,
             "errors": []
         }
 
@@ -96,7 +111,11 @@ class BaseArticleScraper(ABC):
             logger.info("📥 Phase 2: Fetching and extracting content")
             scraped_items = []
 
-            async with EnhancedFetcher(rate_limit=self.config.rate_limit) as fetcher:
+            async with EnhancedFetcher(
+                rate_limit=self.config.rate_limit,
+                stream_parse=self.config.stream_parse,
+                stop_at_article_end=self.config.stop_at_article_end
+            ) as fetcher:
                 # Process URLs with concurrency control
                 semaphore = asyncio.Semaphore(5)  # Limit concurrent requests
 
@@ -118,6 +137,10 @@ class BaseArticleScraper(ABC):
             self.stats["extracted"] = len(scraped_items)
             logger.info(f"✅ Extracted {len(scraped_items)} articles")
 
+            # Persist site templates learned from this run's pages
+            if self.boilerplate_learner:
+                self.boilerplate_learner.save()
+
             # Phase 3: Validation and safety checks
             logger.info("🔍 Phase 3: Validation and safety checks")
             validated_items = []
@@ -164,7 +187,13 @@ class BaseArticleScraper(ABC):
                 self.stats["errors"].extend(safety_errors)
                 return self._create_empty_batch(f"Safety check failed: {safety_errors}")
 
-            # Phase 5: Upload to S3 with proper organization
+            # Phase 5: Upload to S3 with proper organization (or hand over to the background syncer)
+            if self.staging_syncer:
+                await self.staging_syncer.stage(batch)
+                self.stats["staged"] += len(validated_items)
+                logger.info(f"🎉 Scraping completed - {len(validated_items)} articles processed and staged for upload")
+                return batch
+
             logger.info("📤 Phase 5: Uploading to S3")
             try:
                 upload_results = await self.s3_uploader.upload_batch(batch)
@@ -177,6 +206,11 @@ class BaseArticleScraper(ABC):
                     if upload_results["errors"]:
                         logger.warning(f"⚠️ Upload warnings: {upload_results['errors']}")
                         self.stats["errors"].extend(upload_results["errors"])
+                elif upload_results["failed_uploads"] == 0 and (
+                        upload_results.get("skipped_duplicates") or upload_results.get("skipped_known_content")):
+                    known = len(upload_results.get("skipped_known_content", []))
+                    near = len(upload_results.get("skipped_duplicates", []))
+                    logger.info(f"⏭️ Nothing new to upload: {known} articles already in the lake, {near} near duplicates of uploaded content")
                 else:
                     logger.error("❌ No articles were uploaded to S3")
                     self.stats["errors"].append("S3 upload failed for all items")
@@ -208,7 +242,8 @@ class BaseArticleScraper(ABC):
             extraction_result = self.extractor.extract_content(
                 html=fetch_result.content,
                 url=url,
-                source_name=self.config.source_name
+                source_name=self.config.source_name,
+                soup=fetch_result.soup
             )
 
             if not extraction_result.success or not extraction_result.content:
@@ -236,18 +271,10 @@ class BaseArticleScraper(ABC):
     def _is_music_relevant(self, content: ScrapedContent) -> bool:
         """Check if content is relevant to music/culture"""
         # Quick relevance check before full validation
-        text = (content.title + " " + content.content).lower()
-
-        music_keywords = [
-            'music', 'album', 'song', 'artist', 'band', 'musician', 'singer',
-            'concert', 'tour', 'festival', 'record', 'recording', 'studio',
-            'genre', 'jazz', 'rock', 'pop', 'hip-hop', 'classical', 'folk',
-            'guitar', 'piano', 'drums', 'vocals', 'lyrics', 'melody'
-        ]
+        hits = RELEVANCE_MATCHER.scan(content.title + " " + content.content)
 
         # Content is relevant if it contains at least 2 music keywords
-        music_mentions = sum(1 for keyword in music_keywords if keyword in text)
-        return music_mentions >= 2
+        return hits.count('music') >= 2
 
     @abstractmethod
     async def discover_content_urls(self) -> DiscoveryResult:
@@ -274,6 +301,19 @@ class BaseArticleScraper(ABC):
 
         return content
 
+    async def finish_uploads(self) -> Dict[str, Any]:
+        """Wait for staged batches to finish uploading (no-op without stage_uploads)"""
+        if not self.staging_syncer:
+            return {}
+
+        sync_stats = await self.staging_syncer.drain()
+        self.stats["uploaded"] = sync_stats["uploaded_items"]
+        if sync_stats["errors"]:
+            self.stats["errors"].extend(sync_stats["errors"])
+        logger.info(f"📤 Staged uploads finished: {sync_stats['committed']} batches, "
+                    f"{sync_stats['uploaded_items']} articles uploaded")
+        return sync_stats
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get scraping statistics"""
         return {
@@ -282,7 +322,8 @@ class BaseArticleScraper(ABC):
             "extraction_rate": self.stats["extracted"] / max(1, self.stats["fetched"]),
             "validation_rate": self.stats["validated"] / max(1, self.stats["extracted"]),
             "upload_rate": self.stats["uploaded"] / max(1, self.stats["validated"]),
-            "end_to_end_success": self.stats["uploaded"] / max(1, self.stats["discovered"])
+            "end_to_end_success": self.stats["uploaded"] / max(1, self.stats["discovered"]),
+            "validation_stages": self.validator.stats.to_dict()
         }
 
     def _create_empty_batch(self, reason: str) -> ScrapingBatch:
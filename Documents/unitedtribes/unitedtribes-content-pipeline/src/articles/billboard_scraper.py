@@ -39,7 +39,8 @@ class BillboardScraper(BaseArticleScraper):
                 "https://www.billboard.com/music/music-news/",
                 "https://www.billboard.com/pro/",
                 "https://www.billboard.com/culture/"
-            ]
+            ],
+            learn_boilerplate=True
         )
         super().__init__(config)
         self.artist_tracker = artist_tracker
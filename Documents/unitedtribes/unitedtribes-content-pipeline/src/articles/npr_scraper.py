@@ -39,7 +39,8 @@ class NPRScraper(BaseArticleScraper):
                 "https://www.npr.org/sections/music-interviews/",
                 "https://www.npr.org/sections/music-reviews/",
                 "https://www.npr.org/sections/jazz/"
-            ]
+            ],
+            learn_boilerplate=True
         )
         super().__init__(config)
         self.artist_tracker = artist_tracker
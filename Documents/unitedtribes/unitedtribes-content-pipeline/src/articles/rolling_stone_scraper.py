@@ -39,7 +39,8 @@ class RollingStoneScraper(BaseArticleScraper):
                 "https://www.rollingstone.com/music/music-news/",
                 "https://www.rollingstone.com/music/music-album-reviews/",
                 "https://www.rollingstone.com/music/music-features/"
-            ]
+            ],
+            learn_boilerplate=True
         )
         super().__init__(config)
         self.artist_tracker = artist_tracker
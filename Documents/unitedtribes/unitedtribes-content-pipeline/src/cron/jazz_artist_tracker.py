@@ -3,12 +3,17 @@ Jazz Artist Progress Tracker
 Tracks content discovery progress for all 25 jazz artists
 """
 
-import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from pathlib import Path
+import sys
+
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from serialization import write_json
 
 logger = logging.getLogger(__name__)
 
@@ -263,8 +268,7 @@ class JazzArtistTracker:
             }
         }
 
-        with open(filepath, 'w') as f:
-            json.dump(report, f, indent=2, default=str)
+        write_json(filepath, report, pretty=True)
 
         logger.info(f"📊 Progress report saved: {filepath}")
         return filepath
\ No newline at end of file
@@ -5,7 +5,6 @@ Uses existing S3 content to simulate real scraper results without relying on Enh
 
 import asyncio
 import logging
-import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
@@ -14,7 +13,9 @@ from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
 
+from aws_clients import get_client
 from models import ScrapedContent, SourceAttribution, ContentType
+from serialization import decode_json
 
 logger = logging.getLogger(__name__)
 
@@ -44,16 +45,14 @@ class PattiSmithCache:
         logger.info("🎸 Loading cached Patti Smith content for prototyping...")
 
         scraped_items = []
+        s3_client = get_client('s3')
 
         for s3_key in self.patti_smith_s3_keys:
             try:
                 # Download content from S3
-                import boto3
-                s3_client = boto3.client('s3')
-
                 logger.info(f"📥 Loading {s3_key}")
                 response = s3_client.get_object(Bucket=self.s3_bucket, Key=s3_key)
-                content_data = json.loads(response['Body'].read().decode('utf-8'))
+                content_data = decode_json(response['Body'].read())
 
                 # Convert to ScrapedContent format
                 scraped_item = self._convert_video_analysis_to_scraped_content(content_data, s3_key)
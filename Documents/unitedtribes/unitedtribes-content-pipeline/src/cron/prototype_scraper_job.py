@@ -4,7 +4,6 @@ Modified version of scraper_job.py that uses cached content for rapid prototypin
 """
 
 import asyncio
-import json
 import logging
 import os
 from datetime import datetime
@@ -20,6 +19,7 @@ from models import Source, ScrapedContent, ScrapingBatch
 from s3_uploader import S3ContentUploader
 from jazz_artist_tracker import JazzArtistTracker
 from patti_smith_cache import PattiSmithCache
+from serialization import write_json
 
 logger = logging.getLogger(__name__)
 
@@ -186,8 +186,7 @@ class PrototypeScraperJob:
 
             report_file = reports_dir / f"prototype_report_{self.job_id}.json"
 
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            write_json(report_file, report, pretty=True)
 
             logger.info(f"📊 Report saved: {report_file}")
 
@@ -20,6 +20,9 @@ sys.path.append(str(Path(__file__).parent.parent / "articles"))
 from models import ScrapedContent, SourceAttribution, ContentType
 from fetcher import EnhancedFetcher
 from extractor import EnhancedContentExtractor
+from boilerplate import BoilerplateLearner
+from keyword_matcher import RELEVANCE_MATCHER
+from near_duplicates import NearDuplicateIndex
 
 # Import the new scrapers
 try:
@@ -82,7 +85,8 @@ class RealNPRScraper:
     def __init__(self, artist_tracker):
         self.artist_tracker = artist_tracker
         self.fetcher = None
-        self.extractor = EnhancedContentExtractor()
+        self.boilerplate_learner = BoilerplateLearner()
+        self.extractor = EnhancedContentExtractor(boilerplate_learner=self.boilerplate_learner)
 
         # Same jazz artists list
         self.jazz_artists = [
@@ -117,6 +121,9 @@ class RealNPRScraper:
             music_content = await self._discover_from_music_section()
             scraped_items.extend(music_content)
 
+        # Persist NPR site templates learned from this run
+        self.boilerplate_learner.save()
+
         # Filter and deduplicate
         unique_items = self._deduplicate_content(scraped_items)
         jazz_items = self._filter_jazz_content(unique_items)
@@ -226,7 +233,8 @@ class RealNPRScraper:
             extraction_result = self.extractor.extract_content(
                 html=result.content,
                 url=url,
-                source_name="NPR"
+                source_name="NPR",
+                soup=result.soup
             )
 
             if extraction_result.success and extraction_result.content:
@@ -277,27 +285,29 @@ class RealNPRScraper:
                 continue
 
             # Check for jazz keywords
-            text = (item.title + " " + item.content).lower()
-            jazz_keywords = [
-                'jazz', 'bebop', 'hard bop', 'blue note', 'fresh air',
-                'terry gross', 'saxophone', 'trumpet', 'pianist'
-            ]
-
-            if any(keyword in text for keyword in jazz_keywords):
+            if RELEVANCE_MATCHER.scan(item.title + " " + item.content).any('jazz'):
                 jazz_items.append(item)
 
         return jazz_items
 
     def _deduplicate_content(self, content_items: List[ScrapedContent]) -> List[ScrapedContent]:
-        """Remove duplicate content based on URL"""
+        """Remove duplicate content based on URL, then near-duplicate text (e.g. syndicated copies)"""
         seen_urls = set()
         unique_items = []
+        near_duplicates = NearDuplicateIndex(db_path=':memory:')
 
         for item in content_items:
-            if item.url not in seen_urls:
-                seen_urls.add(item.url)
-                unique_items.append(item)
+            if item.url in seen_urls:
+                continue
+            seen_urls.add(item.url)
+
+            match = near_duplicates.check_and_add(item.id, item.content, item.url)
+            if match:
+                logger.info(f"⏭️ Dropping near duplicate {item.url} ({match[1]:.2f} similar)")
+                continue
+            unique_items.append(item)
 
+        near_duplicates.close()
         return unique_items
 
 class RealRollingStoneScraper:
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Lake Re-validation Job
+Re-scores every scraped v3 document in the data lake with the current
+validation rules, e.g. after thresholds are tightened
+Read-only - reports results, never modifies lake objects
+"""
+
+import logging
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from aws_clients import get_client
+from listing_cache import ListingCache
+from partition_index import PartitionIndex
+from validator import ContentValidator, VALIDATOR_VERSION
+from serialization import is_json_key, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class LakeRevalidationJob:
+    """
+    Streams v3 documents from S3 into ContentValidator.validate_many
+    Downloads run on a thread pool ahead of validation, with a bounded
+    number of bodies held in memory at once. With since, only documents
+    written on or after that day are re-validated, found via the partition index
+    """
+
+    def __init__(self, bucket_name: str = "ut-v2-prod-lake-east1", prefix: str = "scraped-content/",
+                 workers: int = None, fetch_workers: int = 16, chunk_size: int = 256,
+                 since: Optional[date] = None):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.since = since
+        self.workers = workers
+        self.fetch_workers = fetch_workers
+        self.chunk_size = chunk_size
+        # Pooled connections for every download thread
+        self.s3 = get_client('s3', max_pool_connections=fetch_workers)
+        self.validator = ContentValidator()
+
+    def run(self, limit: int = None) -> Dict[str, Any]:
+        """Re-validate the lake and return a summary report"""
+        start = time.perf_counter()
+        keys = self._list_keys(limit)
+
+        # validate_many consumes documents lazily, keep the keys in step with it
+        key_order: deque = deque()
+        documents = self._fetch_documents(keys, key_order)
+
+        scores: List[float] = []
+        failures = []
+        error_counts: Counter = Counter()
+
+        results = self.validator.validate_many(documents, workers=self.workers, chunk_size=self.chunk_size)
+        for result in results:
+            key = key_order.popleft()
+            scores.append(result.score)
+            if not result.passed:
+                failures.append({"s3_key": key, "score": result.score, "errors": result.errors})
+                error_counts.update(result.errors)
+
+            if len(scores) % 1000 == 0:
+                logger.info(f"🔍 Re-validated {len(scores)} documents ({len(failures)} failing)")
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "job_id": f"revalidate_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+            "validator_version": VALIDATOR_VERSION,
+            "bucket": self.bucket_name,
+            "prefix": self.prefix,
+            "since": self.since.isoformat() if self.since else None,
+            "total_documents": len(scores),
+            "passed": len(scores) - len(failures),
+            "failed": len(failures),
+            "avg_score": sum(scores) / len(scores) if scores else 0.0,
+            "duration_seconds": elapsed,
+            "documents_per_second": len(scores) / elapsed if elapsed else 0.0,
+            "top_errors": error_counts.most_common(20),
+            "validation_stages": self.validator.stats.to_dict(),
+            "failures": failures
+        }
+
+        logger.info(f"📊 Re-validated {report['total_documents']} documents in {elapsed:.1f}s: "
+                    f"{report['passed']} passed, {report['failed']} failed")
+        return report
+
+    def _list_keys(self, limit: int = None) -> Iterator[str]:
+        """Yield v3 document keys under the prefix, compressed or not"""
+        count = 0
+        for key in self._candidate_keys():
+            if not key.startswith(self.prefix) or not is_json_key(key):
+                continue
+            yield key
+            count += 1
+            if limit and count >= limit:
+                return
+
+    def _candidate_keys(self) -> Iterator[str]:
+        """Keys written since self.since from the partition index, otherwise the cached listing of the prefix"""
+        partition_index = PartitionIndex(self.bucket_name, self.s3)
+        if self.since is not None:
+            yield from partition_index.keys_since(self.since)
+            return
+        yield from ListingCache(self.bucket_name, self.s3, partition_index=partition_index).list_keys(self.prefix)
+
+    def _fetch_documents(self, keys: Iterator[str], key_order: deque) -> Iterator[bytes]:
+        """Download bodies in input order with at most 4 x fetch_workers requests outstanding"""
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as pool:
+            pending = deque()
+            for key in keys:
+                pending.append((key, pool.submit(self._get_body, key)))
+                if len(pending) >= self.fetch_workers * 4:
+                    yield self._next_body(pending, key_order)
+            while pending:
+                yield self._next_body(pending, key_order)
+
+    @staticmethod
+    def _next_body(pending: deque, key_order: deque) -> bytes:
+        key, future = pending.popleft()
+        key_order.append(key)
+        try:
+            return future.result()
+        except Exception as e:
+            # Reported as an invalid document by validate_many
+            logger.warning(f"⚠️ Could not fetch {key}: {e}")
+            return b''
+
+    def _get_body(self, key: str) -> bytes:
+        return self.s3.get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+
+
+def main():
+    """Main entry point for lake re-validation"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-validate scraped content in the data lake")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--prefix", default="scraped-content/", help="Prefix of v3 documents")
+    parser.add_argument("--workers", type=int, help="Validation processes (default: CPU count)")
+    parser.add_argument("--fetch-workers", type=int, default=16, help="Concurrent S3 downloads")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Documents per validation chunk")
+    parser.add_argument("--limit", type=int, help="Stop after this many documents")
+    parser.add_argument("--since", help="Only documents written on or after this date (YYYY-MM-DD), "
+                                        "read from the partition index")
+    parser.add_argument("--output", help="Report path (default: cron/reports/)")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    job = LakeRevalidationJob(
+        bucket_name=args.bucket,
+        prefix=args.prefix,
+        workers=args.workers,
+        fetch_workers=args.fetch_workers,
+        chunk_size=args.chunk_size,
+        since=datetime.strptime(args.since, "%Y-%m-%d").date() if args.since else None
+    )
+    report = job.run(limit=args.limit)
+
+    report_file = Path(args.output) if args.output else Path(__file__).parent / "reports" / f"{report['job_id']}.json"
+    report_file.parent.mkdir(exist_ok=True)
+    write_json(report_file, report, pretty=True)
+
+    print(f"\n🏁 Re-validation Summary:")
+    print(f"=========================")
+    print(f"Documents: {report['total_documents']}")
+    print(f"Passed: {report['passed']}")
+    print(f"Failed: {report['failed']}")
+    print(f"Throughput: {report['documents_per_second']:.0f} docs/s")
+    print(f"Report: {report_file}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Upload Run Rollback
+Deletes every object a scraper run wrote to the data lake, as recorded in
+its upload journal, and forgets them in the local listing cache, content
+ledger, near-duplicate index and partition index
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from aws_clients import get_client
+from content_ledger import ContentHashLedger
+from listing_cache import ListingCache
+from near_duplicates import NearDuplicateIndex
+from partition_index import PartitionIndex
+from upload_journal import UploadJournal, list_journals, rollback_run
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point for rolling back an upload run"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Delete the objects an upload run wrote to the data lake")
+    parser.add_argument("run_id", nargs="?", help="Run to roll back (the scraper job id)")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--journal-dir", help="Upload journal directory (default: cache/upload_journals)")
+    parser.add_argument("--dry-run", action="store_true", help="List the objects that would be deleted")
+    parser.add_argument("--list", action="store_true", help="List runs with an upload journal")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.list or not args.run_id:
+        for run_id in list_journals(args.journal_dir):
+            print(run_id)
+        return 0
+
+    journal = UploadJournal(args.run_id, args.bucket, args.journal_dir)
+    if not journal.path.exists():
+        print(f"❌ No upload journal for {args.run_id} at {journal.path}")
+        return 1
+
+    s3_client = get_client('s3')
+    near_duplicate_index = None
+    if not args.dry_run:
+        near_duplicate_index = NearDuplicateIndex(bucket_name=args.bucket, s3_client=s3_client)
+        near_duplicate_index.load()
+    result = rollback_run(
+        journal,
+        s3_client,
+        content_ledger=None if args.dry_run else ContentHashLedger(args.bucket, s3_client),
+        near_duplicate_index=near_duplicate_index,
+        partition_index=None if args.dry_run else PartitionIndex(args.bucket, s3_client),
+        listing_cache=None if args.dry_run else ListingCache(args.bucket, s3_client),
+        dry_run=args.dry_run
+    )
+
+    print(f"\n⏪ Rollback Summary ({args.run_id}):")
+    print(f"=========================")
+    print(f"{'Would delete' if args.dry_run else 'Deleted'}: {len(result['deleted_keys'])} objects")
+    print(f"Unconfirmed writes skipped: {result['unconfirmed_keys_skipped']}")
+    print(f"Errors: {len(result['errors'])}")
+    for key in result['deleted_keys'] if args.dry_run else []:
+        print(f"  {key}")
+    for error in result['errors']:
+        print(f"  ❌ {error}")
+
+    return 1 if result['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
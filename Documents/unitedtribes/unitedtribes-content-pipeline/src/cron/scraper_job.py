@@ -17,9 +17,12 @@ import time
 # Add shared modules to path
 sys.path.append(str(Path(__file__).parent.parent / "shared"))
 
+from aws_clients import check_bucket, get_client
 from models import ScrapedContent, SourceAttribution, ContentType, ScrapingBatch, Source
 from validator import ContentValidator, SafetyChecker
+from serialization import write_json
 from s3_uploader import S3ContentUploader
+from staging import LocalStagingStore, StagingSyncer
 from jazz_artist_tracker import JazzArtistTracker
 
 
@@ -36,14 +39,23 @@ class ScraperCronJob:
         self._setup_logging()
         self.logger = logging.getLogger(__name__)
 
-        # Initialize components
+        # Job tracking
+        self.job_id = f"scraper_job_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+
+        # Initialize components (uploads are journaled under the job id for rollback)
         self.validator = ContentValidator()
-        self.safety_checker = SafetyChecker()
-        self.s3_uploader = S3ContentUploader()
+        self.safety_checker = SafetyChecker(self.validator)
+        self.s3_uploader = S3ContentUploader(
+            compression=self.config.get("compression"),
+            run_id=self.job_id,
+            journal_dir=self.config.get("journal_dir")
+        )
+        # With stage_uploads, batches are written locally and uploaded in the background while scraping continues
+        self.staging_syncer = None
+        if self.config.get("stage_uploads") and not self.config.get("dry_run", False):
+            self.staging_syncer = StagingSyncer(LocalStagingStore(self.config.get("staging_dir")), self.s3_uploader)
         self.artist_tracker = JazzArtistTracker()
 
-        # Job tracking
-        self.job_id = f"scraper_job_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
         self.results = {
             "job_id": self.job_id,
             "start_time": datetime.utcnow().isoformat(),
@@ -52,7 +64,10 @@ class ScraperCronJob:
             "total_discovered": 0,
             "total_scraped": 0,
             "total_uploaded": 0,
-            "errors": []
+            "total_upload_failures": 0,
+            "batch_safety_failures": 0,
+            "errors": [],
+            "rollback": None
         }
 
     def _load_config(self, config_file: str) -> dict:
@@ -65,7 +80,16 @@ class ScraperCronJob:
             "enable_s3_upload": True,
             "log_level": "INFO",
             "max_runtime_minutes": 60,
-            "notification_email": None
+            "notification_email": None,
+            "compression": None,  # "gzip" or "zstd" to store items and manifests compressed
+            "stage_uploads": False,
+            "staging_dir": None,  # default: $UT_STAGING_DIR or cache/staging
+            "journal_dir": None,  # default: cache/upload_journals
+            # Post-job validation; a failing job's uploads are deleted again. Only failed
+            # uploads and failed batch safety checks count as errors, not scrape or bookkeeping warnings
+            "min_upload_success_rate": 0.9,
+            "max_error_count": 10,
+            "rollback_on_failure": True
         }
 
         if config_file and Path(config_file).exists():
@@ -109,6 +133,14 @@ class ScraperCronJob:
             for source_name in self.config["sources"]:
                 await self._process_source(source_name)
 
+            await self._finish_staged_uploads()
+
+            # Post-job validation
+            if not self._validate_job():
+                await self._rollback_uploads()
+                await self._generate_job_report()
+                return self._create_failure_result("Post-job validation failed")
+
             # Generate final report
             await self._generate_job_report()
 
@@ -118,8 +150,61 @@ class ScraperCronJob:
         except Exception as e:
             self.logger.error(f"💥 Job failed: {e}")
             self.results["errors"].append(f"Job exception: {e}")
+
+            try:
+                if self.staging_syncer:
+                    await self.staging_syncer.stop()
+                await self._rollback_uploads()
+            except Exception as rollback_error:
+                self.logger.error(f"💥 Rollback also failed: {rollback_error}")
+
             return self._create_failure_result(str(e))
 
+    async def _finish_staged_uploads(self):
+        """Wait for staged batches to upload and add them to the job totals (no-op without stage_uploads)"""
+        if not self.staging_syncer:
+            return
+
+        stats = await self.staging_syncer.drain()
+        self.results["total_uploaded"] += stats["uploaded_items"]
+        self.results["total_upload_failures"] += stats["pending_items"]
+        self.results["errors"].extend(stats["errors"])
+        self.results["staged_uploads"] = {key: value for key, value in stats.items() if key != "errors"}
+        self.logger.info(f"📤 Staged uploads finished: {stats['committed']} batches, {stats['uploaded_items']} items, "
+                         f"{stats['pending_items']} items left pending for the next run")
+
+    def _validate_job(self) -> bool:
+        """Check the job's upload success rate and upload/safety failure count against the configured limits"""
+        attempted = self.results["total_uploaded"] + self.results["total_upload_failures"]
+        min_success_rate = self.config.get("min_upload_success_rate", 0.9)
+        if attempted and self.results["total_uploaded"] / attempted < min_success_rate:
+            self.logger.error(f"Upload success rate too low: "
+                              f"{self.results['total_uploaded'] / attempted:.2%} < {min_success_rate:.2%}")
+            return False
+
+        max_error_count = self.config.get("max_error_count", 10)
+        error_count = self.results["total_upload_failures"] + self.results["batch_safety_failures"]
+        if error_count > max_error_count:
+            self.logger.error(f"Too many failed uploads and batch safety checks: {error_count} > {max_error_count}")
+            return False
+
+        self.logger.info("✅ Job validation passed")
+        return True
+
+    async def _rollback_uploads(self):
+        """Delete everything this job uploaded, as recorded in its upload journal"""
+        if not self.config.get("rollback_on_failure", True) or not self.s3_uploader.journal.path.exists():
+            return
+
+        result = self.s3_uploader.rollback()
+        self.results["rollback"] = {
+            "deleted_objects": len(result["deleted_keys"]),
+            "unconfirmed_keys_skipped": result["unconfirmed_keys_skipped"],
+            "errors": result["errors"]
+        }
+        self.logger.warning(f"⏪ Rolled back {len(result['deleted_keys'])} uploaded objects "
+                            f"({len(result['errors'])} errors)")
+
     async def _run_safety_checks(self) -> bool:
         """Run comprehensive safety checks"""
         self.logger.info("🛡️ Running safety checks...")
@@ -161,9 +246,7 @@ class ScraperCronJob:
     async def _check_data_lake(self) -> bool:
         """Check data lake integrity"""
         try:
-            import boto3
-            s3 = boto3.client('s3')
-            response = s3.list_objects_v2(
+            response = get_client('s3').list_objects_v2(
                 Bucket='ut-v2-prod-lake-east1',
                 Prefix='enhanced-knowledge-graph/current/',
                 MaxKeys=1
@@ -173,11 +256,9 @@ class ScraperCronJob:
             return False
 
     async def _check_s3_access(self) -> bool:
-        """Check S3 access"""
+        """Check S3 access (once per process)"""
         try:
-            import boto3
-            s3 = boto3.client('s3')
-            s3.head_bucket(Bucket='ut-v2-prod-lake-east1')
+            check_bucket('ut-v2-prod-lake-east1')
             return True
         except:
             return False
@@ -256,13 +337,18 @@ class ScraperCronJob:
             if not is_safe:
                 self.logger.error(f"Batch safety check failed: {safety_errors}")
                 self.results["errors"].extend(safety_errors)
+                self.results["batch_safety_failures"] += 1
                 return
 
             # Upload to S3
             uploaded_count = 0
-            if self.config.get("enable_s3_upload", True) and not self.config.get("dry_run", False):
+            if self.staging_syncer and self.config.get("enable_s3_upload", True):
+                # Counted when the job drains the syncer
+                await self.staging_syncer.stage(batch)
+            elif self.config.get("enable_s3_upload", True) and not self.config.get("dry_run", False):
                 upload_results = await self.s3_uploader.upload_batch(batch)
                 uploaded_count = upload_results["successful_uploads"]
+                self.results["total_upload_failures"] += upload_results["failed_uploads"]
 
                 if upload_results["errors"]:
                     self.results["errors"].extend(upload_results["errors"])
@@ -393,12 +479,14 @@ class ScraperCronJob:
             self.results["total_uploaded"] / max(1, self.results["total_discovered"])
         )
 
+        # Per-source validation stage cost and hit rates
+        self.results["validation_stages"] = self.validator.stats.to_dict()
+
         # Save report
         report_file = Path(__file__).parent / "reports" / f"job_report_{self.job_id}.json"
         report_file.parent.mkdir(exist_ok=True)
 
-        with open(report_file, 'w') as f:
-            json.dump(self.results, f, indent=2, default=str)
+        write_json(report_file, self.results, pretty=True)
 
         self.logger.info(f"📊 Job report saved: {report_file}")
 
@@ -437,6 +525,9 @@ async def main():
     parser.add_argument("--dry-run", action="store_true", help="Dry run mode")
     parser.add_argument("--sources", nargs="+", default=["pitchfork"], help="Sources to process")
     parser.add_argument("--max-articles", type=int, default=5, help="Max articles per source")
+    parser.add_argument("--compression", choices=["gzip", "zstd"], help="Store uploaded objects compressed")
+    parser.add_argument("--stage-uploads", action="store_true",
+                        help="Stage batches locally and upload them in the background while scraping")
 
     args = parser.parse_args()
 
@@ -444,7 +535,9 @@ async def main():
     config_overrides = {
         "dry_run": args.dry_run,
         "sources": args.sources,
-        "max_articles_per_source": args.max_articles
+        "max_articles_per_source": args.max_articles,
+        "compression": args.compression,
+        "stage_uploads": args.stage_uploads
     }
 
     # Create temporary config file with overrides
@@ -470,6 +563,9 @@ async def main():
         print(f"Errors: {summary['errors']}")
     else:
         print(f"Error: {result['error']}")
+        rollback = result['results'].get('rollback')
+        if rollback:
+            print(f"Rolled back: {rollback['deleted_objects']} objects ({len(rollback['errors'])} errors)")
 
     # Clean up
     temp_config.unlink(missing_ok=True)
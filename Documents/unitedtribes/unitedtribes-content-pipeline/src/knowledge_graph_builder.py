@@ -5,37 +5,40 @@ Builds enhanced knowledge graph from videos, books, and scraped content
 (Previously named emergency_rebuild - this is actually our production KG builder)
 """
 
-import json
-import boto3
 import logging
-from datetime import datetime
-from typing import Dict, List, Any
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
 from collections import defaultdict
 
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent / "shared"))
+
+from aws_clients import get_client
+from listing_cache import ListingCache
+from partition_index import PartitionIndex
+from serialization import decode_json, encode_json, is_json_key
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class EmergencyKnowledgeGraphRebuilder:
-    def __init__(self, bucket_name: str = 'ut-v2-prod-lake-east1'):
-        self.s3 = boto3.client('s3')
+    def __init__(self, bucket_name: str = 'ut-v2-prod-lake-east1', s3_client=None):
+        self.s3 = s3_client or get_client('s3')
         self.bucket = bucket_name
         self.video_prefix = 'video_analysis/'
         self.books_prefix = 'enhanced-knowledge-graph/'
         self.scraped_content_prefix = 'scraped-content/'
+        # Repeat rebuilds only list the keys added since the last one
+        self.listing_cache = ListingCache(bucket_name, self.s3, partition_index=PartitionIndex(bucket_name, self.s3))
 
     def list_all_video_files(self) -> List[str]:
         """List all video analysis JSON files"""
         logger.info(f"Scanning {self.video_prefix} for video analysis files...")
 
-        paginator = self.s3.get_paginator('list_objects_v2')
-        video_files = []
-
-        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.video_prefix):
-            if 'Contents' in page:
-                for obj in page['Contents']:
-                    key = obj['Key']
-                    if key.endswith('.json') and 'video_' in key:
-                        video_files.append(key)
+        video_files = [key for key in self.listing_cache.list_keys(self.video_prefix)
+                       if is_json_key(key) and 'video_' in key]
 
         logger.info(f"Found {len(video_files)} video analysis files")
         return video_files
@@ -44,7 +47,7 @@ class EmergencyKnowledgeGraphRebuilder:
         """Extract relationships from a video analysis file"""
         try:
             response = self.s3.get_object(Bucket=self.bucket, Key=video_key)
-            video_data = json.loads(response['Body'].read())
+            video_data = decode_json(response['Body'].read())
 
             relationships = []
 
@@ -83,19 +86,17 @@ class EmergencyKnowledgeGraphRebuilder:
             logger.error(f"Error processing {video_key}: {e}")
             return []
 
-    def list_all_scraped_files(self) -> List[str]:
-        """List all scraped content JSON files"""
-        logger.info(f"Scanning {self.scraped_content_prefix} for scraped content files...")
+    def list_all_scraped_files(self, since: Optional[date] = None) -> List[str]:
+        """List all scraped content JSON files, or with since only those written on or after that day"""
+        if since is not None:
+            logger.info(f"Reading the partition index for scraped content since {since}...")
+            scraped_files = [key for key in self.listing_cache.partition_index.keys_since(since) if is_json_key(key)]
+            logger.info(f"Found {len(scraped_files)} scraped content files since {since}")
+            return scraped_files
 
-        paginator = self.s3.get_paginator('list_objects_v2')
-        scraped_files = []
+        logger.info(f"Scanning {self.scraped_content_prefix} for scraped content files...")
 
-        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.scraped_content_prefix):
-            if 'Contents' in page:
-                for obj in page['Contents']:
-                    key = obj['Key']
-                    if key.endswith('.json'):
-                        scraped_files.append(key)
+        scraped_files = [key for key in self.listing_cache.list_keys(self.scraped_content_prefix) if is_json_key(key)]
 
         logger.info(f"Found {len(scraped_files)} scraped content files")
         return scraped_files
@@ -104,7 +105,7 @@ class EmergencyKnowledgeGraphRebuilder:
         """Extract relationships from a scraped content file"""
         try:
             response = self.s3.get_object(Bucket=self.bucket, Key=scraped_key)
-            content_data = json.loads(response['Body'].read())
+            content_data = decode_json(response['Body'].read())
 
             relationships = []
 
@@ -193,15 +194,16 @@ class EmergencyKnowledgeGraphRebuilder:
         try:
             kg_key = 'enhanced-knowledge-graph/current/latest.json'
             response = self.s3.get_object(Bucket=self.bucket, Key=kg_key)
-            existing_kg = json.loads(response['Body'].read())
+            existing_kg = decode_json(response['Body'].read())
             logger.info(f"Loaded existing knowledge graph with {len(existing_kg.get('relationships', []))} relationships")
             return existing_kg
         except Exception as e:
             logger.warning(f"Could not load existing knowledge graph: {e}")
             return {'relationships': [], 'metadata': {'source_files': []}}
 
-    def rebuild_enhanced_knowledge_graph(self, include_scraped_content: bool = False):
-        """Rebuild the complete enhanced knowledge graph"""
+    def rebuild_enhanced_knowledge_graph(self, include_scraped_content: bool = False,
+                                         scraped_since: Optional[date] = None):
+        """Rebuild the complete enhanced knowledge graph (scraped_since limits scraped content to recent days)"""
         logger.info("🚀 Starting canonical knowledge graph rebuild...")
 
         # Load existing book relationships
@@ -234,7 +236,7 @@ class EmergencyKnowledgeGraphRebuilder:
         scraped_stats = defaultdict(int)
         if include_scraped_content:
             logger.info("🎵 Processing scraped content...")
-            scraped_files = self.list_all_scraped_files()
+            scraped_files = self.list_all_scraped_files(since=scraped_since)
 
             for i, scraped_key in enumerate(scraped_files):
                 if i % 10 == 0:
@@ -295,11 +297,14 @@ class EmergencyKnowledgeGraphRebuilder:
         output_key = f'enhanced-knowledge-graph/current/latest.json'
         backup_key = f'enhanced-knowledge-graph/backups/rebuild_{timestamp.replace(":", "-")}.json'
 
+        # Encode once (compact, the graph is machine-read) for both copies
+        graph_body = encode_json(enhanced_graph)
+
         # Create backup
         self.s3.put_object(
             Bucket=self.bucket,
             Key=backup_key,
-            Body=json.dumps(enhanced_graph, indent=2),
+            Body=graph_body,
             ContentType='application/json'
         )
 
@@ -307,7 +312,7 @@ class EmergencyKnowledgeGraphRebuilder:
         self.s3.put_object(
             Bucket=self.bucket,
             Key=output_key,
-            Body=json.dumps(enhanced_graph, indent=2),
+            Body=graph_body,
             ContentType='application/json'
         )
 
@@ -324,13 +329,16 @@ class EmergencyKnowledgeGraphRebuilder:
         return enhanced_graph
 
 if __name__ == '__main__':
-    import sys
-
     # Check for command line argument to include scraped content
     include_scraped = '--include-scraped-content' in sys.argv
+    # --scraped-since YYYY-MM-DD: only scraped content written since then, from the partition index
+    scraped_since = None
+    if '--scraped-since' in sys.argv:
+        scraped_since = datetime.strptime(sys.argv[sys.argv.index('--scraped-since') + 1], '%Y-%m-%d').date()
 
     rebuilder = EmergencyKnowledgeGraphRebuilder()
-    result = rebuilder.rebuild_enhanced_knowledge_graph(include_scraped_content=include_scraped)
+    result = rebuilder.rebuild_enhanced_knowledge_graph(include_scraped_content=include_scraped,
+                                                        scraped_since=scraped_since)
 
     print(f"\n🎉 CANONICAL KNOWLEDGE GRAPH REBUILD COMPLETE!")
     print(f"Enhanced knowledge graph built with {result['metadata']['total_relationships']} total relationships")
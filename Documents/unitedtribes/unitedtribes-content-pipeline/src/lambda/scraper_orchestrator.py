@@ -4,18 +4,48 @@ Safe cloud execution with comprehensive monitoring and rollback capability
 """
 
 import json
-import boto3
 import logging
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import os
+import sys
 import traceback
+from pathlib import Path
+
+# Shared modules: next to the handler in the deployment package (deploy.sh), one level up in the repo
+for _shared_dir in (Path(__file__).parent / "shared", Path(__file__).parent.parent / "shared"):
+    if _shared_dir.is_dir():
+        sys.path.append(str(_shared_dir))
+        break
 
 # Lambda runtime imports
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Fallback clients when the shared modules are missing from the package
+_boto3_clients: Dict[str, Any] = {}
+
+
+def _client(service: str):
+    """Process-wide client from shared/aws_clients, a plain boto3 client if it cannot be imported"""
+    try:
+        from aws_clients import get_client
+    except ImportError:
+        if service not in _boto3_clients:
+            import boto3
+            logger.warning(f"⚠️ shared/aws_clients not packaged, using a plain boto3 {service} client")
+            _boto3_clients[service] = boto3.client(service)
+        return _boto3_clients[service]
+    return get_client(service)
+
+
+# Created during container init, reused by warm invocations
+try:
+    _client('s3')
+except Exception as e:
+    logger.warning(f"⚠️ Could not pre-warm the S3 client: {e}")
+
 
 class ScraperOrchestrator:
     """
@@ -24,15 +54,13 @@ class ScraperOrchestrator:
     """
 
     def __init__(self):
-        self.s3_client = boto3.client('s3')
-        self.sns_client = boto3.client('sns')
-        self.cloudwatch = boto3.client('cloudwatch')
-
         # Configuration from environment variables
         self.bucket_name = os.environ.get('CONTENT_BUCKET', 'ut-v2-prod-lake-east1')
         self.notification_topic = os.environ.get('SNS_TOPIC_ARN')
         self.max_runtime_minutes = int(os.environ.get('MAX_RUNTIME_MINUTES', '30'))
         self.enable_s3_upload = os.environ.get('ENABLE_S3_UPLOAD', 'true').lower() == 'true'
+        # Upload journals must live on the writable /tmp volume
+        self.journal_dir = Path(os.environ.get('UPLOAD_JOURNAL_DIR', '/tmp/upload_journals'))
 
         # Safety thresholds
         self.min_success_rate = float(os.environ.get('MIN_SUCCESS_RATE', '0.7'))
@@ -52,9 +80,22 @@ class ScraperOrchestrator:
             "total_uploaded": 0,
             "errors": [],
             "safety_checks": {},
-            "rollback_performed": False
+            "rollback_performed": False,
+            "rollback": None
         }
 
+    @property
+    def s3_client(self):
+        return _client('s3')
+
+    @property
+    def sns_client(self):
+        return _client('sns')
+
+    @property
+    def cloudwatch(self):
+        return _client('cloudwatch')
+
     async def lambda_handler(self, event: Dict[str, Any], context) -> Dict[str, Any]:
         """
         Main Lambda handler with comprehensive error handling
@@ -121,7 +162,11 @@ class ScraperOrchestrator:
                 "name": scraper_name,
                 "max_articles": config["max_articles"],
                 "enable_upload": config["enable_upload"] and self.enable_s3_upload,
-                "dry_run": config["dry_run"]
+                "dry_run": config["dry_run"],
+                # ScraperConfig fields: each scraper's S3ContentUploader journals its writes under the
+                # execution id in journal_dir, where _perform_rollback reads them back
+                "run_id": self.execution_id,
+                "journal_dir": str(self.journal_dir)
             })
 
         return scraper_configs
@@ -194,9 +239,11 @@ class ScraperOrchestrator:
             return False
 
     async def _check_s3_access(self) -> bool:
-        """Check S3 bucket access"""
+        """Check S3 bucket access (once per container)"""
         try:
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
+            from aws_clients import check_bucket
+
+            check_bucket(self.bucket_name, self.s3_client)
             return True
         except Exception:
             return False
@@ -330,26 +377,36 @@ class ScraperOrchestrator:
         return True
 
     async def _perform_rollback(self):
-        """Perform rollback if execution fails validation"""
+        """Delete every object this execution uploaded, as recorded in its upload journal"""
         logger.warning("🔄 Performing rollback")
 
         try:
-            # In a real implementation, this would:
-            # 1. Remove any S3 objects uploaded during this session
-            # 2. Restore previous state if necessary
-            # 3. Clear any caches that might have been updated
-
-            rollback_actions = []
-
-            # Mock rollback actions
-            if self.results["total_uploaded"] > 0:
-                rollback_actions.append("Remove uploaded S3 objects")
+            # Imported here so a packaging slip only breaks rollback, not every invocation
+            from content_ledger import ContentHashLedger
+            from near_duplicates import NearDuplicateIndex
+            from partition_index import PartitionIndex
+            from upload_journal import UploadJournal, rollback_run
+
+            journal = UploadJournal(self.execution_id, self.bucket_name, self.journal_dir)
+            result = rollback_run(
+                journal,
+                self.s3_client,
+                content_ledger=ContentHashLedger(self.bucket_name, self.s3_client),
+                # Removals reach other runs' copies through S3, no local copy needs loading
+                near_duplicate_index=NearDuplicateIndex(bucket_name=self.bucket_name, s3_client=self.s3_client),
+                partition_index=PartitionIndex(self.bucket_name, self.s3_client)
+            )
 
-            # For now, just log what would be done
-            logger.info(f"Rollback actions: {rollback_actions}")
+            self.results["rollback"] = {
+                "deleted_objects": len(result["deleted_keys"]),
+                "unconfirmed_keys_skipped": result["unconfirmed_keys_skipped"],
+                "errors": result["errors"]
+            }
+            if result["errors"]:
+                raise RuntimeError(f"{len(result['errors'])} objects could not be deleted: {result['errors'][:5]}")
 
             self.results["rollback_performed"] = True
-            logger.info("✅ Rollback completed")
+            logger.info(f"✅ Rollback completed: {len(result['deleted_keys'])} objects deleted")
 
         except Exception as e:
             logger.error(f"❌ Rollback failed: {e}")
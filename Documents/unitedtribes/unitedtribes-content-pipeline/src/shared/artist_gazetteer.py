@@ -0,0 +1,198 @@
+"""
+Artist gazetteer
+Known artists and their aliases, from the harvest config's target_artists
+and the knowledge graph's entities, compiled into one regular expression so
+a text is scanned for every name in a single pass. Used to file uploads
+under [artist]/ instead of guessing the artist from title patterns
+"""
+
+import logging
+import re
+import sys
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .cache_dirs import CACHE_ROOT, temp_fallback, writable_dir
+    from .serialization import decode_json, write_json
+except ImportError:
+    from cache_dirs import CACHE_ROOT, temp_fallback, writable_dir
+    from serialization import decode_json, write_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HARVEST_CONFIG = Path(__file__).parent.parent / "configs" / "jazz_legends_harvest.json"
+DEFAULT_KG_ENTITIES = CACHE_ROOT / "artist_gazetteer" / "kg_entities.json"
+KG_KEY = "enhanced-knowledge-graph/current/latest.json"
+
+_WHITESPACE = re.compile(r'\s+')
+_QUOTES = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"'})
+
+
+def normalize(text: str) -> str:
+    """Lowercase, straight quotes, single spaces: the form names are matched in"""
+    return _WHITESPACE.sub(' ', text.translate(_QUOTES).lower())
+
+
+class ArtistGazetteer:
+    """
+    Canonical artist name for every known name or alias in a text
+    Names are compiled into one trie-shaped pattern, so matching cost grows
+    with the text rather than the number of names; the longest name wins
+    where names overlap ("Art Blakey and the Jazz Messengers")
+    """
+
+    def __init__(self, artists: Dict[str, Iterable[str]], cache_size: int = 4096):
+        # normalized name or alias -> canonical name
+        self._canonical: Dict[str, str] = {}
+        for canonical, aliases in artists.items():
+            for name in (canonical, *aliases):
+                key = normalize(name).strip()
+                if key:
+                    self._canonical.setdefault(key, canonical)
+
+        self._pattern = None
+        if self._canonical:
+            self._pattern = re.compile(r'(?<!\w)' + _trie_pattern(self._canonical) + r'(?!\w)')
+
+        # Titles repeat across retries, re-runs and syndicated copies
+        self._title_artist = lru_cache(maxsize=cache_size)(self._first_artist)
+
+    @classmethod
+    def from_sources(
+        cls,
+        harvest_config: Optional[Path] = DEFAULT_HARVEST_CONFIG,
+        kg_entities: Optional[Path] = DEFAULT_KG_ENTITIES
+    ) -> "ArtistGazetteer":
+        """Build from the harvest config and the cached knowledge graph entity list (either may be missing)"""
+        artists: Dict[str, List[str]] = {}
+
+        if harvest_config and Path(harvest_config).exists():
+            config = decode_json(Path(harvest_config).read_bytes())
+            for group in config.get("target_artists", {}).values():
+                for artist in group:
+                    artists.setdefault(artist["name"], []).extend(artist.get("aliases", []))
+
+        # Refreshed where the package is read-only, the list is in the temp dir fallback
+        if kg_entities == DEFAULT_KG_ENTITIES and not kg_entities.exists():
+            kg_entities = temp_fallback(kg_entities.parent) / kg_entities.name
+        if kg_entities and Path(kg_entities).exists():
+            for name in decode_json(Path(kg_entities).read_bytes()).get("entities", []):
+                artists.setdefault(name, [])
+
+        return cls(artists)
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def find_all(self, text: Optional[str]) -> List[str]:
+        """Canonical names of every known name in text, in order of appearance"""
+        if not text or self._pattern is None:
+            return []
+        return [self._canonical[match] for match in self._pattern.findall(normalize(text))]
+
+    def resolve(self, title: str, lead: Optional[str] = None) -> Optional[str]:
+        """First artist named in the title, otherwise the one the lead mentions most (earliest on ties)"""
+        artist = self._title_artist(title or "")
+        if artist or not lead:
+            return artist
+
+        mentions = self.find_all(lead)
+        if not mentions:
+            return None
+        counts = Counter(mentions)
+        return max(counts, key=lambda name: (counts[name], -mentions.index(name)))
+
+    def _first_artist(self, text: str) -> Optional[str]:
+        if not text or self._pattern is None:
+            return None
+        match = self._pattern.search(normalize(text))
+        return self._canonical[match.group(0)] if match else None
+
+
+def _trie_pattern(names: Iterable[str]) -> str:
+    """Regex matching exactly the given names, factored on shared prefixes"""
+    trie: Dict[str, Any] = {}
+    for name in names:
+        node = trie
+        for char in name:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = []
+        for char, child in sorted(node.items()):
+            if not char:
+                continue
+            # Collapse unbranched runs into one literal
+            run = [char]
+            while len(child) == 1 and '' not in child:
+                (next_char, child), = child.items()
+                run.append(next_char)
+            branches.append(re.escape(''.join(run)) + build(child))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A name ending here: try the longer names first, fall back to this one
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def knowledge_graph_entities(graph: Dict[str, Any]) -> List[str]:
+    """
+    Person names in a knowledge graph: entity and artist keys plus
+    relationship sources. Single-word names are left out, since names are
+    matched case-insensitively and most single words are ordinary words
+    """
+    names = set(graph.get("entities") or {}) | set(graph.get("artists_data") or {})
+    names.update(rel.get("source_entity") for rel in graph.get("relationships", []))
+    return sorted(name for name in names if isinstance(name, str) and len(name.split()) >= 2 and ':' not in name)
+
+
+@lru_cache(maxsize=1)
+def default_gazetteer() -> ArtistGazetteer:
+    """Gazetteer from the default sources, built once per process"""
+    try:
+        gazetteer = ArtistGazetteer.from_sources()
+    except Exception as e:
+        logger.warning(f"⚠️ Artist gazetteer unavailable, organizing uploads without it: {e}")
+        gazetteer = ArtistGazetteer({})
+    return gazetteer
+
+
+def main():
+    """Refresh the cached knowledge graph entity list"""
+    import argparse
+
+    try:
+        from .aws_clients import get_client
+    except ImportError:
+        from aws_clients import get_client
+
+    parser = argparse.ArgumentParser(description="Artist gazetteer maintenance")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--refresh-kg", action="store_true", help=f"Re-read entity names from s3://<bucket>/{KG_KEY}")
+    parser.add_argument("--resolve", metavar="TITLE", help="Show the artist a title resolves to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.refresh_kg:
+        body = get_client('s3').get_object(Bucket=args.bucket, Key=KG_KEY)['Body'].read()
+        entities = knowledge_graph_entities(decode_json(body))
+        kg_entities = writable_dir(DEFAULT_KG_ENTITIES.parent) / DEFAULT_KG_ENTITIES.name
+        write_json(kg_entities, {"source": f"s3://{args.bucket}/{KG_KEY}", "entities": entities}, pretty=True)
+        print(f"🕸️ Cached {len(entities)} knowledge graph entities in {kg_entities}")
+
+    gazetteer = ArtistGazetteer.from_sources()
+    print(f"📇 Artist gazetteer: {len(gazetteer)} names")
+    if args.resolve:
+        print(f"{args.resolve!r} -> {gazetteer.resolve(args.resolve)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
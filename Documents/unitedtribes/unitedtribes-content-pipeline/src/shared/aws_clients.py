@@ -0,0 +1,118 @@
+"""
+Process-wide boto3 clients
+One client per service and region, created on first use and shared by
+every uploader, cache and job in the process. boto3 clients are
+thread-safe once created; creation is not, so it happens under a lock
+"""
+
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ParamValidationError
+
+logger = logging.getLogger(__name__)
+
+# Connections pooled per client, raised by callers that need more (e.g. upload threads)
+DEFAULT_MAX_POOL_CONNECTIONS = int(os.environ.get("UT_MAX_POOL_CONNECTIONS", "32"))
+
+_lock = threading.Lock()
+_session: Optional[boto3.session.Session] = None
+# (service, region) -> (client, max_pool_connections)
+_clients: Dict[Tuple[str, Optional[str]], Tuple[Any, int]] = {}
+_checked_buckets: Set[str] = set()
+
+# S3 error codes: a conditional put lost to another writer, an object absent, a conditional get unchanged
+CONFLICT_CODES = {'PreconditionFailed', '412', 'ConditionalRequestConflict', '409'}
+MISSING_CODES = {'NoSuchKey', '404'}
+NOT_MODIFIED_CODES = {'NotModified', '304'}
+# Backend does not implement If-Match / If-None-Match on PutObject
+_CONDITIONAL_UNSUPPORTED_CODES = {'NotImplemented', '501'}
+
+# client -> buckets its conditional puts fell back to plain puts for
+_unconditional_buckets: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+def get_client(service: str, region_name: Optional[str] = None, max_pool_connections: Optional[int] = None):
+    """
+    Shared client for service, created on first use
+    A caller asking for a larger pool than the current client has gets a
+    new client with that pool, which then replaces it for later callers
+    """
+    pool = max(max_pool_connections or 0, DEFAULT_MAX_POOL_CONNECTIONS)
+    key = (service, region_name)
+    cached = _clients.get(key)
+    if cached is not None and cached[1] >= pool:
+        return cached[0]
+
+    global _session
+    with _lock:
+        cached = _clients.get(key)
+        if cached is not None and cached[1] >= pool:
+            return cached[0]
+        if _session is None:
+            _session = boto3.session.Session()
+        client = _session.client(service, region_name=region_name, config=Config(
+            max_pool_connections=pool,
+            tcp_keepalive=True
+        ))
+        _clients[key] = (client, pool)
+        return client
+
+
+def check_bucket(bucket_name: str, s3_client=None):
+    """head_bucket once per process and bucket; errors propagate and are not remembered"""
+    if bucket_name in _checked_buckets:
+        return
+    (s3_client or get_client('s3')).head_bucket(Bucket=bucket_name)
+    _checked_buckets.add(bucket_name)
+    logger.info(f"✅ Connected to S3 bucket: {bucket_name}")
+
+
+def conditional_put(
+    client,
+    bucket: str,
+    key: str,
+    body: bytes,
+    if_match: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    put_object with If-Match / If-None-Match, so a concurrent write is never overwritten
+    A lost race raises ClientError with a code in CONFLICT_CODES. Backends
+    without conditional puts (older botocore, some S3-compatible stores)
+    fall back to a plain put, for the rest of the process for that client and bucket
+    """
+    condition = {}
+    if if_match:
+        condition['IfMatch'] = if_match
+    if if_none_match:
+        condition['IfNoneMatch'] = if_none_match
+
+    if condition and bucket not in _unconditional_buckets.get(client, ()):
+        try:
+            return client.put_object(Bucket=bucket, Key=key, Body=body, **kwargs, **condition)
+        except ParamValidationError as e:
+            logger.warning(f"⚠️ Conditional puts not supported by this botocore, writing {bucket} unconditionally: {e}")
+        except ClientError as e:
+            if e.response['Error']['Code'] not in _CONDITIONAL_UNSUPPORTED_CODES:
+                raise
+            logger.warning(f"⚠️ Conditional puts not supported by this backend, writing {bucket} unconditionally: {e}")
+        with _lock:
+            _unconditional_buckets.setdefault(client, set()).add(bucket)
+        # A file body is read again from the start
+        if hasattr(body, 'seek'):
+            body.seek(0)
+
+    return client.put_object(Bucket=bucket, Key=key, Body=body, **kwargs)
+
+
+def prewarm(services: Iterable[str] = ('s3',), region_name: Optional[str] = None):
+    """Create clients ahead of use, e.g. during Lambda init so warm invocations reuse them"""
+    for service in services:
+        get_client(service, region_name)
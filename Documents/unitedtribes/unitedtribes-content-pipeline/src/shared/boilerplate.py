@@ -0,0 +1,236 @@
+"""
+Per-site boilerplate learning for content extraction
+Fingerprints DOM blocks that repeat across pages of the same domain so the
+extractor can drop site template (headers, recirculation, newsletter blocks)
+before text cleaning
+"""
+
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Any, Optional, Set, List, Tuple
+from urllib.parse import urlparse
+
+from bs4 import CData, NavigableString, Tag
+
+try:
+    from .cache_dirs import CACHE_ROOT, writable_dir
+    from .serialization import decode_json, write_json
+except ImportError:
+    from cache_dirs import CACHE_ROOT, writable_dir
+    from serialization import decode_json, write_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = CACHE_ROOT / "boilerplate"
+
+# The strings Tag.get_text() returns for block elements (not comments, scripts or styles)
+_TEXT_TYPES = (NavigableString, CData)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class BoilerplateLearner:
+    """
+    Learns repeated DOM blocks per domain during a run and persists them
+    A block is boilerplate once the same tag/class/text fingerprint has been
+    seen on at least min_pages pages and on min_ratio of all pages observed
+    """
+
+    # Block-level elements worth fingerprinting
+    BLOCK_TAGS = [
+        'header', 'footer', 'nav', 'aside', 'section', 'div', 'form',
+        'ul', 'ol', 'figure', 'p'
+    ]
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        min_pages: int = 3,
+        min_ratio: float = 0.5,
+        min_text_length: int = 20,
+        max_tracked_blocks: int = 5000,
+        window_pages: int = 200
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else writable_dir(DEFAULT_CACHE_DIR)
+        self.min_pages = min_pages
+        self.min_ratio = min_ratio
+        self.min_text_length = min_text_length
+        self.max_tracked_blocks = max_tracked_blocks
+        self.window_pages = window_pages
+
+        # domain -> {"pages": int, "blocks": {fingerprint: page_count}}
+        self._domains: Dict[str, Dict[str, Any]] = {}
+        self._observed_urls: Set[str] = set()
+        self._dirty: Set[str] = set()
+
+    def process(self, soup, url: str) -> int:
+        """Observe a page and strip learned boilerplate in a single fingerprint pass"""
+        blocks = self._page_blocks(soup)
+        self._record(url, blocks)
+        return self._strip_blocks(blocks, url)
+
+    def observe(self, soup, url: str):
+        """Record the blocks of one page against its domain"""
+        self._record(url, self._page_blocks(soup))
+
+    def strip(self, soup, url: str) -> int:
+        """Remove learned boilerplate subtrees from soup, returns number removed"""
+        return self._strip_blocks(self._page_blocks(soup), url)
+
+    def get_boilerplate_fingerprints(self, domain: str) -> Set[str]:
+        """Fingerprints currently classified as boilerplate for a domain"""
+        state = self._load_domain(domain)
+        pages = state["pages"]
+        if pages < self.min_pages:
+            return set()
+
+        threshold = max(self.min_pages, pages * self.min_ratio)
+        return {fp for fp, count in state["blocks"].items() if count >= threshold}
+
+    def save(self):
+        """Persist learned blocks for every domain touched in this run"""
+        if not self._dirty:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for domain in self._dirty:
+                state = self._domains[domain]
+                # Single-page blocks carry no signal worth persisting
+                persisted = {
+                    "pages": state["pages"],
+                    "blocks": {fp: count for fp, count in state["blocks"].items() if count > 1}
+                }
+                write_json(self._cache_file(domain), persisted)
+            logger.info(f"Saved boilerplate templates for {len(self._dirty)} domains")
+            self._dirty.clear()
+        except Exception as e:
+            logger.warning(f"Failed to save boilerplate templates: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Summary of learned templates per domain"""
+        return {
+            domain: {
+                "pages_observed": state["pages"],
+                "tracked_blocks": len(state["blocks"]),
+                "boilerplate_blocks": len(self.get_boilerplate_fingerprints(domain))
+            }
+            for domain, state in self._domains.items()
+        }
+
+    def _page_blocks(self, soup) -> List[Tuple[Any, str]]:
+        """
+        Fingerprint every block element of a page in document order
+        The page's strings are collected in one walk; each block's text is the
+        slice of them inside it, so nested blocks do not re-walk their subtrees
+        """
+        block_tags = set(self.BLOCK_TAGS)
+        strings: List[str] = []
+        # [elem, first string, end string] per block; the end is set on leaving the block
+        spans: List[list] = []
+        stack: List[Any] = [soup]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, int):
+                spans[node][2] = len(strings)
+            elif isinstance(node, Tag):
+                if node.name in block_tags:
+                    stack.append(len(spans))
+                    spans.append([node, len(strings), None])
+                stack.extend(reversed(node.contents))
+            elif type(node) in _TEXT_TYPES:
+                text = node.strip()
+                if text:
+                    strings.append(_WHITESPACE.sub(' ', text))
+
+        blocks = []
+        for elem, start, end in spans:
+            fingerprint = self._fingerprint(elem, ' '.join(strings[start:end]))
+            if fingerprint:
+                blocks.append((elem, fingerprint))
+        return blocks
+
+    def _record(self, url: str, blocks: List[Tuple[Any, str]]):
+        """Count each distinct block fingerprint once per page"""
+        if url in self._observed_urls:
+            return
+        self._observed_urls.add(url)
+
+        domain = self._domain_for(url)
+        state = self._load_domain(domain)
+        state["pages"] += 1
+
+        counts = state["blocks"]
+        for fingerprint in {fp for _, fp in blocks}:
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+
+        # Decay old observations so template changes are picked up
+        if state["pages"] > self.window_pages:
+            state["pages"] //= 2
+            state["blocks"] = counts = {fp: count // 2 for fp, count in counts.items() if count > 1}
+
+        if len(counts) > self.max_tracked_blocks:
+            self._prune(counts)
+
+        self._dirty.add(domain)
+
+    def _strip_blocks(self, blocks: List[Tuple[Any, str]], url: str) -> int:
+        """Decompose blocks whose fingerprint is learned boilerplate"""
+        boilerplate = self.get_boilerplate_fingerprints(self._domain_for(url))
+        if not boilerplate:
+            return 0
+
+        removed = 0
+        for elem, fingerprint in blocks:
+            # Children of an already removed block are gone with it
+            if elem.decomposed:
+                continue
+            if fingerprint in boilerplate:
+                elem.decompose()
+                removed += 1
+
+        if removed:
+            logger.debug(f"Stripped {removed} boilerplate blocks from {url}")
+        return removed
+
+    def _fingerprint(self, elem, text: str) -> Optional[str]:
+        """Hash of tag shape plus normalized text, None for near-empty blocks"""
+        if len(text) < self.min_text_length:
+            return None
+
+        classes = elem.get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        signature = f"{elem.name}|{elem.get('id', '')}|{' '.join(sorted(classes))}|{text}"
+        return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+
+    def _prune(self, blocks: Dict[str, int]):
+        """Drop blocks seen on a single page to bound memory"""
+        singles: List[str] = [fp for fp, count in blocks.items() if count <= 1]
+        for fp in singles:
+            del blocks[fp]
+
+    def _load_domain(self, domain: str) -> Dict[str, Any]:
+        """Load persisted state for a domain on first use"""
+        if domain not in self._domains:
+            state = {"pages": 0, "blocks": {}}
+            cache_file = self._cache_file(domain)
+            if cache_file.exists():
+                try:
+                    persisted = decode_json(cache_file.read_bytes())
+                    state["pages"] = int(persisted.get("pages", 0))
+                    state["blocks"] = dict(persisted.get("blocks", {}))
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable boilerplate cache {cache_file}: {e}")
+            self._domains[domain] = state
+        return self._domains[domain]
+
+    def _cache_file(self, domain: str) -> Path:
+        safe_domain = re.sub(r'[^a-z0-9.-]', '_', domain)
+        return self.cache_dir / f"{safe_domain}.json"
+
+    @staticmethod
+    def _domain_for(url: str) -> str:
+        netloc = urlparse(url).netloc.lower()
+        return netloc[4:] if netloc.startswith('www.') else netloc or "unknown"
@@ -0,0 +1,36 @@
+"""
+Local cache directories
+Caches (ledger shards, listings, journals, staged batches, learned
+boilerplate, the near-duplicate index) live under UT_CACHE_DIR, by default
+the package's cache/. A deployed Lambda package is read-only, so there they
+fall back to the same name under the temp dir (/tmp on Lambda)
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CACHE_ROOT = Path(os.environ.get("UT_CACHE_DIR", Path(__file__).parent.parent / "cache"))
+
+
+def temp_fallback(path: Path) -> Path:
+    """Where path's contents go when path cannot be written: <temp dir>/<its name>"""
+    return Path(tempfile.gettempdir()) / Path(path).name
+
+
+def writable_dir(path: Path) -> Path:
+    """path, created if needed, or its temp dir fallback where it is read-only"""
+    path = Path(path)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        if os.access(path, os.W_OK):
+            return path
+    except OSError:
+        pass
+    fallback = temp_fallback(path)
+    fallback.mkdir(parents=True, exist_ok=True)
+    logger.debug(f"{path} is not writable, using {fallback}")
+    return fallback
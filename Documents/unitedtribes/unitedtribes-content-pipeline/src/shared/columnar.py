@@ -0,0 +1,125 @@
+"""
+Columnar export of scraped content
+One Arrow table / Parquet file per ScrapingBatch, so analytics and bulk
+reprocessing read a handful of files instead of listing and fetching every
+per-item JSON object
+"""
+
+import io
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    from .serialization import encode_json
+except ImportError:
+    from serialization import encode_json
+
+COLUMNAR_PREFIX = "columnar/scraped-content"
+SCHEMA_VERSION = "1"
+
+# (column, arrow type name) in file order; low-cardinality strings are dictionary encoded
+_COLUMNS = (
+    ("id", "string"),
+    ("batch_id", "dictionary"),
+    ("url", "string"),
+    ("title", "string"),
+    ("content", "string"),
+    ("content_type", "dictionary"),
+    ("source", "dictionary"),
+    ("attribution_title", "string"),
+    ("attribution_url", "string"),
+    ("author", "dictionary"),
+    ("publication_date", "string"),
+    ("publication_type", "dictionary"),
+    ("attribution_content_type", "dictionary"),
+    ("episode_info", "string"),        # JSON encoded, podcasts only
+    ("scraped_at", "timestamp"),       # UTC
+    ("confidence_score", "float64"),
+    ("word_count", "int64"),
+    ("extraction_method", "dictionary"),
+    ("validation_passed", "bool"),
+    ("content_hash", "string"),
+    ("s3_key", "string"),
+)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for columnar export (pip install pyarrow)")
+
+
+def batch_schema():
+    """Arrow schema of an exported batch"""
+    _require_pyarrow()
+    types = {
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+        "timestamp": pa.timestamp("us"),
+        "float64": pa.float64(),
+        "int64": pa.int64(),
+        "bool": pa.bool_(),
+    }
+    return pa.schema(
+        [pa.field(name, types[type_name]) for name, type_name in _COLUMNS],
+        metadata={b"schema_version": SCHEMA_VERSION.encode()}
+    )
+
+
+def batch_to_table(batch, items: Optional[Iterable] = None):
+    """Arrow table with one row per content item (all of the batch's items unless given)"""
+    _require_pyarrow()
+    columns: Dict[str, List[Any]] = {name: [] for name, _ in _COLUMNS}
+
+    for item in (batch.content_items if items is None else items):
+        attribution = item.source_attribution
+        row = {
+            "id": item.id,
+            "batch_id": batch.batch_id,
+            "url": item.url,
+            "title": item.title,
+            "content": item.content,
+            "content_type": item.content_type.value,
+            "source": attribution.source if attribution else None,
+            "attribution_title": attribution.title if attribution else None,
+            "attribution_url": attribution.url if attribution else None,
+            "author": attribution.author if attribution else None,
+            "publication_date": attribution.publication_date if attribution else None,
+            "publication_type": attribution.publication_type if attribution else None,
+            "attribution_content_type": attribution.content_type if attribution else None,
+            "episode_info": (encode_json(attribution.episode_info).decode("utf-8")
+                             if attribution and attribution.episode_info else None),
+            "scraped_at": item.scraped_at,
+            "confidence_score": item.confidence_score,
+            "word_count": item.word_count,
+            "extraction_method": item.extraction_method,
+            "validation_passed": item.validation_passed,
+            "content_hash": item.content_hash,
+            "s3_key": item.s3_key,
+        }
+        for name, value in row.items():
+            columns[name].append(value)
+
+    schema = batch_schema()
+    arrays = [pa.array(columns[field.name], type=field.type) for field in schema]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def table_to_parquet(table, compression: str = "zstd") -> bytes:
+    """Serialize a table to Parquet bytes"""
+    _require_pyarrow()
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression=compression)
+    return buffer.getvalue()
+
+
+def parquet_key(batch) -> str:
+    """Hive-style partitioned key: columnar/scraped-content/source=<source>/date=<YYYY-MM-DD>/batch-<id>.parquet"""
+    source_name = batch.source.value if batch.source else "unknown"
+    date_str = batch.created_at.strftime("%Y-%m-%d")
+    return f"{COLUMNAR_PREFIX}/source={source_name}/date={date_str}/batch-{batch.batch_id}.parquet"
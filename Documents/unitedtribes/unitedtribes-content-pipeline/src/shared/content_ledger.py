@@ -0,0 +1,349 @@
+"""
+Content-hash ledger
+Maps ScrapedContent.content_hash to the key the content was first stored
+under, so content already in the lake (the same review scraped on
+consecutive days) is not uploaded again. The ledger is split into gzip
+JSON shards in S3 by hash prefix, so a batch only reads and rewrites the
+few shards its hashes fall in. Each shard is cached locally with its ETag
+so an unchanged shard is not downloaded again
+"""
+
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+try:
+    from .aws_clients import CONFLICT_CODES, MISSING_CODES, NOT_MODIFIED_CODES, conditional_put, get_client
+    from .cache_dirs import CACHE_ROOT, writable_dir
+    from .serialization import compress, decode_json, encode_json, is_json_key
+except ImportError:
+    from aws_clients import CONFLICT_CODES, MISSING_CODES, NOT_MODIFIED_CODES, conditional_put, get_client
+    from cache_dirs import CACHE_ROOT, writable_dir
+    from serialization import compress, decode_json, encode_json, is_json_key
+
+logger = logging.getLogger(__name__)
+
+LEDGER_PREFIX = "indexes/content-hash-ledger/"
+LEDGER_VERSION = 2
+# Hex characters of the hash naming its shard, 2 -> 256 shards
+SHARD_CHARS = 2
+# The single-object ledger used before sharding, read by import_legacy()
+LEGACY_LEDGER_KEY = "indexes/content-hash-ledger.json.gz"
+DEFAULT_CACHE_DIR = CACHE_ROOT / "content_ledger"
+
+
+class _Shard:
+    """Entries of one hash prefix, and what changed in them since the last save"""
+
+    __slots__ = ('key', 'entries', 'pending', 'forgotten', 'etag', 'loaded')
+
+    def __init__(self, key: str):
+        self.key = key
+        self.entries: Dict[str, str] = {}
+        self.pending: Dict[str, str] = {}   # recorded since the last save
+        self.forgotten: Set[str] = set()    # keys deleted since the last save
+        self.etag: Optional[str] = None
+        self.loaded = False
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending or self.forgotten)
+
+
+class ContentHashLedger:
+    """
+    content_hash -> S3 key of every document stored in the lake
+    Lookups are dictionary reads once the hash's shard is loaded; recorded
+    hashes are written back by save(), which puts only the changed shards
+    and merges with concurrent writers through conditional puts
+    """
+
+    def __init__(
+        self,
+        bucket_name: str = "ut-v2-prod-lake-east1",
+        s3_client=None,
+        prefix: str = LEDGER_PREFIX,
+        cache_dir: Optional[Path] = None,
+        workers: int = 16
+    ):
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client
+        self.prefix = prefix
+        self.cache_dir = Path(cache_dir) if cache_dir else writable_dir(DEFAULT_CACHE_DIR)
+        self.workers = workers
+
+        self._shards: Dict[str, _Shard] = {}
+        self._loaded = False   # every shard, see load()
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """Load every shard (reusing local copies still current), returns the number of entries"""
+        listed = {}
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix):
+            for obj in page.get('Contents', []):
+                listed[obj['Key']] = obj.get('ETag')
+
+        shards = [self._shard(shard_id) for shard_id in self._shard_ids()]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Shards missing from the listing are empty (or created since, which save() handles)
+            list(pool.map(lambda shard: self._load_shard(shard, listed.get(shard.key), shard.key in listed), shards))
+        self._loaded = True
+        return len(self)
+
+    def prefetch(self, content_hashes: Iterable[Optional[str]]) -> int:
+        """Load the shards of these hashes in parallel ahead of lookups, returns how many were fetched"""
+        shards = {self._shard_id(content_hash) for content_hash in content_hashes if content_hash}
+        pending = [self._shard(shard_id) for shard_id in sorted(shards)]
+        pending = [shard for shard in pending if not shard.loaded]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                list(pool.map(self._load_shard, pending))
+        return len(pending)
+
+    def lookup(self, content_hash: Optional[str]) -> Optional[str]:
+        """Key already holding this content, None when it is new"""
+        if not content_hash:
+            return None
+        shard = self._shard(self._shard_id(content_hash))
+        if not shard.loaded:
+            self._load_shard(shard)
+        return shard.entries.get(content_hash)
+
+    def record(self, content_hash: Optional[str], s3_key: str) -> bool:
+        """Add stored content, returns False if the hash was already known"""
+        if not content_hash:
+            return False
+        shard = self._shard(self._shard_id(content_hash))
+        with self._lock:
+            if content_hash in shard.entries:
+                return False
+            shard.entries[content_hash] = s3_key
+            shard.pending[content_hash] = s3_key
+            return True
+
+    def forget(self, s3_keys: Iterable[str]) -> int:
+        """Drop the hashes of deleted objects (written back by save()), returns how many were known"""
+        if not self._loaded:
+            self.load()
+        keys = set(s3_keys)
+        forgotten = 0
+        with self._lock:
+            for shard in self._shards.values():
+                stale = [content_hash for content_hash, s3_key in shard.entries.items() if s3_key in keys]
+                for content_hash in stale:
+                    shard.forgotten.add(shard.entries.pop(content_hash))
+                    shard.pending.pop(content_hash, None)
+                forgotten += len(stale)
+        return forgotten
+
+    def save(self, max_attempts: int = 5) -> bool:
+        """Write shards with recorded or forgotten hashes back to S3, returns False when there was nothing to write"""
+        with self._lock:
+            dirty = [shard for shard in self._shards.values() if shard.dirty]
+        if not dirty:
+            return False
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(dirty))) as pool:
+            list(pool.map(lambda shard: self._save_shard(shard, max_attempts), dirty))
+        logger.info(f"💾 Saved content ledger: {len(dirty)} shards")
+        return True
+
+    def import_legacy(self, key: str = LEGACY_LEDGER_KEY) -> int:
+        """Record the entries of the single-object ledger, returns how many were new"""
+        try:
+            body = self._get_s3_client().get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+        except ClientError as e:
+            if e.response['Error']['Code'] in MISSING_CODES:
+                return 0
+            raise
+
+        entries = decode_json(body)["entries"]
+        self.prefetch(entries)
+        return sum(1 for content_hash, s3_key in entries.items() if self.record(content_hash, s3_key))
+
+    def backfill(self, prefix: str = "scraped-content/", workers: int = 16) -> int:
+        """Record the content hash of every document under prefix, returns how many were new"""
+        if not self._loaded:
+            self.load()
+
+        added = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for s3_key, content_hash in pool.map(self._document_hash, self._list_keys(prefix)):
+                if content_hash and self.record(content_hash, s3_key):
+                    added += 1
+        return added
+
+    def __len__(self) -> int:
+        """Entries in the shards loaded so far"""
+        return sum(len(shard.entries) for shard in list(self._shards.values()))
+
+    def __contains__(self, content_hash: str) -> bool:
+        return self.lookup(content_hash) is not None
+
+    def _shard_ids(self) -> List[str]:
+        return [format(i, f'0{SHARD_CHARS}x') for i in range(16 ** SHARD_CHARS)]
+
+    @staticmethod
+    def _shard_id(content_hash: str) -> str:
+        return content_hash[:SHARD_CHARS].lower()
+
+    def _shard(self, shard_id: str) -> _Shard:
+        shard = self._shards.get(shard_id)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(shard_id, _Shard(f"{self.prefix}{shard_id}.json.gz"))
+        return shard
+
+    def _load_shard(self, shard: _Shard, listed_etag: Optional[str] = None, exists: bool = True):
+        """Fetch a shard (or reuse the local copy if unchanged) and re-apply unsaved changes to it"""
+        cached_etag, cached_body = self._read_cache(shard.key)
+
+        if not exists:
+            etag, body = None, None
+        elif listed_etag and listed_etag == cached_etag:
+            etag, body = cached_etag, cached_body
+        else:
+            try:
+                kwargs = {'IfNoneMatch': cached_etag} if cached_etag else {}
+                response = self._get_s3_client().get_object(Bucket=self.bucket_name, Key=shard.key, **kwargs)
+                body = response['Body'].read()
+                etag = response['ETag']
+                self._write_cache(shard.key, etag, body)
+            except ClientError as e:
+                code = e.response['Error']['Code']
+                if code in NOT_MODIFIED_CODES:
+                    etag, body = cached_etag, cached_body
+                elif code in MISSING_CODES:
+                    etag, body = None, None
+                else:
+                    raise
+
+        entries = decode_json(body)["entries"] if body else {}
+        with self._lock:
+            # Hashes recorded here but stored by another run keep the other run's key
+            for content_hash, s3_key in shard.pending.items():
+                entries.setdefault(content_hash, s3_key)
+            # ... and objects deleted here stay forgotten
+            if shard.forgotten:
+                entries = {content_hash: s3_key for content_hash, s3_key in entries.items()
+                           if s3_key not in shard.forgotten}
+            shard.entries = entries
+            shard.etag = etag
+            shard.loaded = True
+
+    def _save_shard(self, shard: _Shard, max_attempts: int):
+        # Recorded without a lookup: merge first, an unconditional put would drop other runs' entries
+        if not shard.loaded:
+            self._load_shard(shard)
+
+        for _ in range(max_attempts):
+            with self._lock:
+                body = compress(encode_json({"version": LEDGER_VERSION, "entries": shard.entries}), 'gzip')
+                etag = shard.etag
+
+            try:
+                # Only over the version loaded, or only if still absent
+                response = conditional_put(
+                    self._get_s3_client(), self.bucket_name, shard.key, body,
+                    if_match=etag, if_none_match=None if etag else '*',
+                    ContentType='application/json', ContentEncoding='gzip'
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] not in CONFLICT_CODES:
+                    raise
+                # Saved by another run meanwhile: reload, re-apply our entries and try again
+                logger.info(f"🔄 Content ledger shard {shard.key} changed since it was loaded, merging")
+                self._load_shard(shard)
+                continue
+
+            with self._lock:
+                shard.etag = response.get('ETag')
+                shard.pending.clear()
+                shard.forgotten.clear()
+            self._write_cache(shard.key, shard.etag, body)
+            return
+
+        raise RuntimeError(f"Content ledger shard {shard.key} kept conflicting after {max_attempts} attempts")
+
+    def _list_keys(self, prefix: str) -> Iterator[str]:
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if is_json_key(obj['Key']):
+                    yield obj['Key']
+
+    def _document_hash(self, s3_key: str) -> Tuple[str, Optional[str]]:
+        try:
+            body = self._get_s3_client().get_object(Bucket=self.bucket_name, Key=s3_key)['Body'].read()
+            return s3_key, (decode_json(body).get("metadata") or {}).get("content_hash")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read {s3_key}: {e}")
+            return s3_key, None
+
+    def _cache_paths(self, key: str) -> Tuple[Path, Path]:
+        name = f"{self.bucket_name}_{key.replace('/', '_')}"
+        return self.cache_dir / name, self.cache_dir / f"{name}.etag"
+
+    def _read_cache(self, key: str) -> Tuple[Optional[str], Optional[bytes]]:
+        body_path, etag_path = self._cache_paths(key)
+        try:
+            return etag_path.read_text().strip(), body_path.read_bytes()
+        except OSError:
+            return None, None
+
+    def _write_cache(self, key: str, etag: Optional[str], body: bytes):
+        """Best effort, a missing or stale cache only costs a download"""
+        if not etag:
+            return
+        body_path, etag_path = self._cache_paths(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(body)
+            etag_path.write_text(etag)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache content ledger shard locally: {e}")
+
+    def _get_s3_client(self):
+        if self.s3_client is None:
+            self.s3_client = get_client('s3')
+        return self.s3_client
+
+
+def main():
+    """Backfill the ledger from documents already in the lake"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Content-hash ledger maintenance")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--backfill", metavar="PREFIX", help="Record hashes of documents under this prefix")
+    parser.add_argument("--import-legacy", action="store_true",
+                        help=f"Record the entries of the single-object ledger at {LEGACY_LEDGER_KEY}")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent S3 downloads for --backfill")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    ledger = ContentHashLedger(args.bucket, workers=args.workers)
+    print(f"📒 Content ledger: {ledger.load()} hashes")
+
+    if args.import_legacy:
+        added = ledger.import_legacy()
+        ledger.save()
+        print(f"➕ Imported {added} hashes from {LEGACY_LEDGER_KEY} ({len(ledger)} total)")
+
+    if args.backfill:
+        added = ledger.backfill(args.backfill, workers=args.workers)
+        ledger.save()
+        print(f"➕ Added {added} hashes from {args.backfill} ({len(ledger)} total)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,8 +14,12 @@ import dateutil.parser
 
 try:
     from .models import ScrapedContent, SourceAttribution, ContentType
+    from .boilerplate import BoilerplateLearner
+    from .keyword_matcher import KeywordMatcher
 except ImportError:
     from models import ScrapedContent, SourceAttribution, ContentType
+    from boilerplate import BoilerplateLearner
+    from keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +43,10 @@ class EnhancedContentExtractor:
     Multi-strategy content extractor inspired by MissionLocal techniques
     """
 
-    def __init__(self):
+    def __init__(self, boilerplate_learner: Optional[BoilerplateLearner] = None):
+        # Optional per-site template learner, strips repeated blocks before extraction
+        self.boilerplate_learner = boilerplate_learner
+
         # Content selectors organized by priority and specificity
         self.content_selectors = [
             # High specificity - article content
@@ -91,10 +98,12 @@ class EnhancedContentExtractor:
             ContentType.NEWS: ['news', 'breaking', 'announces', 'released'],
             ContentType.PODCAST_TRANSCRIPT: ['transcript', 'fresh air', 'npr']
         }
+        self.content_type_matcher = KeywordMatcher(self.content_type_patterns)
 
-    def extract_content(self, html: str, url: str, source_name: str) -> ExtractionResult:
+    def extract_content(self, html: str, url: str, source_name: str, soup: Optional[BeautifulSoup] = None) -> ExtractionResult:
         """
         Extract content using multi-fallback strategy
+        Pass soup when the page was already parsed while streaming
         """
         if not html or len(html) < 100:
             return ExtractionResult(
@@ -102,7 +111,15 @@ class EnhancedContentExtractor:
                 errors=["HTML content too short or empty"]
             )
 
-        soup = BeautifulSoup(html, 'html.parser')
+        if soup is None:
+            soup = BeautifulSoup(html, 'html.parser')
+
+        # Drop site template blocks learned from other pages of this source
+        if self.boilerplate_learner:
+            try:
+                self.boilerplate_learner.process(soup, url)
+            except Exception as e:
+                logger.debug(f"Boilerplate stripping failed for {url}: {e}")
 
         # Try multiple extraction strategies
         strategies = [
@@ -332,18 +349,12 @@ class EnhancedContentExtractor:
 
     def _detect_content_type(self, title: str, content: str, url: str) -> ContentType:
         """Detect content type based on title, content, and URL"""
-        title_lower = title.lower() if title else ""
-        content_lower = content.lower() if content else ""
-        url_lower = url.lower()
-
-        # Check patterns
-        for content_type, patterns in self.content_type_patterns.items():
-            for pattern in patterns:
-                if pattern in title_lower or pattern in url_lower or pattern in content_lower[:500]:
-                    return content_type
+        # First content type (in pattern order) with a hit in title, URL or lead
+        hits = self.content_type_matcher.scan(title, url, content[:500] if content else None)
+        content_type = hits.first_family()
 
         # Default to article
-        return ContentType.ARTICLE
+        return content_type or ContentType.ARTICLE
 
     def _build_scraped_content(self, content_data: Dict[str, Any], url: str, source_name: str) -> ScrapedContent:
         """Build ScrapedContent object from extracted data"""
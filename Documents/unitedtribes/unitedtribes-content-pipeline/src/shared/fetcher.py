@@ -9,9 +9,15 @@ from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 from urllib.parse import quote_plus
 from bs4 import BeautifulSoup
+import codecs
 import time
 import hashlib
 
+try:
+    from .streaming_parser import IncrementalSoupBuilder, streaming_available
+except ImportError:
+    from streaming_parser import IncrementalSoupBuilder, streaming_available
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +32,7 @@ class FetchResult:
     method: str = "direct"  # direct, archive_ph, archive_org, cached
     error_message: Optional[str] = None
     metadata: Dict[str, Any] = None
+    soup: Any = None  # Parsed tree when fetched with stream_parse
 
     def __post_init__(self):
         if self.metadata is None:
@@ -38,11 +45,24 @@ class EnhancedFetcher:
     Incorporates MissionLocal techniques for paywall circumvention
     """
 
-    def __init__(self, rate_limit: float = 1.0):
+    def __init__(
+        self,
+        rate_limit: float = 1.0,
+        stream_parse: bool = False,
+        stop_at_article_end: bool = False,
+        chunk_size: int = 16384
+    ):
         self.rate_limit = rate_limit  # requests per second
         self.last_request_time = 0.0
         self.session = None
 
+        # Parse direct fetches incrementally as the body streams in
+        self.stream_parse = stream_parse and streaming_available()
+        self.stop_at_article_end = stop_at_article_end
+        self.chunk_size = chunk_size
+        if stream_parse and not self.stream_parse:
+            logger.warning("Installed beautifulsoup4 does not support incremental parsing, streaming parse disabled")
+
         # Headers for legitimate browsing behavior
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -103,6 +123,9 @@ class EnhancedFetcher:
         """Direct fetch (try first)"""
         await self._respect_rate_limit()
 
+        if self.stream_parse:
+            return await self._fetch_direct_streaming(url)
+
         try:
             async with self.session.get(url) as response:
                 content = await response.text()
@@ -125,6 +148,82 @@ class EnhancedFetcher:
                 method="direct"
             )
 
+    async def _fetch_direct_streaming(self, url: str) -> FetchResult:
+        """
+        Direct fetch that parses chunks while the body downloads
+        Optionally stops reading once a complete <article> has been parsed. The rest
+        of the page is then never read: JSON-LD and meta tags placed after the article
+        are missing from the soup, and content holds only the HTML read so far
+        (metadata["stopped_at_article_end"] marks these results)
+        """
+        try:
+            async with self.session.get(url) as response:
+                metadata = {"response_headers": dict(response.headers), "stream_parsed": True}
+
+                if response.status != 200:
+                    return FetchResult(
+                        success=False,
+                        status_code=response.status,
+                        url=url,
+                        final_url=str(response.url),
+                        method="direct",
+                        metadata=metadata
+                    )
+
+                try:
+                    # The Content-Type charset, as response.text() uses it
+                    encoding = response.get_encoding()
+                except RuntimeError:
+                    # None declared: aiohttp's fallback detection needs the whole body, read it as the buffered path does
+                    metadata["stream_parsed"] = False
+                    return FetchResult(
+                        success=True,
+                        content=await response.text(),
+                        status_code=response.status,
+                        url=url,
+                        final_url=str(response.url),
+                        method="direct",
+                        metadata=metadata
+                    )
+
+                builder = IncrementalSoupBuilder(stop_at_article_end=self.stop_at_article_end)
+                decoder = codecs.getincrementaldecoder(encoding)()
+                parts = []
+                stopped_early = False
+
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    text = decoder.decode(chunk)
+                    parts.append(text)
+                    if builder.feed(text):
+                        stopped_early = True
+                        break
+
+                if not stopped_early:
+                    text = decoder.decode(b'', final=True)
+                    parts.append(text)
+                    builder.feed(text)
+
+                metadata["stopped_at_article_end"] = stopped_early
+
+                return FetchResult(
+                    success=True,
+                    content=''.join(parts),
+                    status_code=response.status,
+                    url=url,
+                    final_url=str(response.url),
+                    method="direct",
+                    metadata=metadata,
+                    soup=builder.close()
+                )
+
+        except Exception as e:
+            return FetchResult(
+                success=False,
+                url=url,
+                error_message=str(e),
+                method="direct"
+            )
+
     async def _fetch_via_archive_ph(self, url: str) -> FetchResult:
         """
         Fetch via archive.ph (MissionLocal technique)
@@ -0,0 +1,132 @@
+"""
+Multi-pattern keyword matching shared by content-type detection,
+thematic categorisation and music/jazz relevance checks
+Scans a text once for every keyword family and reports which keywords hit
+"""
+
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Music relevance keywords (shared by scraper pre-filter and validator)
+MUSIC_KEYWORDS = [
+    'music', 'album', 'song', 'artist', 'band', 'musician', 'singer',
+    'concert', 'tour', 'festival', 'record', 'recording', 'studio',
+    'genre', 'jazz', 'rock', 'pop', 'hip-hop', 'classical', 'folk',
+    'guitar', 'piano', 'drums', 'vocals', 'lyrics', 'melody'
+]
+
+# Jazz relevance keywords for the NPR jazz harvest
+JAZZ_KEYWORDS = [
+    'jazz', 'bebop', 'hard bop', 'blue note', 'fresh air',
+    'terry gross', 'saxophone', 'trumpet', 'pianist'
+]
+
+# Separator for scanning several fields at once, no keyword contains it
+FIELD_SEPARATOR = '\n'
+
+
+@dataclass
+class KeywordHits:
+    """Distinct keywords found per family"""
+    matched: Dict[Any, Set[str]] = field(default_factory=dict)
+    family_order: Tuple[Any, ...] = ()
+
+    def count(self, family: Any) -> int:
+        """Number of distinct keywords of a family present in the text"""
+        return len(self.matched.get(family, ()))
+
+    def any(self, family: Any) -> bool:
+        return bool(self.matched.get(family))
+
+    def first_family(self) -> Optional[Any]:
+        """First family, in definition order, with at least one hit"""
+        for family in self.family_order:
+            if self.matched.get(family):
+                return family
+        return None
+
+    @property
+    def counts(self) -> Dict[Any, int]:
+        return {family: self.count(family) for family in self.family_order}
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher over several keyword families
+    Uses a compiled Aho-Corasick automaton (pyahocorasick) when installed,
+    otherwise one lowercased copy searched per distinct keyword, skipping
+    keywords already implied by a longer hit
+    """
+
+    def __init__(self, families: Dict[Any, List[str]], cache_size: int = 64):
+        self.families = {family: [kw.lower() for kw in keywords] for family, keywords in families.items()}
+        self.family_order = tuple(self.families)
+
+        # keyword -> families it belongs to
+        self._keyword_families: Dict[str, List[Any]] = {}
+        for family, keywords in self.families.items():
+            for keyword in keywords:
+                self._keyword_families.setdefault(keyword, [])
+                if family not in self._keyword_families[keyword]:
+                    self._keyword_families[keyword].append(family)
+
+        # Longest first so substring closure can skip shorter keywords
+        self._keywords = sorted(self._keyword_families, key=lambda kw: (-len(kw), kw))
+        self._implied = {
+            kw: [other for other in self._keywords if other != kw and other in kw]
+            for kw in self._keywords
+        }
+
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+        # Several call sites scan the same text, share the result
+        self._scan_cached = lru_cache(maxsize=cache_size)(self._scan_text)
+
+    def scan(self, *texts: Optional[str]) -> KeywordHits:
+        """Scan one or more texts (e.g. title, url, lead) in a single pass"""
+        text = FIELD_SEPARATOR.join(t for t in texts if t)
+        found = self._scan_cached(text)
+
+        matched: Dict[Any, Set[str]] = {family: set() for family in self.family_order}
+        for keyword in found:
+            for family in self._keyword_families[keyword]:
+                matched[family].add(keyword)
+
+        return KeywordHits(matched=matched, family_order=self.family_order)
+
+    def _scan_text(self, text: str) -> frozenset:
+        """Distinct keywords occurring anywhere in text"""
+        if not text:
+            return frozenset()
+
+        text_lower = text.lower()
+
+        if self._automaton is not None:
+            return frozenset(keyword for _, keyword in self._automaton.iter(text_lower))
+
+        found: Set[str] = set()
+        for keyword in self._keywords:
+            if keyword in found:
+                continue
+            if keyword in text_lower:
+                found.add(keyword)
+                found.update(self._implied[keyword])
+        return frozenset(found)
+
+
+# Shared matcher for music and jazz relevance over title + content
+RELEVANCE_MATCHER = KeywordMatcher({'music': MUSIC_KEYWORDS, 'jazz': JAZZ_KEYWORDS})
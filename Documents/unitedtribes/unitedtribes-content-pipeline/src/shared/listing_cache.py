@@ -0,0 +1,207 @@
+"""
+Incremental prefix listings
+A full listing of a prefix is kept on local disk with the last key seen;
+later listings only ask S3 for keys after it (StartAfter), so a repeat
+listing of scraped-content/ is one page request instead of thousands.
+Keys rolled back since are dropped using the deletions recorded in the
+upload journals
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from .aws_clients import get_client
+    from .cache_dirs import CACHE_ROOT, writable_dir
+    from .serialization import decode_json, encode_json
+    from .upload_journal import deleted_keys_since
+except ImportError:
+    from aws_clients import get_client
+    from cache_dirs import CACHE_ROOT, writable_dir
+    from serialization import decode_json, encode_json
+    from upload_journal import deleted_keys_since
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = CACHE_ROOT / "listings"
+CACHE_VERSION = 1
+
+# Keys S3ContentUploader writes under this prefix are also in the partition index
+_INDEXED_PREFIX = "scraped-content/"
+
+
+class ListingCache:
+    """
+    Cached list_objects_v2 listings, one local file per bucket and prefix
+    StartAfter only finds keys sorting after the last one seen; keys written
+    in between (a new document for an earlier artist) are picked up from the
+    partition index when one is given, and a listing older than max_age is
+    redone in full to catch anything written or deleted outside the uploader
+    """
+
+    def __init__(
+        self,
+        bucket_name: str = "ut-v2-prod-lake-east1",
+        s3_client=None,
+        partition_index=None,
+        cache_dir: Optional[Path] = None,
+        journal_dir: Optional[Path] = None,
+        max_age: timedelta = timedelta(days=1)
+    ):
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client
+        self.partition_index = partition_index
+        self.cache_dir = Path(cache_dir) if cache_dir else writable_dir(DEFAULT_CACHE_DIR)
+        self.journal_dir = journal_dir
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def list_keys(self, prefix: str, refresh: bool = False) -> List[str]:
+        """Every key under prefix in key order, listing only what is new since the cached listing"""
+        with self._lock:
+            listing = None if refresh else self._read(prefix)
+            now = datetime.utcnow()
+            if listing is None or now - datetime.fromisoformat(listing["listed_at"]) > self.max_age:
+                listing = self._full_listing(prefix, now)
+            else:
+                self._update(listing, now)
+            self._write(prefix, listing)
+            return listing["keys"]
+
+    def forget(self, keys: Iterable[str]):
+        """Drop deleted keys from every cached listing holding them"""
+        keys = set(keys)
+        with self._lock:
+            for path in self._cache_files():
+                listing = self._read_path(path)
+                if listing is None:
+                    continue
+                remaining = [key for key in listing["keys"] if key not in keys]
+                if len(remaining) != len(listing["keys"]):
+                    listing["keys"] = remaining
+                    self._write(listing["prefix"], listing)
+
+    def invalidate(self, prefix: Optional[str] = None):
+        """Discard the cached listing of prefix, or of every prefix"""
+        with self._lock:
+            paths = [self._path(prefix)] if prefix is not None else self._cache_files()
+            for path in paths:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _full_listing(self, prefix: str, now: datetime) -> Dict[str, Any]:
+        keys = self._list_after(prefix, None)
+        logger.info(f"📂 Listed {len(keys)} keys under {prefix}")
+        return {
+            "version": CACHE_VERSION,
+            "prefix": prefix,
+            "last_key": keys[-1] if keys else None,
+            "listed_at": now.isoformat(),
+            "refreshed_at": now.isoformat(),
+            "journals_checked": time.time(),
+            "keys": keys
+        }
+
+    def _update(self, listing: Dict[str, Any], now: datetime):
+        """Apply rollbacks recorded since the last refresh, then add keys written since"""
+        prefix = listing["prefix"]
+        journals_checked = time.time()
+        cached = set(listing["keys"])
+        keys = cached - deleted_keys_since(listing["journals_checked"], self.journal_dir)
+
+        new_keys = self._list_after(prefix, listing["last_key"])
+        keys.update(new_keys)
+        if self.partition_index is not None and prefix.startswith(_INDEXED_PREFIX):
+            since = datetime.fromisoformat(listing["refreshed_at"]).date()
+            keys.update(key for key in self.partition_index.keys_since(since) if key.startswith(prefix))
+
+        logger.info(f"📂 Listing of {prefix}: {len(keys - cached)} new keys, "
+                    f"{len(cached - keys)} rolled back, {len(keys)} in total")
+        listing["keys"] = sorted(keys)
+        if new_keys:
+            listing["last_key"] = new_keys[-1]
+        listing["refreshed_at"] = now.isoformat()
+        listing["journals_checked"] = journals_checked
+
+    def _list_after(self, prefix: str, start_after: Optional[str]) -> List[str]:
+        kwargs = {'StartAfter': start_after} if start_after else {}
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        keys = []
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, **kwargs):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return keys
+
+    def _path(self, prefix: str) -> Path:
+        digest = hashlib.sha1(f"{self.bucket_name}/{prefix}".encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{self.bucket_name}_{digest}.json"
+
+    def _cache_files(self) -> List[Path]:
+        return sorted(self.cache_dir.glob(f"{self.bucket_name}_*.json"))
+
+    def _read(self, prefix: str) -> Optional[Dict[str, Any]]:
+        listing = self._read_path(self._path(prefix))
+        return listing if listing is not None and listing["prefix"] == prefix else None
+
+    @staticmethod
+    def _read_path(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            listing = decode_json(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        return listing if listing.get("version") == CACHE_VERSION else None
+
+    def _write(self, prefix: str, listing: Dict[str, Any]):
+        """Best effort, a missing cache only costs a full listing"""
+        path = self._path(prefix)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(encode_json(listing))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache listing of {prefix} locally: {e}")
+
+    def _get_s3_client(self):
+        if self.s3_client is None:
+            self.s3_client = get_client('s3')
+        return self.s3_client
+
+
+def main():
+    """List a prefix through the cache"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cached incremental S3 prefix listings")
+    parser.add_argument("prefix", help="Prefix to list, e.g. scraped-content/")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--refresh", action="store_true", help="Redo the listing in full")
+    parser.add_argument("--count", action="store_true", help="Print the number of keys only")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        from .partition_index import PartitionIndex
+    except ImportError:
+        from partition_index import PartitionIndex
+
+    cache = ListingCache(args.bucket, partition_index=PartitionIndex(args.bucket))
+    keys = cache.list_keys(args.prefix, refresh=args.refresh)
+    if not args.count:
+        for key in keys:
+            print(key)
+    print(f"📂 {len(keys)} keys under {args.prefix}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,13 +3,88 @@ Shared data models for United Tribes Content Scrapers v3
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Union, Tuple
+from dataclasses import dataclass, field, fields
 from enum import Enum
 from pydantic import BaseModel, Field
 import hashlib
+import sys
 from ulid import ULID, new
 
+try:
+    from .serialization import encode_json
+except ImportError:
+    from serialization import encode_json
+
+
+def _slotted(*lazy_fields: str):
+    """
+    Rebuild a dataclass with __slots__ and no per-instance __dict__
+    Equivalent to dataclass(slots=True), which needs Python 3.10. Each lazy
+    field is stored in a "_<name>" slot and exposed as a property that
+    calls the class's _compute_<name> on first read while the slot is None
+    """
+    def wrap(cls):
+        field_names = tuple(f.name for f in fields(cls))
+        namespace = dict(cls.__dict__)
+        for name in field_names:
+            # Defaults live in the generated __init__, class attributes would clash with the slots
+            namespace.pop(name, None)
+        namespace.pop('__dict__', None)
+        namespace.pop('__weakref__', None)
+        namespace['__slots__'] = tuple('_' + name if name in lazy_fields else name for name in field_names)
+
+        for name in lazy_fields:
+            namespace[name] = _lazy_property('_' + name, cls.__dict__['_compute_' + name])
+
+        slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+        slotted.__qualname__ = cls.__qualname__
+        return slotted
+
+    return wrap
+
+
+def _lazy_property(slot: str, compute) -> property:
+    def get(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = compute(self)
+            setattr(self, slot, value)
+        return value
+
+    def set(self, value):
+        setattr(self, slot, value)
+
+    return property(get, set)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Share one copy of strings repeated across many items (sources, types, authors)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Characters str.split() treats as whitespace (str.isspace()), other than the plain space
+_ASCII_OTHER_WHITESPACE = tuple('\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f')
+_OTHER_WHITESPACE = _ASCII_OTHER_WHITESPACE + tuple(
+    '\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008'
+    '\u2009\u200a\u2028\u2029\u202f\u205f\u3000'
+)
+
+
+def count_words(text: str) -> int:
+    """
+    Same as len(text.split()) without building the word list
+    Extracted text is normalised to single spaces, so words are counted
+    from the spaces unless other whitespace or double spaces are present
+    """
+    if not text:
+        return 0
+
+    other = _ASCII_OTHER_WHITESPACE if text.isascii() else _OTHER_WHITESPACE
+    if '  ' in text or any(c in text for c in other):
+        return len(text.split())
+    return text.count(' ') + 1 - text.startswith(' ') - text.endswith(' ')
+
 
 class ContentType(str, Enum):
     """Types of content we scrape"""
@@ -32,6 +107,7 @@ class Source(str, Enum):
     SUBSTACK = "substack"
 
 
+@_slotted()
 @dataclass
 class SourceAttribution:
     """Complete source attribution for citations"""
@@ -44,6 +120,13 @@ class SourceAttribution:
     content_type: Optional[str] = None  # review, news, feature, etc.
     episode_info: Optional[Dict[str, Any]] = None  # For podcasts
 
+    def __post_init__(self):
+        """Intern strings shared by every item of a source"""
+        self.source = _intern(self.source)
+        self.author = _intern(self.author)
+        self.publication_type = _intern(self.publication_type)
+        self.content_type = _intern(self.content_type)
+
     def to_citation_format(self) -> str:
         """Generate citation string for API responses"""
         base = f'[Source: "{self.source}"'
@@ -53,6 +136,7 @@ class SourceAttribution:
         return base
 
 
+@_slotted('word_count', 'content_hash', 's3_key')
 @dataclass
 class ScrapedContent:
     """Main scraped content container"""
@@ -69,27 +153,49 @@ class ScrapedContent:
     source_attribution: SourceAttribution = None
     scraped_at: datetime = field(default_factory=datetime.utcnow)
     confidence_score: float = 0.0
-    word_count: int = 0
+    word_count: Optional[int] = None    # Computed from content on first read
 
     # Processing info
     extraction_method: str = "unknown"
     validation_passed: bool = False
 
-    # S3 storage
+    # S3 storage (derived on first read unless set)
     s3_key: Optional[str] = None
     content_hash: Optional[str] = None
 
+    # Memoised (cache_key, ValidationResult) from ContentValidator
+    validation_cache: Optional[Tuple[Any, Any]] = field(default=None, repr=False, compare=False)
+
+    # Memoised (cache_key, bytes) of the encoded v3 document
+    serialized_cache: Optional[Tuple[Any, bytes]] = field(default=None, repr=False, compare=False)
+
     def __post_init__(self):
-        """Calculate derived fields"""
+        """Derived fields are computed on first read, candidates that are discarded never pay for them"""
+        self.extraction_method = _intern(self.extraction_method)
+
         if self.content:
-            self.word_count = len(self.content.split())
-            self.content_hash = hashlib.sha256(self.content.encode()).hexdigest()[:16]
+            # Always derived from the content when there is any
+            self._word_count = None
+            self._content_hash = None
+
+        if not self._s3_key:
+            self._s3_key = None
+
+    def _compute_word_count(self) -> int:
+        return count_words(self.content)
+
+    def _compute_content_hash(self) -> Optional[str]:
+        if not self.content:
+            return None
+        return hashlib.sha256(self.content.encode()).hexdigest()[:16]
 
-        if not self.s3_key and self.source_attribution:
-            # Generate S3 key: source/YYYY/MM/DD/content-{hash}.json
-            date_str = self.scraped_at.strftime("%Y/%m/%d")
-            source = self.source_attribution.source.lower().replace(" ", "_")
-            self.s3_key = f"scraped-content/{source}/{date_str}/content-{self.content_hash}.json"
+    def _compute_s3_key(self) -> Optional[str]:
+        if not self.source_attribution:
+            return None
+        # Generate S3 key: source/YYYY/MM/DD/content-{hash}.json
+        date_str = self.scraped_at.strftime("%Y/%m/%d")
+        source = self.source_attribution.source.lower().replace(" ", "_")
+        return f"scraped-content/{source}/{date_str}/content-{self.content_hash}.json"
 
     def to_v3_format(self) -> Dict[str, Any]:
         """Convert to v3 data lake format"""
@@ -120,6 +226,54 @@ class ScrapedContent:
             "s3_key": self.s3_key
         }
 
+    @classmethod
+    def from_v3_format(cls, data: Dict[str, Any]) -> "ScrapedContent":
+        """Rebuild content from a v3 data lake document (inverse of to_v3_format)"""
+        metadata = data.get("metadata") or {}
+        attribution = data.get("source_attribution")
+        scraped_at = metadata.get("scraped_at")
+
+        return cls(
+            id=data.get("id", ""),
+            url=data.get("url", ""),
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            content_type=ContentType(data.get("content_type", ContentType.ARTICLE.value)),
+            source_attribution=SourceAttribution(**attribution) if attribution else None,
+            scraped_at=datetime.fromisoformat(scraped_at) if scraped_at else datetime.utcnow(),
+            confidence_score=metadata.get("confidence_score", 0.0),
+            extraction_method=metadata.get("extraction_method", "unknown"),
+            validation_passed=metadata.get("validation_passed", False),
+            s3_key=data.get("s3_key")
+        )
+
+    def to_v3_bytes(self) -> bytes:
+        """Encoded v3 document, re-encoded only when a serialized field changes"""
+        cache_key = self._v3_cache_key()
+        if self.serialized_cache is not None and self.serialized_cache[0] == cache_key:
+            return self.serialized_cache[1]
+
+        document = encode_json(self.to_v3_format())
+        self.serialized_cache = (cache_key, document)
+        return document
+
+    def _v3_cache_key(self) -> Tuple:
+        """Every to_v3_format input, with the body stood in for by its hash and length"""
+        attribution = self.source_attribution
+        attribution_key = None
+        if attribution:
+            attribution_key = (
+                attribution.source, attribution.title, attribution.url, attribution.author,
+                attribution.publication_date, attribution.publication_type,
+                attribution.content_type, repr(attribution.episode_info)
+            )
+
+        return (
+            self.id, self.url, self.title, self.content_hash, len(self.content), self.content_type,
+            attribution_key, self.scraped_at, self.confidence_score, self.word_count,
+            self.extraction_method, self.validation_passed, self.s3_key
+        )
+
 
 @dataclass
 class DiscoveryResult:
@@ -186,6 +340,25 @@ class ScrapingBatch:
             "data_prefix": f"scraped-content/{self.source.value if self.source else 'unknown'}"
         }
 
+    def to_arrow(self, items: Optional[List[ScrapedContent]] = None):
+        """
+        Arrow table with one row per content item (requires pyarrow)
+        Imported on use so scrapers that never export do not load pyarrow
+        """
+        try:
+            from .columnar import batch_to_table
+        except ImportError:
+            from columnar import batch_to_table
+        return batch_to_table(self, items)
+
+    def to_parquet(self, items: Optional[List[ScrapedContent]] = None, compression: str = "zstd") -> bytes:
+        """Parquet encoding of to_arrow()"""
+        try:
+            from .columnar import table_to_parquet
+        except ImportError:
+            from columnar import table_to_parquet
+        return table_to_parquet(self.to_arrow(items), compression)
+
 
 class ScrapingError(Exception):
     """Custom exception for scraping errors"""
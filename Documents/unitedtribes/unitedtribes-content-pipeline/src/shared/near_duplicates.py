@@ -0,0 +1,647 @@
+"""
+Near-duplicate detection across batches and runs
+Word shingles are summarised as MinHash signatures and bucketed with
+locality sensitive hashing (LSH) in a SQLite index, so syndicated copies
+(NPR vs Fresh Air, archive vs direct fetches) are caught before upload.
+The SQLite file is a local working copy; indexes given a bucket share
+their changes through S3 as delta objects and a periodic snapshot of the
+SQLite file itself, so hosts with ephemeral disks (Lambda) see every run's
+documents
+"""
+
+import base64
+import gzip
+import hashlib
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .aws_clients import CONFLICT_CODES, MISSING_CODES, conditional_put, get_client
+    from .cache_dirs import CACHE_ROOT, writable_dir
+    from .serialization import compress, decode_json, encode_json
+except ImportError:
+    from aws_clients import CONFLICT_CODES, MISSING_CODES, conditional_put, get_client
+    from cache_dirs import CACHE_ROOT, writable_dir
+    from serialization import compress, decode_json, encode_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = CACHE_ROOT / "near_duplicates"
+
+SYNC_PREFIX = "indexes/near-duplicates/"
+SYNC_VERSION = 1
+# Deltas since the snapshot before a save() writes a new one
+COMPACT_AFTER_DELTAS = 100
+COMPACT_AFTER_AGE = timedelta(days=1)
+# Delta keys are timestamps from many hosts, so recent ones may still appear
+# out of order; each load re-reads this window (re-applying is idempotent)
+_DELTA_LAG = timedelta(minutes=15)
+# A local copy not synced for this long is rebuilt from the snapshot
+_MAX_SYNC_AGE = timedelta(days=7)
+# DeleteObjects accepts at most 1000 keys per request
+_DELETE_BATCH_SIZE = 1000
+# Snapshot files are streamed to and from S3 in chunks of this size
+_CHUNK_SIZE = 1 << 20
+
+# Multiply-shift hashing: 64-bit products, top 32 bits kept
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_MAX_HASH = 0xFFFFFFFF
+# Odd multiplier combining consecutive word hashes into a shingle hash
+_SHINGLE_MULTIPLIER = 0x9E3779B97F4A7C15
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash LSH index
+    Signatures of num_perm 32-bit hashes are split into bands of rows;
+    documents sharing any band bucket are candidates, confirmed when the
+    estimated Jaccard similarity of their shingle sets reaches threshold.
+    With a bucket_name, load() and save() sync the index through S3
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        threshold: float = 0.8,
+        seed: int = 1,
+        bucket_name: Optional[str] = None,
+        s3_client=None,
+        prefix: str = SYNC_PREFIX
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        # Fixed permutation parameters so signatures stay comparable across runs
+        rng = _SplitMix64(seed)
+        self._a = [rng.next() | 1 for _ in range(num_perm)]
+        self._b = [rng.next() for _ in range(num_perm)]
+        if np is not None:
+            self._np_a = np.array(self._a, dtype=np.uint64)
+            self._np_b = np.array(self._b, dtype=np.uint64)
+
+        if db_path is None:
+            db_path = str(writable_dir(DEFAULT_CACHE_DIR) / (f"minhash_lsh_{bucket_name}.sqlite" if bucket_name else "minhash_lsh.sqlite"))
+        self.db_path = db_path
+
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client
+        self.prefix = prefix
+        # Changes not yet written to S3, in order, as ("add", doc_id, url, signature) or ("remove", doc_id)
+        self._changes: List[Tuple] = []
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_schema()
+
+    def find_duplicate(self, text: str) -> Optional[Tuple[str, float]]:
+        """Most similar indexed document at or above threshold, as (doc_id, similarity)"""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        return self._best_match(signature)
+
+    def add(self, doc_id: str, text: str, url: Optional[str] = None) -> bool:
+        """Index a document, returns False for texts too short to fingerprint"""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        self._insert(doc_id, signature, url)
+        return True
+
+    def check_and_add(self, doc_id: str, text: str, url: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Return the near duplicate if there is one, otherwise index the document"""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        match = self._best_match(signature)
+        if match is None:
+            self._insert(doc_id, signature, url)
+        return match
+
+    def remove(self, doc_ids: Iterable[str]) -> int:
+        """Drop documents from the index (e.g. objects deleted by a rollback), returns how many were indexed"""
+        removed = 0
+        with self._lock:
+            with self._conn:
+                for doc_id in doc_ids:
+                    removed += self._delete(doc_id)
+                    if self.bucket_name:
+                        self._changes.append(("remove", doc_id))
+        return removed
+
+    def load(self) -> int:
+        """Apply the changes other runs saved to S3 since the last load, returns how many deltas were read"""
+        if not self.bucket_name:
+            return 0
+        return self._sync(restore=False)
+
+    def save(self) -> bool:
+        """Write changes since the last save to S3 as one delta object, returns False when there was nothing to write"""
+        if not self.bucket_name:
+            return False
+        with self._lock:
+            changes, self._changes = self._changes, []
+        if not changes:
+            return False
+
+        operations = [
+            [change[0], change[1], change[2], base64.b64encode(self._pack(change[3])).decode('ascii')]
+            if change[0] == "add" else list(change)
+            for change in changes
+        ]
+        body = compress(encode_json({"version": SYNC_VERSION, "params": self._params(), "changes": operations}), 'gzip')
+        delta_key = self._delta_key(datetime.utcnow(), f"-{uuid.uuid4().hex[:8]}.json.gz")
+        try:
+            self._get_s3_client().put_object(Bucket=self.bucket_name, Key=delta_key, Body=body,
+                                             ContentType='application/json', ContentEncoding='gzip')
+        except Exception:
+            with self._lock:
+                self._changes[:0] = changes
+            raise
+
+        deltas = int(self._get_meta('deltas_since_snapshot') or 0) + 1
+        self._set_meta(deltas_since_snapshot=str(deltas))
+        # A copy that never loaded may be missing documents, it does not write snapshots
+        snapshot_at = self._get_meta('snapshot_at')
+        if snapshot_at is not None and (self._get_meta('snapshot_etag') is None or deltas >= COMPACT_AFTER_DELTAS
+                                        or datetime.utcnow() - datetime.fromisoformat(snapshot_at) > COMPACT_AFTER_AGE):
+            self._compact()
+        return True
+
+    def signature(self, text: str) -> Optional[List[int]]:
+        """MinHash signature of the text's word shingles, None when it has no shingles"""
+        words = _WORD.findall(text.lower()) if text else []
+        if len(words) < self.shingle_size:
+            return None
+
+        word_hashes = [zlib.crc32(word.encode('utf-8')) for word in words]
+
+        if np is not None:
+            shingles = self._np_shingle_hashes(word_hashes)
+            # uint64 arithmetic wraps, which is the mod 2^64 multiply-shift needs;
+            # the shift is monotonic so it is applied to the minima only
+            hashed = np.multiply.outer(shingles, self._np_a)
+            hashed += self._np_b
+            return (hashed.min(axis=0) >> np.uint64(32)).tolist()
+
+        shingles = self._shingle_hashes(word_hashes)
+        return [
+            min(((a * value + b) & _MASK64) >> 32 for value in shingles)
+            for a, b in zip(self._a, self._b)
+        ]
+
+    def similarity(self, signature_a: List[int], signature_b: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        same = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return same / self.num_perm
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _shingle_hashes(self, word_hashes: List[int]) -> set:
+        """32-bit hash of each run of shingle_size words"""
+        k = self.shingle_size
+        shingles = set()
+        for i in range(len(word_hashes) - k + 1):
+            value = 0
+            for word_hash in word_hashes[i:i + k]:
+                value = (value * _SHINGLE_MULTIPLIER + word_hash) & _MASK64
+            shingles.add((value ^ (value >> 32)) & _MAX_HASH)
+        return shingles
+
+    def _np_shingle_hashes(self, word_hashes: List[int]):
+        """Vectorised _shingle_hashes, duplicates are kept since they cannot change a minimum"""
+        words = np.array(word_hashes, dtype=np.uint64)
+        k = self.shingle_size
+        count = len(word_hashes) - k + 1
+        multiplier = np.uint64(_SHINGLE_MULTIPLIER)
+
+        values = np.zeros(count, dtype=np.uint64)
+        for offset in range(k):
+            values = values * multiplier + words[offset:offset + count]
+        return (values ^ (values >> np.uint64(32))) & np.uint64(_MAX_HASH)
+
+    def _band_buckets(self, signature: List[int]) -> List[int]:
+        """One signed 64-bit bucket id per band, the band number is part of the hash"""
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                band.to_bytes(2, 'little') + b''.join(r.to_bytes(4, 'little') for r in rows),
+                digest_size=8
+            ).digest()
+            buckets.append(int.from_bytes(digest, 'little', signed=True))
+        return buckets
+
+    def _best_match(self, signature: List[int]) -> Optional[Tuple[str, float]]:
+        buckets = self._band_buckets(signature)
+        placeholders = ','.join('?' * len(buckets))
+
+        with self._lock:
+            candidates = self._conn.execute(
+                f"SELECT d.doc_id, d.signature FROM documents d WHERE d.id IN "
+                f"(SELECT doc FROM bands WHERE bucket IN ({placeholders}))",
+                buckets
+            ).fetchall()
+
+        best = None
+        for doc_id, blob in candidates:
+            score = self.similarity(signature, self._unpack(blob))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+    def _insert(self, doc_id: str, signature: List[int], url: Optional[str]):
+        with self._lock:
+            with self._conn:
+                self._store(doc_id, signature, url)
+                if self.bucket_name:
+                    self._changes.append(("add", doc_id, url, signature))
+
+    def _store(self, doc_id: str, signature: List[int], url: Optional[str]):
+        """Write a document and its band buckets, called with the lock held inside a transaction"""
+        # Re-indexing a document replaces its signature and buckets
+        self._delete(doc_id)
+        row_id = self._conn.execute(
+            "INSERT INTO documents (doc_id, url, signature, added_at) VALUES (?, ?, ?, ?)",
+            (doc_id, url, self._pack(signature), datetime.utcnow().isoformat())
+        ).lastrowid
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO bands (bucket, doc) VALUES (?, ?)",
+            [(bucket, row_id) for bucket in self._band_buckets(signature)]
+        )
+
+    def _delete(self, doc_id: str) -> int:
+        row = self._conn.execute("SELECT id FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return 0
+        self._conn.execute("DELETE FROM bands WHERE doc = ?", (row[0],))
+        self._conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+        return 1
+
+    def _apply_delta(self, delta: Dict[str, Any]):
+        self._check_params(delta)
+        with self._lock:
+            with self._conn:
+                for change in delta["changes"]:
+                    if change[0] == "add":
+                        self._store(change[1], self._unpack(base64.b64decode(change[3])), change[2])
+                    else:
+                        self._delete(change[1])
+
+    def _sync(self, restore: bool) -> int:
+        now = datetime.utcnow()
+        synced_at = self._get_meta('synced_at')
+        sync_after = self._get_meta('sync_after')
+
+        # A copy that never synced takes the snapshot in. A copy too stale to catch up, or
+        # behind a newer snapshot (whose compaction may have deleted the deltas it needs), is
+        # replaced by it: the snapshot is a SQLite file, copied in without re-inserting rows
+        snapshot = self._head_snapshot()
+        behind = (snapshot is not None and snapshot["etag"] != self._get_meta('snapshot_etag')
+                  and snapshot["after"] and (not sync_after or sync_after < snapshot["after"]))
+        restored = restore or synced_at is None or behind or now - datetime.fromisoformat(synced_at) > _MAX_SYNC_AGE
+        if restored:
+            sync_after = self._load_snapshot(merge=synced_at is None and not restore and len(self) > 0)
+
+        start_after = None
+        if sync_after:
+            start_after = self._delta_key(_delta_time(sync_after, self.prefix) - _DELTA_LAG, '')
+        delta_keys = list(self._list_keys(f"{self.prefix}deltas/", start_after))
+
+        for delta_key in delta_keys:
+            try:
+                delta = self._get_object(delta_key)
+            except ClientError as e:
+                # Deleted by a compaction since it was listed: the new snapshot covers it
+                if e.response['Error']['Code'] not in MISSING_CODES or restore:
+                    raise
+                logger.info(f"🔄 Near-duplicate delta {delta_key} was compacted meanwhile, restoring the snapshot")
+                return self._sync(restore=True)
+            self._apply_delta(decode_json(delta))
+
+        new_deltas = sum(1 for delta_key in delta_keys if not sync_after or delta_key > sync_after)
+        self._set_meta(
+            sync_after=delta_keys[-1] if delta_keys and (not sync_after or delta_keys[-1] > sync_after) else sync_after,
+            synced_at=now.isoformat(),
+            deltas_since_snapshot=str(int(self._get_meta('deltas_since_snapshot') or 0) + new_deltas)
+        )
+        logger.info(f"🔍 Near-duplicate index synced: {new_deltas} new deltas"
+                    f"{' after snapshot' if restored else ''}, {len(self)} documents")
+        return len(delta_keys)
+
+    def _head_snapshot(self) -> Optional[Dict[str, str]]:
+        """ETag, last delta covered and creation time of the S3 snapshot, None if there is none"""
+        try:
+            response = self._get_s3_client().head_object(Bucket=self.bucket_name, Key=self._snapshot_key())
+        except ClientError as e:
+            if e.response['Error']['Code'] not in MISSING_CODES:
+                raise
+            return None
+        metadata = response.get('Metadata', {})
+        return {"etag": response['ETag'], "after": metadata.get('after', ''), "created_at": metadata.get('created-at')}
+
+    def _load_snapshot(self, merge: bool) -> Optional[str]:
+        """
+        Replace the index by (or with merge, add) the S3 snapshot, returns the last delta it covers
+        The snapshot is a SQLite file: replacing renames it over the local copy, merging
+        attaches it and inserts its rows in SQL. Changes not yet saved are re-applied
+        """
+        in_memory = self.db_path == ":memory:"
+        # Downloaded next to the local copy, so replacing it is a rename
+        directory = None if in_memory else os.path.dirname(os.path.abspath(self.db_path))
+        with tempfile.TemporaryDirectory(prefix="near_duplicates_", dir=directory) as tmp:
+            path = os.path.join(tmp, "snapshot.sqlite")
+            try:
+                response = self._download_snapshot(path)
+            except ClientError as e:
+                if e.response['Error']['Code'] not in MISSING_CODES:
+                    raise
+                if not merge:
+                    self._clear()
+                self._set_meta(snapshot_etag=None, snapshot_at=datetime.utcnow().isoformat())
+                return None
+
+            snapshot = sqlite3.connect(path)
+            try:
+                row = snapshot.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+                self._check_params({"params": row[0] if row else None})
+                if in_memory and not merge:
+                    with self._lock:
+                        snapshot.backup(self._conn)
+            finally:
+                snapshot.close()
+
+            with self._lock:
+                if merge:
+                    self._merge_snapshot(path)
+                elif not in_memory:
+                    self._replace_file(path)
+        if not merge:
+            self._init_schema()
+            with self._lock:
+                self._reapply_changes()
+
+        metadata = response.get('Metadata', {})
+        self._set_meta(snapshot_etag=response['ETag'], snapshot_at=metadata.get('created-at'), deltas_since_snapshot='0')
+        logger.info(f"🔍 Loaded near-duplicate snapshot: {len(self)} documents")
+        return metadata.get('after') or None
+
+    def _replace_file(self, path: str):
+        """Swap the local copy for the SQLite file at path, called with the lock held"""
+        self._conn.close()
+        for suffix in ('-wal', '-shm'):
+            try:
+                os.remove(self.db_path + suffix)
+            except FileNotFoundError:
+                pass
+        os.replace(path, self.db_path)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+
+    def _download_snapshot(self, path: str) -> Dict[str, Any]:
+        """Stream the gzipped snapshot to path, returns the get_object response"""
+        response = self._get_s3_client().get_object(Bucket=self.bucket_name, Key=self._snapshot_key())
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        with open(path, 'wb') as f:
+            for chunk in iter(lambda: response['Body'].read(_CHUNK_SIZE), b''):
+                f.write(decompressor.decompress(chunk))
+            f.write(decompressor.flush())
+        return response
+
+    def _merge_snapshot(self, path: str):
+        """Add the documents of a snapshot file, replacing local ones with the same id, called with the lock held"""
+        self._conn.execute("ATTACH DATABASE ? AS snapshot", (path,))
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM bands WHERE doc IN (SELECT id FROM documents WHERE doc_id IN "
+                    "(SELECT doc_id FROM snapshot.documents))"
+                )
+                self._conn.execute("DELETE FROM documents WHERE doc_id IN (SELECT doc_id FROM snapshot.documents)")
+                self._conn.execute(
+                    "INSERT INTO documents (doc_id, url, signature, added_at) "
+                    "SELECT doc_id, url, signature, added_at FROM snapshot.documents"
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO bands (bucket, doc) SELECT b.bucket, d.id FROM snapshot.bands b "
+                    "JOIN snapshot.documents s ON s.id = b.doc JOIN documents d ON d.doc_id = s.doc_id"
+                )
+        finally:
+            self._conn.execute("DETACH DATABASE snapshot")
+
+    def _reapply_changes(self):
+        """Store changes not yet saved again after the index was replaced, called with the lock held"""
+        with self._conn:
+            for change in self._changes:
+                if change[0] == "add":
+                    self._store(change[1], change[3], change[2])
+                else:
+                    self._delete(change[1])
+
+    def _compact(self):
+        """
+        Write the index file as the new snapshot, unless another run replaced the one loaded,
+        then delete the deltas it covers
+        """
+        after = self._get_meta('sync_after')
+        now = datetime.utcnow()
+
+        with tempfile.TemporaryDirectory(prefix="near_duplicates_") as tmp:
+            path = os.path.join(tmp, "snapshot.sqlite")
+            snapshot = sqlite3.connect(path)
+            try:
+                with self._lock:
+                    self._conn.backup(snapshot)
+                    documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+                # Sync state belongs to this copy; the file is shipped without a WAL
+                with snapshot:
+                    snapshot.execute("DELETE FROM meta WHERE key != 'params'")
+                snapshot.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                snapshot.close()
+
+            with open(path, 'rb') as src, gzip.open(f"{path}.gz", 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+
+            try:
+                # Only over the snapshot loaded, or only if still absent
+                etag = self._get_meta('snapshot_etag')
+                with open(f"{path}.gz", 'rb') as body:
+                    response = conditional_put(
+                        self._get_s3_client(), self.bucket_name, self._snapshot_key(), body,
+                        if_match=etag, if_none_match=None if etag else '*',
+                        ContentType='application/vnd.sqlite3', ContentEncoding='gzip',
+                        # Only deltas this copy has read are covered; later ones are read again after the snapshot
+                        Metadata={'after': after or '', 'created-at': now.isoformat(), 'params': self._params()}
+                    )
+            except ClientError as e:
+                if e.response['Error']['Code'] not in CONFLICT_CODES:
+                    raise
+                logger.info("🔄 Near-duplicate snapshot was replaced by another run, not compacting")
+                return
+
+        self._set_meta(snapshot_etag=response.get('ETag'), snapshot_at=now.isoformat(), deltas_since_snapshot='0')
+        logger.info(f"💾 Saved near-duplicate snapshot: {documents} documents")
+        if after:
+            self._delete_compacted_deltas(after)
+
+    def _delete_compacted_deltas(self, after: str):
+        """Best effort: delete deltas the snapshot covers, older than its last delta by more than the lag window"""
+        cutoff = self._delta_key(_delta_time(after, self.prefix) - _DELTA_LAG, '')
+        deleted = 0
+        try:
+            stale = []
+            for delta_key in self._list_keys(f"{self.prefix}deltas/", None):
+                if delta_key >= cutoff:
+                    break
+                stale.append(delta_key)
+
+            for i in range(0, len(stale), _DELETE_BATCH_SIZE):
+                batch = stale[i:i + _DELETE_BATCH_SIZE]
+                response = self._get_s3_client().delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': [{'Key': delta_key} for delta_key in batch], 'Quiet': True}
+                )
+                deleted += len(batch) - len(response.get('Errors', []))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not delete compacted near-duplicate deltas, later loads skip them anyway: {e}")
+        if deleted:
+            logger.info(f"🗑️ Deleted {deleted} near-duplicate deltas covered by the snapshot")
+
+    def _clear(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM bands")
+                self._conn.execute("DELETE FROM documents")
+
+    def _snapshot_key(self) -> str:
+        return f"{self.prefix}snapshot.sqlite.gz"
+
+    def _delta_key(self, at: datetime, suffix: str) -> str:
+        return f"{self.prefix}deltas/{at:%Y%m%dT%H%M%S%f}{suffix}"
+
+    def _list_keys(self, prefix: str, start_after: Optional[str]) -> Iterable[str]:
+        kwargs = {'StartAfter': start_after} if start_after else {}
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, **kwargs):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def _get_object(self, key: str) -> bytes:
+        return self._get_s3_client().get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+
+    def _get_s3_client(self):
+        if self.s3_client is None:
+            self.s3_client = get_client('s3')
+        return self.s3_client
+
+    def _params(self) -> str:
+        return f"{self.num_perm}:{self.bands}:{self.shingle_size}:{self._a[0]}"
+
+    def _check_params(self, document: Dict[str, Any]):
+        if document.get("params") != self._params():
+            raise ValueError(
+                f"Near-duplicate data in S3 was built with params {document.get('params')}, not {self._params()}"
+            )
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, **values: Optional[str]):
+        with self._lock:
+            with self._conn:
+                for key, value in values.items():
+                    if value is None:
+                        self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+                    else:
+                        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _init_schema(self):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS documents ("
+                    "id INTEGER PRIMARY KEY, doc_id TEXT UNIQUE NOT NULL, url TEXT, "
+                    "signature BLOB NOT NULL, added_at TEXT)"
+                )
+                # Clustered on (bucket, doc): lookups by bucket need no separate index
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS bands ("
+                    "bucket INTEGER NOT NULL, doc INTEGER NOT NULL, PRIMARY KEY (bucket, doc)) WITHOUT ROWID"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bands_doc ON bands (doc)")
+
+                params = self._params()
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+                if row is None:
+                    self._conn.execute("INSERT INTO meta (key, value) VALUES ('params', ?)", (params,))
+                elif row[0] != params:
+                    raise ValueError(
+                        f"Near-duplicate index {self.db_path} was built with params {row[0]}, not {params}"
+                    )
+
+    @staticmethod
+    def _pack(signature: List[int]) -> bytes:
+        return b''.join(value.to_bytes(4, 'little') for value in signature)
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[int]:
+        return [int.from_bytes(blob[i:i + 4], 'little') for i in range(0, len(blob), 4)]
+
+
+
+def _delta_time(delta_key: str, prefix: str) -> datetime:
+    return datetime.strptime(delta_key[len(prefix) + len("deltas/"):][:21], "%Y%m%dT%H%M%S%f")
+
+
+class _SplitMix64:
+    """Small deterministic 64-bit generator, independent of Python's random module version"""
+
+    def __init__(self, seed: int):
+        self.state = seed & _MASK64
+
+    def next(self) -> int:
+        self.state = (self.state + 0x9E3779B97F4A7C15) & _MASK64
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
@@ -0,0 +1,203 @@
+"""
+Daily partition index of scraped content
+The uploader records every document it writes in one small gzip JSON object
+per upload day and source, so readers find new content since a date by
+reading a few index objects instead of listing all of scraped-content/
+"""
+
+import logging
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+try:
+    from .aws_clients import CONFLICT_CODES, MISSING_CODES, conditional_put, get_client
+    from .serialization import compress, decode_json, encode_json, is_json_key
+except ImportError:
+    from aws_clients import CONFLICT_CODES, MISSING_CODES, conditional_put, get_client
+    from serialization import compress, decode_json, encode_json, is_json_key
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "indexes/scraped-content"
+INDEX_VERSION = 1
+
+_INDEX_KEY = re.compile(r'/date=(\d{4}-\d{2}-\d{2})/source=([^/]+)\.json\.gz$')
+# <source>_<YYYYMMDD>_<HHMM>_<hash>_<title>.json, as named by S3ContentUploader
+_DOCUMENT_NAME = re.compile(r'^(.+?)_\d{8}_\d{4}_([0-9a-f]{8}|unknown)_')
+
+
+def index_key(day: date, source: str) -> str:
+    """indexes/scraped-content/date=<YYYY-MM-DD>/source=<source>.json.gz"""
+    return f"{INDEX_PREFIX}/date={day.isoformat()}/source={source}.json.gz"
+
+
+class PartitionIndex:
+    """
+    Per-day, per-source index objects listing the documents written
+    Each entry: key, content_hash, size, artist, category, batch_id,
+    uploaded_at. Concurrent writers merge through conditional puts
+    """
+
+    def __init__(self, bucket_name: str = "ut-v2-prod-lake-east1", s3_client=None, workers: int = 8):
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client
+        self.workers = workers
+
+    def append(self, day: date, source: str, entries: List[Dict[str, Any]], max_attempts: int = 5) -> int:
+        """Add entries to a day's index for source, returns the number of entries it now holds"""
+        return self._update(index_key(day, source), lambda current: {
+            **current, **{entry["key"]: entry for entry in entries}
+        }, max_attempts)
+
+    def remove(self, keys: Iterable[str], days: Iterable[date], max_attempts: int = 5) -> int:
+        """Drop entries for deleted documents from the given days' indexes, returns how many were dropped"""
+        keys = set(keys)
+        removed = 0
+        dropped = 0   # from the last read of the object being updated
+
+        def drop(current: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+            nonlocal dropped
+            remaining = {key: entry for key, entry in current.items() if key not in keys}
+            dropped = len(current) - len(remaining)
+            return remaining if dropped else None
+
+        for day in sorted(set(days)):
+            for index_object in self._list_index_keys(f"{INDEX_PREFIX}/date={day.isoformat()}/"):
+                self._update(index_object, drop, max_attempts)
+                removed += dropped
+        return removed
+
+    def entries_since(self, since: date, sources: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Entries of every document written on or after since, oldest day first
+        One listing of the index prefix starting after since, then one GET per
+        index object (days x sources)
+        """
+        wanted = set(sources) if sources else None
+        index_objects = []
+        for index_object in self._list_index_keys(INDEX_PREFIX + "/", start_after=f"{INDEX_PREFIX}/date={since.isoformat()}"):
+            match = _INDEX_KEY.search(index_object)
+            if match and (wanted is None or match.group(2) in wanted):
+                index_objects.append(index_object)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            for entries, _ in pool.map(self._read, index_objects):
+                yield from sorted(entries.values(), key=lambda entry: entry.get("uploaded_at") or "")
+
+    def keys_since(self, since: date, sources: Optional[Iterable[str]] = None) -> List[str]:
+        """Keys of every document written on or after since"""
+        return [entry["key"] for entry in self.entries_since(since, sources)]
+
+    def backfill(self, prefix: str = "scraped-content/") -> int:
+        """
+        Index documents written before the index existed, from one listing of prefix
+        Dated by LastModified; source, artist and category come from the key
+        and the hash prefix in the file name stands in for content_hash
+        """
+        partitions: Dict[Tuple[date, str], List[Dict[str, Any]]] = defaultdict(list)
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if not is_json_key(obj['Key']):
+                    continue
+                parts = obj['Key'].split('/')
+                name_match = _DOCUMENT_NAME.match(parts[-1])
+                modified = obj['LastModified']
+                partitions[(modified.date(), name_match.group(1) if name_match else "unknown")].append({
+                    "key": obj['Key'],
+                    "content_hash": name_match.group(2) if name_match and name_match.group(2) != "unknown" else None,
+                    "size": obj['Size'],
+                    "artist": parts[1] if len(parts) == 4 else None,
+                    "category": parts[2] if len(parts) == 4 else None,
+                    "batch_id": None,
+                    "uploaded_at": modified.replace(tzinfo=None).isoformat()
+                })
+
+        for (day, source), entries in sorted(partitions.items()):
+            self.append(day, source, entries)
+        return sum(len(entries) for entries in partitions.values())
+
+    def _update(self, index_object: str, merge, max_attempts: int) -> int:
+        """
+        Read-merge-write one index object, retried when another writer got there first
+        merge returns the new entries by key, or None to leave the object as it is
+        """
+        for _ in range(max_attempts):
+            current, etag = self._read(index_object)
+            entries = merge(current)
+            if entries is None:
+                return len(current)
+            body = compress(encode_json({"version": INDEX_VERSION, "entries": list(entries.values())}), 'gzip')
+            try:
+                # Only over the version read, or only if still absent
+                conditional_put(
+                    self._get_s3_client(), self.bucket_name, index_object, body,
+                    if_match=etag, if_none_match=None if etag else '*',
+                    ContentType='application/json', ContentEncoding='gzip'
+                )
+                return len(entries)
+            except ClientError as e:
+                if e.response['Error']['Code'] not in CONFLICT_CODES:
+                    raise
+                logger.info(f"🔄 Partition index {index_object} changed since it was read, merging")
+
+        raise RuntimeError(f"Partition index {index_object} kept conflicting after {max_attempts} attempts")
+
+    def _read(self, index_object: str) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+        """Entries by key and the ETag, empty when the object does not exist yet"""
+        try:
+            response = self._get_s3_client().get_object(Bucket=self.bucket_name, Key=index_object)
+        except ClientError as e:
+            if e.response['Error']['Code'] in MISSING_CODES:
+                return {}, None
+            raise
+        data = decode_json(response['Body'].read())
+        return {entry["key"]: entry for entry in data.get("entries", [])}, response.get('ETag')
+
+    def _list_index_keys(self, prefix: str, start_after: Optional[str] = None) -> Iterator[str]:
+        kwargs = {'StartAfter': start_after} if start_after else {}
+        paginator = self._get_s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, **kwargs):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def _get_s3_client(self):
+        if self.s3_client is None:
+            self.s3_client = get_client('s3')
+        return self.s3_client
+
+
+def main():
+    """Backfill the partition index or list content written since a date"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scraped content partition index")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--backfill", metavar="PREFIX", help="Index documents under this prefix from one listing")
+    parser.add_argument("--since", help="List keys written on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--source", action="append", help="Only this source (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    index = PartitionIndex(args.bucket)
+    if args.backfill:
+        print(f"🗂️ Indexed {index.backfill(args.backfill)} documents under {args.backfill}")
+
+    if args.since:
+        keys = index.keys_since(datetime.strptime(args.since, "%Y-%m-%d").date(), args.source)
+        for key in keys:
+            print(key)
+        print(f"📅 {len(keys)} documents since {args.since}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
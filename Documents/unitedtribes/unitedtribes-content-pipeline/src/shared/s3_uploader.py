@@ -4,19 +4,60 @@ Organizes content using [artist]/[thematic]/[scraped filename] pattern
 Ensures no overwrites of existing content
 """
 
-import boto3
-import json
+import asyncio
 import logging
+import random
 import re
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime
-from botocore.exceptions import ClientError, NoCredentialsError
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Tuple
+from datetime import date, datetime
+from botocore.exceptions import (
+    ClientError, NoCredentialsError, HTTPClientError, ConnectionError as BotoConnectionError
+)
 from dataclasses import asdict
 
+from aws_clients import CONFLICT_CODES, check_bucket, conditional_put, get_client
 from models import ScrapedContent, ScrapingBatch
+from keyword_matcher import KeywordMatcher
+from serialization import (
+    JSON_KEY_SUFFIXES, append_json_field, check_codec, compress, compressed_key, encode_json, zstandard
+)
+from near_duplicates import NearDuplicateIndex
+from content_ledger import ContentHashLedger
+from columnar import parquet_key, pa
+from upload_journal import RUN_ID_METADATA, UploadJournal, rollback_run
+from artist_gazetteer import ArtistGazetteer, default_gazetteer
+from listing_cache import ListingCache
+from partition_index import PartitionIndex, index_key
 
 logger = logging.getLogger(__name__)
 
+# put_object errors worth retrying: throttling and transient server errors
+_RETRYABLE_ERROR_CODES = {'SlowDown', 'InternalError', 'ServiceUnavailable', 'RequestTimeout', '500', '503'}
+
+# Title patterns for artists missing from the gazetteer
+_TITLE_ARTIST_PATTERNS = [
+    # Artist mentioned in title
+    re.compile(r'^([^:]+?)(?:\s*[-:]\s*)', re.IGNORECASE),
+    # "Artist Name" in quotes
+    re.compile(r'"([^"]+)"', re.IGNORECASE),
+    # Artist review/interview patterns
+    re.compile(r'(?:review|interview):\s*([^,\n]+)', re.IGNORECASE),
+    re.compile(r'(?:with|featuring)\s+([^,\n]+)', re.IGNORECASE),
+]
+# "Artist's new album" or "Artist releases" in the lead
+_LEAD_ARTIST_PATTERNS = [
+    re.compile(r"([a-z\s]+)'s\s+(?:new|latest|upcoming)\s+(?:album|single|ep)"),
+    re.compile(r"([a-z\s]+)\s+(?:releases|announces|drops)\s+"),
+    re.compile(r"(?:musician|artist|singer)\s+([a-z\s]+)\s+"),
+]
+# Longer pattern captures are sentences, not names
+_MAX_TITLE_ARTIST_WORDS = 4
+_MAX_LEAD_ARTIST_WORDS = 3
+_TITLE_PREFIXES = {'review', 'interview', 'new music'}
+
 
 class S3ContentUploader:
     """
@@ -24,20 +65,72 @@ class S3ContentUploader:
     Prevents overwrites and maintains data integrity
     """
 
-    def __init__(self, bucket_name: str = "ut-v2-prod-lake-east1"):
+    def __init__(
+        self,
+        bucket_name: str = "ut-v2-prod-lake-east1",
+        near_duplicate_index: Optional[NearDuplicateIndex] = None,
+        skip_near_duplicates: bool = True,
+        content_ledger: Optional[ContentHashLedger] = None,
+        skip_known_content: bool = True,
+        write_parquet: bool = True,
+        partition_index: Optional[PartitionIndex] = None,
+        write_partition_index: bool = True,
+        listing_cache: Optional[ListingCache] = None,
+        max_concurrency: int = 16,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.5,
+        conditional_puts: bool = True,
+        compression: Optional[str] = None,
+        artist_gazetteer: Optional[ArtistGazetteer] = None,
+        run_id: Optional[str] = None,
+        journal: Optional[UploadJournal] = None,
+        journal_dir: Optional[str] = None
+    ):
         self.bucket_name = bucket_name
         self.s3_client = None
-
-        # Artist extraction patterns for organizing content
-        self.artist_patterns = [
-            # Artist mentioned in title
-            r'^([^:]+?)(?:\s*[-:]\s*)',
-            # "Artist Name" in quotes
-            r'"([^"]+)"',
-            # Artist review/interview patterns
-            r'(?:review|interview):\s*([^,\n]+)',
-            r'(?:with|featuring)\s+([^,\n]+)',
-        ]
+        # Shared clients and indexes are opened on worker threads, by concurrent batches
+        self._open_lock = threading.Lock()
+
+        # Write-ahead journal of every key this run writes, so a failed run can be rolled back
+        self.journal = journal or UploadJournal(run_id, bucket_name, journal_dir)
+        self.run_id = self.journal.run_id
+
+        # Items are uploaded by up to max_concurrency threads, each put tried up to max_attempts times
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+
+        # Item puts carry If-None-Match: * so a key written by a concurrent writer is never overwritten
+        self.conditional_puts = conditional_puts
+
+        # Opt-in compressed objects ("gzip" or "zstd"): items and manifests get Content-Encoding and a .gz/.zst suffix
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("⚠️ zstandard not installed, compressing uploads with gzip instead")
+            compression = 'gzip'
+        self.compression = check_codec(compression)
+
+        # Near-duplicate index shared across batches and runs (opened on first upload)
+        self.near_duplicate_index = near_duplicate_index
+        self.skip_near_duplicates = skip_near_duplicates
+
+        # content_hash -> key ledger of everything already in the lake (loaded on first upload)
+        self.content_ledger = content_ledger
+        self.skip_known_content = skip_known_content
+
+        # Per-day, per-source index objects of the documents written, for listing new content cheaply
+        self.partition_index = partition_index
+        self.write_partition_index = write_partition_index
+        # Local incremental listings for list_existing_content
+        self.listing_cache = listing_cache
+
+        # One Parquet file per batch alongside the per-item JSON (needs pyarrow)
+        self.write_parquet = write_parquet
+        if write_parquet and pa is None:
+            logger.warning("⚠️ pyarrow not installed, batches will be uploaded without a Parquet export")
+            self.write_parquet = False
+
+        # Known artists and aliases, for organizing content by artist
+        self.artist_gazetteer = artist_gazetteer or default_gazetteer()
 
         # Thematic categorization
         self.thematic_categories = {
@@ -48,15 +141,20 @@ class S3ContentUploader:
             'analysis': ['analysis', 'breakdown', 'explained', 'history of'],
             'podcast': ['podcast', 'episode', 'fresh air', 'sound opinions']
         }
+        self.thematic_matcher = KeywordMatcher(self.thematic_categories)
 
     def _get_s3_client(self):
-        """Initialize S3 client with proper error handling"""
+        """Shared S3 client, with the bucket's connectivity checked once per process"""
+        with self._open_lock:
+            return self._open_s3_client()
+
+    def _open_s3_client(self):
         if not self.s3_client:
             try:
-                self.s3_client = boto3.client('s3')
-                # Test connectivity
-                self.s3_client.head_bucket(Bucket=self.bucket_name)
-                logger.info(f"✅ Connected to S3 bucket: {self.bucket_name}")
+                # Enough pooled connections for every upload thread
+                s3_client = get_client('s3', max_pool_connections=self.max_concurrency)
+                check_bucket(self.bucket_name, s3_client)
+                self.s3_client = s3_client
             except NoCredentialsError:
                 logger.error("❌ AWS credentials not found")
                 raise
@@ -69,6 +167,48 @@ class S3ContentUploader:
                 raise
         return self.s3_client
 
+    def _get_near_duplicate_index(self, s3_client) -> Optional[NearDuplicateIndex]:
+        """Open the lake's near-duplicate index and sync it from S3, disabling the check if either fails"""
+        with self._open_lock:
+            if self.skip_near_duplicates and self.near_duplicate_index is None:
+                try:
+                    index = NearDuplicateIndex(bucket_name=self.bucket_name, s3_client=s3_client)
+                    index.load()
+                    self.near_duplicate_index = index
+                    logger.info(f"🔍 Near-duplicate index: {len(self.near_duplicate_index)} documents")
+                except Exception as e:
+                    logger.warning(f"⚠️ Near-duplicate index unavailable, uploading without it: {e}")
+                    self.skip_near_duplicates = False
+        return self.near_duplicate_index if self.skip_near_duplicates else None
+
+    def _get_content_ledger(self, s3_client, items: List[ScrapedContent]) -> Optional[ContentHashLedger]:
+        """The lake's content-hash ledger with the shards of these items loaded, None if they cannot be"""
+        if not self.skip_known_content:
+            return None
+        with self._open_lock:
+            if self.content_ledger is None:
+                self.content_ledger = ContentHashLedger(self.bucket_name, s3_client)
+        try:
+            fetched = self.content_ledger.prefetch(item.content_hash for item in items)
+            logger.info(f"📒 Content ledger: {fetched} shards fetched, {len(self.content_ledger)} hashes loaded")
+        except Exception as e:
+            logger.warning(f"⚠️ Content ledger unavailable, uploading this batch without it: {e}")
+            return None
+        return self.content_ledger
+
+    def _get_partition_index(self, s3_client) -> Optional[PartitionIndex]:
+        if self.write_partition_index and self.partition_index is None:
+            self.partition_index = PartitionIndex(self.bucket_name, s3_client)
+        return self.partition_index if self.write_partition_index else None
+
+    def _get_listing_cache(self, s3_client) -> ListingCache:
+        if self.listing_cache is None:
+            self.listing_cache = ListingCache(
+                self.bucket_name, s3_client,
+                partition_index=self.partition_index or PartitionIndex(self.bucket_name, s3_client)
+            )
+        return self.listing_cache
+
     async def upload_batch(self, batch: ScrapingBatch) -> Dict[str, Any]:
         """
         Upload entire batch to S3 with proper organization
@@ -78,35 +218,100 @@ class S3ContentUploader:
         """
         logger.info(f"📤 Uploading batch {batch.batch_id} to S3")
 
-        s3_client = self._get_s3_client()
+        # S3 requests and SQLite queries run on threads, off the event loop
+        s3_client = await asyncio.to_thread(self._get_s3_client)
+        duplicate_index, ledger = await asyncio.gather(
+            asyncio.to_thread(self._get_near_duplicate_index, s3_client),
+            asyncio.to_thread(self._get_content_ledger, s3_client, batch.content_items)
+        )
 
         upload_results = {
             "batch_id": batch.batch_id,
+            "run_id": self.run_id,
             "total_items": len(batch.content_items),
             "successful_uploads": 0,
             "failed_uploads": 0,
+            "failed_indices": [],   # positions in batch.content_items of items not stored
             "uploaded_keys": [],
             "errors": [],
+            "skipped_duplicates": [],
+            "skipped_known_content": [],
+            "parquet_key": None,
+            "partition_index_key": None,
             "manifest_key": None
         }
 
-        # Upload individual content items
-        for i, content_item in enumerate(batch.content_items):
-            try:
-                s3_key = await self._upload_content_item(content_item, s3_client)
-                if s3_key:
-                    upload_results["successful_uploads"] += 1
-                    upload_results["uploaded_keys"].append(s3_key)
-                    logger.info(f"✅ Uploaded item {i+1}/{len(batch.content_items)}: {s3_key}")
-                else:
-                    upload_results["failed_uploads"] += 1
+        # Duplicate checks run in item order, so later items are checked against earlier ones
+        items = batch.content_items
+        to_upload, in_batch_duplicates = await asyncio.to_thread(
+            self._filter_duplicates, items, ledger, duplicate_index, upload_results
+        )
 
-            except Exception as e:
-                logger.error(f"❌ Failed to upload item {i+1}: {e}")
-                upload_results["failed_uploads"] += 1
-                upload_results["errors"].append(f"Item {i+1}: {str(e)}")
+        # Existing keys are listed once per [artist]/[category] prefix and unique names allocated locally
+        key_index = _BatchKeyIndex(self.bucket_name, s3_client)
+        # Partition index entry of every object written, by key
+        index_entries: Dict[str, Dict[str, Any]] = {}
 
-        # Upload batch manifest
+        # Puts run concurrently on a thread pool, results are collected in item order
+        outcomes = await self._upload_items([items[i] for i in to_upload], s3_client, key_index, index_entries)
+        uploaded = await asyncio.to_thread(
+            self._record_uploads, to_upload, outcomes, items, upload_results, ledger, duplicate_index
+        )
+
+        # An in-batch duplicate is uploaded in place of an original that failed
+        replacements = []
+        replaced_by = {}
+        replacement_of = {}
+        for original, duplicates in in_batch_duplicates.items():
+            if original not in uploaded:
+                replacements.append(duplicates[0])
+                replaced_by[items[original].url] = items[duplicates[0]].url
+                replacement_of[duplicates[0]] = original
+        if replacements:
+            replacement_urls = set(replaced_by.values())
+            upload_results["skipped_duplicates"] = [
+                {**skipped, "duplicate_of": replaced_by.get(skipped["duplicate_of"], skipped["duplicate_of"])}
+                for skipped in upload_results["skipped_duplicates"] if skipped["url"] not in replacement_urls
+            ]
+            outcomes = await self._upload_items([items[i] for i in replacements], s3_client, key_index, index_entries)
+            stored = await asyncio.to_thread(
+                self._record_uploads, replacements, outcomes, items, upload_results, ledger, duplicate_index
+            )
+            # A failed original whose duplicate was stored in its place is not missing from the lake
+            covered = {replacement_of[i] for i in stored}
+            upload_results["failed_indices"] = [i for i in upload_results["failed_indices"] if i not in covered]
+
+        # Independent follow-up writes run together: (awaitable, what failed, error prefix, result key)
+        steps = []
+        # Persist the hashes of this batch's uploads for later runs
+        if ledger is not None:
+            steps.append((asyncio.to_thread(ledger.save), "save content ledger", "Content ledger save", None))
+        if duplicate_index is not None:
+            steps.append((asyncio.to_thread(duplicate_index.save), "save near-duplicate index",
+                          "Near-duplicate index save", None))
+
+        # List this batch's documents in today's index for its source
+        partition_index = self._get_partition_index(s3_client)
+        if partition_index is not None and upload_results["uploaded_keys"]:
+            entries = [index_entries[key] for key in upload_results["uploaded_keys"]]
+            steps.append((asyncio.to_thread(self._update_partition_index, partition_index, batch, entries),
+                          "update partition index", "Partition index update", "partition_index_key"))
+
+        # Upload the columnar export of the uploaded items
+        if self.write_parquet and upload_results["uploaded_keys"]:
+            steps.append((self._upload_batch_parquet(batch, upload_results, s3_client),
+                          "upload batch Parquet", "Parquet upload", "parquet_key"))
+
+        # Failures are recorded in step order, ahead of the manifest that lists them
+        outcomes = await asyncio.gather(*(step for step, _, _, _ in steps), return_exceptions=True)
+        for (_, action, error, result_key), outcome in zip(steps, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"❌ Failed to {action}: {outcome}")
+                upload_results["errors"].append(f"{error} failed: {str(outcome)}")
+            elif result_key:
+                upload_results[result_key] = outcome
+
+        # Upload batch manifest, last: it records the keys and errors above
         try:
             manifest_key = await self._upload_batch_manifest(batch, upload_results, s3_client)
             upload_results["manifest_key"] = manifest_key
@@ -115,11 +320,149 @@ class S3ContentUploader:
             logger.error(f"❌ Failed to upload batch manifest: {e}")
             upload_results["errors"].append(f"Manifest upload failed: {str(e)}")
 
-        logger.info(f"📊 Batch upload completed: {upload_results['successful_uploads']}/{upload_results['total_items']} successful")
+        logger.info(f"📊 Batch upload completed: {upload_results['successful_uploads']}/{upload_results['total_items']} successful, "
+                    f"{len(upload_results['skipped_known_content'])} already in the lake, "
+                    f"{len(upload_results['skipped_duplicates'])} near duplicates skipped")
         return upload_results
 
-    async def _upload_content_item(self, content: ScrapedContent, s3_client) -> Optional[str]:
-        """Upload single content item with artist/thematic organization"""
+    def _filter_duplicates(
+        self,
+        items: List[ScrapedContent],
+        ledger: Optional[ContentHashLedger],
+        duplicate_index: Optional[NearDuplicateIndex],
+        upload_results: Dict[str, Any]
+    ) -> Tuple[List[int], Dict[int, List[int]]]:
+        """
+        Indices of items to upload, and in-batch duplicates by the index of their original
+        Content whose hash is in the ledger is already stored and skipped. Items
+        of this batch only reach the ledger and shared index once uploaded, so
+        they are also compared with each other (by hash, and in a scratch
+        in-memory near-duplicate index)
+        """
+        batch_index = None
+        if duplicate_index is not None:
+            batch_index = NearDuplicateIndex(
+                ":memory:",
+                num_perm=duplicate_index.num_perm,
+                bands=duplicate_index.bands,
+                shingle_size=duplicate_index.shingle_size,
+                threshold=duplicate_index.threshold
+            )
+        to_upload: List[int] = []
+        in_batch_duplicates: Dict[int, List[int]] = {}
+        batch_hashes: Dict[str, int] = {}
+
+        try:
+            for i, content_item in enumerate(items):
+                match = None
+                try:
+                    if ledger is not None and content_item.content_hash:
+                        existing_key = ledger.lookup(content_item.content_hash)
+                        if existing_key:
+                            upload_results["skipped_known_content"].append({
+                                "url": content_item.url,
+                                "content_hash": content_item.content_hash,
+                                "existing_key": existing_key
+                            })
+                            logger.info(f"⏭️ Skipping {content_item.url}, already stored as {existing_key}")
+                            continue
+
+                        original = batch_hashes.setdefault(content_item.content_hash, i)
+                        if original != i:
+                            in_batch_duplicates.setdefault(original, []).append(i)
+                            match = (items[original].url, 1.0)
+
+                    if not match and duplicate_index is not None:
+                        match = duplicate_index.find_duplicate(content_item.content)
+                        if not match:
+                            batch_match = batch_index.check_and_add(str(i), content_item.content, content_item.url)
+                            if batch_match:
+                                original = int(batch_match[0])
+                                in_batch_duplicates.setdefault(original, []).append(i)
+                                match = (items[original].url, batch_match[1])
+                except Exception as e:
+                    logger.error(f"❌ Failed to upload item {i+1}: {e}")
+                    upload_results["failed_uploads"] += 1
+                    upload_results["failed_indices"].append(i)
+                    upload_results["errors"].append(f"Item {i+1}: {str(e)}")
+                    continue
+
+                if match:
+                    duplicate_of, similarity = match
+                    upload_results["skipped_duplicates"].append({
+                        "url": content_item.url,
+                        "duplicate_of": duplicate_of,
+                        "similarity": similarity
+                    })
+                    logger.info(f"⏭️ Skipping near duplicate {content_item.url} (of {duplicate_of}, {similarity:.2f})")
+                    continue
+
+                to_upload.append(i)
+        finally:
+            if batch_index is not None:
+                batch_index.close()
+
+        return to_upload, in_batch_duplicates
+
+    async def _upload_items(
+        self,
+        items: List[ScrapedContent],
+        s3_client,
+        key_index: "_BatchKeyIndex",
+        index_entries: Dict[str, Dict[str, Any]]
+    ) -> List[Any]:
+        """Upload items on a bounded thread pool, returning each key, None or exception in item order"""
+        loop = asyncio.get_running_loop()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="s3-upload") as pool:
+            return await asyncio.gather(
+                *(loop.run_in_executor(pool, self._upload_content_item, item, s3_client, key_index, index_entries)
+                  for item in items),
+                return_exceptions=True
+            )
+
+    def _record_uploads(
+        self,
+        indices: List[int],
+        outcomes: List[Any],
+        items: List[ScrapedContent],
+        upload_results: Dict[str, Any],
+        ledger: Optional[ContentHashLedger],
+        duplicate_index: Optional[NearDuplicateIndex]
+    ) -> Set[int]:
+        """Add upload outcomes to the results in item order, returning the indices uploaded"""
+        uploaded = set()
+        for i, outcome in zip(indices, outcomes):
+            content_item = items[i]
+            if isinstance(outcome, Exception):
+                logger.error(f"❌ Failed to upload item {i+1}: {outcome}")
+                upload_results["failed_uploads"] += 1
+                upload_results["failed_indices"].append(i)
+                upload_results["errors"].append(f"Item {i+1}: {str(outcome)}")
+            elif outcome:
+                uploaded.add(i)
+                upload_results["successful_uploads"] += 1
+                upload_results["uploaded_keys"].append(outcome)
+                if ledger is not None:
+                    ledger.record(content_item.content_hash, outcome)
+                if duplicate_index is not None:
+                    duplicate_index.add(outcome, content_item.content, content_item.url)
+                logger.info(f"✅ Uploaded item {i+1}/{len(items)}: {outcome}")
+            else:
+                upload_results["failed_uploads"] += 1
+                upload_results["failed_indices"].append(i)
+        return uploaded
+
+    def _upload_content_item(
+        self,
+        content: ScrapedContent,
+        s3_client,
+        key_index: Optional["_BatchKeyIndex"] = None,
+        index_entries: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Optional[str]:
+        """Upload single content item with artist/thematic organization (runs on an upload thread)"""
+        if key_index is None:
+            key_index = _BatchKeyIndex(self.bucket_name, s3_client)
 
         # Extract artist and thematic category
         artist_name = self._extract_artist_name(content)
@@ -129,78 +472,126 @@ class S3ContentUploader:
         filename = self._generate_safe_filename(content)
 
         # Construct S3 key following [artist]/[thematic]/[filename] pattern
-        s3_key = f"scraped-content/{artist_name}/{thematic_category}/{filename}"
+        base_key = compressed_key(f"scraped-content/{artist_name}/{thematic_category}/{filename}", self.compression)
 
-        # Check if file already exists
-        if await self._key_exists(s3_key, s3_client):
-            # Generate unique key to avoid overwrite
-            s3_key = await self._generate_unique_key(s3_key, s3_client)
-            logger.info(f"🔄 File exists, using unique key: {s3_key}")
-
-        # Prepare content for upload
-        upload_data = content.to_v3_format()
-        upload_data['s3_metadata'] = {
+        # Prepare content for upload, appending upload metadata to the encoded v3 document
+        upload_body = compress(append_json_field(content.to_v3_bytes(), 's3_metadata', {
             'artist_extracted': artist_name,
             'thematic_category': thematic_category,
             'upload_timestamp': datetime.utcnow().isoformat(),
             'uploader_version': 'content_scraper_v3.0'
-        }
+        }), self.compression)
 
-        try:
-            # Upload to S3
-            s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=json.dumps(upload_data, indent=2, default=str),
-                ContentType='application/json',
-                Metadata={
-                    'artist': artist_name,
-                    'category': thematic_category,
-                    'source': content.source_attribution.source if content.source_attribution else 'unknown',
-                    'content-type': content.content_type.value,
-                    'upload-date': datetime.utcnow().strftime('%Y-%m-%d')
-                }
-            )
+        # Unique against the listed prefix and the rest of the batch; a key taken meanwhile is skipped
+        s3_key = key_index.allocate(base_key)
+        while True:
+            try:
+                self._journaled_put(
+                    self._put_new_object,
+                    s3_client,
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=upload_body,
+                    ContentType='application/json',
+                    **self._content_encoding(),
+                    Metadata={
+                        'artist': artist_name,
+                        'category': thematic_category,
+                        'source': content.source_attribution.source if content.source_attribution else 'unknown',
+                        'content-type': content.content_type.value,
+                        'upload-date': datetime.utcnow().strftime('%Y-%m-%d')
+                    }
+                )
+
+                # Update content object with final S3 key
+                content.s3_key = s3_key
+
+                if index_entries is not None:
+                    index_entries[s3_key] = {
+                        "key": s3_key,
+                        "content_hash": content.content_hash,
+                        "size": len(upload_body),
+                        "artist": artist_name,
+                        "category": thematic_category,
+                        "uploaded_at": datetime.utcnow().isoformat()
+                    }
+
+                return s3_key
 
-            # Update content object with final S3 key
-            content.s3_key = s3_key
+            except ClientError as e:
+                # Conditional put refused because the key was written since it was allocated
+                if e.response['Error']['Code'] in CONFLICT_CODES:
+                    logger.info(f"🔄 {s3_key} was written by another writer, allocating a new key")
+                    s3_key = key_index.allocate(base_key)
+                    continue
+                logger.error(f"❌ S3 upload failed for {s3_key}: {e}")
+                return None
 
-            return s3_key
+            except Exception as e:
+                logger.error(f"❌ S3 upload failed for {s3_key}: {e}")
+                return None
 
-        except Exception as e:
-            logger.error(f"❌ S3 upload failed for {s3_key}: {e}")
-            return None
+    def _journaled_put(self, put, s3_client, **kwargs) -> Dict[str, Any]:
+        """
+        Run put (_put_new_object or _put_with_retry) between journal records
+        The object is tagged with the run id, which identifies it at rollback
+        if the put never reached its commit record
+        """
+        kwargs['Metadata'] = {**kwargs.get('Metadata', {}), RUN_ID_METADATA: self.run_id}
+        self.journal.intent(kwargs['Key'])
+        response = put(s3_client, **kwargs)
+        self.journal.committed(kwargs['Key'])
+        return response
+
+    def _put_new_object(self, s3_client, **kwargs) -> Dict[str, Any]:
+        """Put that never overwrites: If-None-Match: * where the backend supports it (see conditional_put)"""
+        if not self.conditional_puts:
+            return self._put_with_retry(s3_client, **kwargs)
+        return self._put_with_retry(s3_client, if_none_match='*', **kwargs)
+
+    def _put_with_retry(self, s3_client, if_none_match: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """put_object, retried with jittered exponential backoff on throttling and transient errors"""
+        put = s3_client.put_object
+        if if_none_match:
+            def put(Bucket, Key, Body, **rest):
+                return conditional_put(s3_client, Bucket, Key, Body, if_none_match=if_none_match, **rest)
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return put(**kwargs)
+            except (ClientError, HTTPClientError, BotoConnectionError) as e:
+                retryable = not isinstance(e, ClientError) or e.response['Error']['Code'] in _RETRYABLE_ERROR_CODES
+                if not retryable or attempt == self.max_attempts:
+                    raise
+                delay = self.retry_backoff * 2 ** (attempt - 1) * (0.5 + random.random())
+                logger.warning(f"⚠️ Retrying upload of {kwargs.get('Key')} in {delay:.1f}s "
+                               f"(attempt {attempt}/{self.max_attempts}): {e}")
+                time.sleep(delay)
 
     def _extract_artist_name(self, content: ScrapedContent) -> str:
         """Extract artist name for S3 organization"""
-        # Try to extract from title first
-        title = content.title.lower()
+        lead = content.content[:500]
 
-        # Remove common prefixes
-        title = re.sub(r'^(review|interview|new music):\s*', '', title, flags=re.IGNORECASE)
+        # Known artists and aliases named in the title, else mentioned most in the lead
+        artist = self.artist_gazetteer.resolve(content.title, lead)
+        if artist:
+            return self._sanitize_artist_name(artist)
 
-        # Try extraction patterns
-        for pattern in self.artist_patterns:
-            match = re.search(pattern, content.title, re.IGNORECASE)
+        # Unknown artists: title patterns, skipping "Review:"-style prefixes and whole sentences
+        for pattern in _TITLE_ARTIST_PATTERNS:
+            match = pattern.search(content.title)
             if match:
                 artist = match.group(1).strip()
-                return self._sanitize_artist_name(artist)
+                if artist.lower() not in _TITLE_PREFIXES and len(artist.split()) <= _MAX_TITLE_ARTIST_WORDS:
+                    return self._sanitize_artist_name(artist)
 
         # Try extracting from content (first few sentences)
-        content_start = content.content[:500].lower()
-
-        # Look for "Artist's new album" or "Artist releases"
-        artist_mention_patterns = [
-            r"([a-z\s]+)'s\s+(?:new|latest|upcoming)\s+(?:album|single|ep)",
-            r"([a-z\s]+)\s+(?:releases|announces|drops)\s+",
-            r"(?:musician|artist|singer)\s+([a-z\s]+)\s+"
-        ]
-
-        for pattern in artist_mention_patterns:
-            match = re.search(pattern, content_start)
+        content_start = lead.lower()
+        for pattern in _LEAD_ARTIST_PATTERNS:
+            match = pattern.search(content_start)
             if match:
                 artist = match.group(1).strip()
-                if len(artist.split()) <= 3:  # Reasonable artist name length
+                if len(artist.split()) <= _MAX_LEAD_ARTIST_WORDS:
                     return self._sanitize_artist_name(artist)
 
         # Fallback: use source name
@@ -209,13 +600,10 @@ class S3ContentUploader:
 
     def _categorize_content(self, content: ScrapedContent) -> str:
         """Categorize content thematically"""
-        text = (content.title + " " + content.content[:500]).lower()
-
-        # Check against thematic patterns
-        for category, patterns in self.thematic_categories.items():
-            for pattern in patterns:
-                if pattern in text:
-                    return category
+        # First category (in pattern order) with a hit in title or lead
+        category = self.thematic_matcher.scan(content.title + " " + content.content[:500]).first_family()
+        if category:
+            return category
 
         # Use content type as fallback
         return content.content_type.value
@@ -249,30 +637,43 @@ class S3ContentUploader:
 
         return f"{source}_{timestamp}_{content_hash}_{title_part}.json"
 
-    async def _key_exists(self, s3_key: str, s3_client) -> bool:
-        """Check if S3 key already exists"""
-        try:
-            s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-            return True
-        except ClientError as e:
-            if e.response['Error']['Code'] == '404':
-                return False
-            raise
-
-    async def _generate_unique_key(self, base_key: str, s3_client) -> str:
-        """Generate unique key to avoid overwrites"""
-        base_name, extension = base_key.rsplit('.', 1)
-        counter = 1
-
-        while counter < 100:  # Prevent infinite loop
-            unique_key = f"{base_name}_{counter:03d}.{extension}"
-            if not await self._key_exists(unique_key, s3_client):
-                return unique_key
-            counter += 1
-
-        # If still not unique, add timestamp
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        return f"{base_name}_{timestamp}.{extension}"
+    def _update_partition_index(self, partition_index: PartitionIndex, batch: ScrapingBatch,
+                                entries: List[Dict[str, Any]]) -> str:
+        """Add the batch's documents to today's index object for its source, returns the index key"""
+        source_name = batch.source.value if batch.source else "unknown"
+        today = datetime.utcnow().date()
+        partition_index.append(today, source_name, [{**entry, "batch_id": batch.batch_id} for entry in entries])
+        return index_key(today, source_name)
+
+    def _content_encoding(self) -> Dict[str, str]:
+        """ContentEncoding argument for compressed uploads"""
+        return {'ContentEncoding': self.compression} if self.compression else {}
+
+    async def _upload_batch_parquet(self, batch: ScrapingBatch, upload_results: Dict[str, Any], s3_client) -> str:
+        """Upload the batch's uploaded items as one Parquet file under a source/date partition"""
+        uploaded = set(upload_results["uploaded_keys"])
+        items = [item for item in batch.content_items if item.s3_key in uploaded]
+
+        parquet_s3_key = parquet_key(batch)
+        body = await asyncio.to_thread(batch.to_parquet, items)
+        await asyncio.to_thread(
+            self._journaled_put,
+            self._put_with_retry,
+            s3_client,
+            Bucket=self.bucket_name,
+            Key=parquet_s3_key,
+            Body=body,
+            ContentType='application/vnd.apache.parquet',
+            Metadata={
+                'batch-id': batch.batch_id,
+                'source': batch.source.value if batch.source else 'unknown',
+                'row-count': str(len(items)),
+                'upload-date': datetime.utcnow().strftime('%Y-%m-%d')
+            }
+        )
+        logger.info(f"✅ Uploaded batch Parquet: {parquet_s3_key}")
+
+        return parquet_s3_key
 
     async def _upload_batch_manifest(self, batch: ScrapingBatch, upload_results: Dict[str, Any], s3_client) -> str:
         """Upload batch processing manifest"""
@@ -284,8 +685,13 @@ class S3ContentUploader:
                 "successful_uploads": upload_results["successful_uploads"],
                 "failed_uploads": upload_results["failed_uploads"],
                 "uploaded_s3_keys": upload_results["uploaded_keys"],
-                "upload_errors": upload_results["errors"]
+                "upload_errors": upload_results["errors"],
+                "skipped_near_duplicates": upload_results.get("skipped_duplicates", []),
+                "skipped_known_content": upload_results.get("skipped_known_content", [])
             },
+            "parquet_s3_key": upload_results.get("parquet_key"),
+            "partition_index_key": upload_results.get("partition_index_key"),
+            "run_id": self.run_id,
             "s3_organization": {
                 "bucket": self.bucket_name,
                 "base_prefix": "scraped-content/",
@@ -297,14 +703,19 @@ class S3ContentUploader:
         # Generate manifest S3 key
         date_str = batch.created_at.strftime("%Y/%m/%d")
         source_name = batch.source.value if batch.source else "unknown"
-        manifest_key = f"manifests/scraped/{source_name}/{date_str}/batch_{batch.batch_id}.json"
+        manifest_key = compressed_key(f"manifests/scraped/{source_name}/{date_str}/batch_{batch.batch_id}.json",
+                                      self.compression)
 
         # Upload manifest
-        s3_client.put_object(
+        await asyncio.to_thread(
+            self._journaled_put,
+            self._put_with_retry,
+            s3_client,
             Bucket=self.bucket_name,
             Key=manifest_key,
-            Body=json.dumps(manifest_data, indent=2, default=str),
+            Body=compress(encode_json(manifest_data), self.compression),
             ContentType='application/json',
+            **self._content_encoding(),
             Metadata={
                 'batch-id': batch.batch_id,
                 'source': source_name,
@@ -315,9 +726,14 @@ class S3ContentUploader:
 
         return manifest_key
 
-    async def list_existing_content(self, artist: str = None, thematic: str = None) -> List[str]:
-        """List existing content to avoid duplicates"""
-        s3_client = self._get_s3_client()
+    async def list_existing_content(self, artist: str = None, thematic: str = None,
+                                    since: Optional[date] = None) -> List[str]:
+        """
+        List existing content keys to avoid duplicates (.json, .json.gz and .json.zst objects)
+        Listings are cached locally and refreshed incrementally; with since, only
+        content written on or after that day, read from the partition index
+        """
+        s3_client = await asyncio.to_thread(self._get_s3_client)
 
         # Build prefix for search
         prefix = "scraped-content/"
@@ -327,30 +743,104 @@ class S3ContentUploader:
                 prefix += f"{thematic}/"
 
         try:
-            paginator = s3_client.get_paginator('list_objects_v2')
-            page_iterator = paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            if since is not None:
+                partition_index = self.partition_index or PartitionIndex(self.bucket_name, s3_client)
+                keys = await asyncio.to_thread(partition_index.keys_since, since)
+                return [key for key in keys if key.startswith(prefix)]
 
-            existing_keys = []
-            for page in page_iterator:
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        existing_keys.append(obj['Key'])
-
-            return existing_keys
+            listing_cache = self._get_listing_cache(s3_client)
+            return await asyncio.to_thread(lambda: list(listing_cache.list_keys(prefix)))
 
         except Exception as e:
             logger.error(f"❌ Failed to list existing content: {e}")
             return []
 
+    def rollback(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Delete everything this uploader's run wrote, forgetting it in the ledger and near-duplicate index"""
+        logger.warning(f"⏪ Rolling back upload run {self.run_id}")
+        return rollback_run(
+            self.journal,
+            self._get_s3_client(),
+            content_ledger=self.content_ledger,
+            near_duplicate_index=self.near_duplicate_index,
+            partition_index=self.partition_index,
+            listing_cache=self.listing_cache,
+            dry_run=dry_run
+        )
+
     def get_upload_statistics(self, batch_results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate upload statistics"""
         return {
             "total_processed": batch_results["total_items"],
             "successful_uploads": batch_results["successful_uploads"],
             "failed_uploads": batch_results["failed_uploads"],
+            "skipped_duplicates": len(batch_results.get("skipped_duplicates", [])),
+            "skipped_known_content": len(batch_results.get("skipped_known_content", [])),
             "success_rate": batch_results["successful_uploads"] / max(1, batch_results["total_items"]),
             "s3_keys_created": len(batch_results["uploaded_keys"]),
             "manifest_created": batch_results["manifest_key"] is not None,
             "bucket": self.bucket_name,
             "organization_pattern": "[artist]/[thematic]/[filename]"
-        }
\ No newline at end of file
+        }
+
+
+class _BatchKeyIndex:
+    """
+    Keys under each [artist]/[category] prefix during one batch upload
+    Each prefix is listed once, on first use, and unique keys are then
+    allocated locally instead of probing candidates with HEAD requests
+    """
+
+    def __init__(self, bucket_name: str, s3_client):
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client
+        self._keys: Dict[str, Set[str]] = {}
+        self._listing_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, base_key: str) -> str:
+        """First of base_key, base_001, base_002 ... not in S3 or allocated earlier, reserving it"""
+        keys = self._prefix_keys(base_key.rsplit('/', 1)[0] + '/')
+        base_name, extension = _split_extension(base_key)
+
+        with self._lock:
+            candidate = base_key
+            counter = 0
+            while candidate in keys:
+                counter += 1
+                candidate = f"{base_name}_{counter:03d}{extension}"
+            keys.add(candidate)
+
+        if candidate != base_key:
+            logger.info(f"🔄 File exists, using unique key: {candidate}")
+        return candidate
+
+    def _prefix_keys(self, prefix: str) -> Set[str]:
+        with self._lock:
+            if prefix in self._keys:
+                return self._keys[prefix]
+            listing_lock = self._listing_locks.setdefault(prefix, threading.Lock())
+
+        # One listing per prefix, other threads needing it wait for the result
+        with listing_lock:
+            with self._lock:
+                if prefix in self._keys:
+                    return self._keys[prefix]
+
+            keys = set()
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                keys.update(obj['Key'] for obj in page.get('Contents', []))
+
+            with self._lock:
+                self._keys[prefix] = keys
+            return keys
+
+
+def _split_extension(key: str) -> Tuple[str, str]:
+    """Split off the whole document suffix, e.g. ("a/b", ".json.gz")"""
+    for suffix in sorted(JSON_KEY_SUFFIXES, key=len, reverse=True):
+        if key.endswith(suffix):
+            return key[:-len(suffix)], suffix
+    base_name, extension = key.rsplit('.', 1)
+    return base_name, '.' + extension
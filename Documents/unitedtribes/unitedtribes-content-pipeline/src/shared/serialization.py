@@ -0,0 +1,169 @@
+"""
+JSON serialization for v3 data lake documents, manifests and reports
+Encodes to UTF-8 bytes with orjson when available, falling back to the
+standard library with the same output: datetimes as ISO 8601, enums as
+their value, dataclasses as objects and anything else via str(). Output
+is compact unless pretty is requested for human-facing reports
+
+Lake objects may also be stored compressed (opt-in): gzip or zstd with
+Content-Encoding set and a .json.gz / .json.zst key suffix. decode_json
+recognises compressed bodies by their magic bytes, so readers need no
+changes beyond accepting the suffixes (is_json_key)
+"""
+
+import dataclasses
+import gzip
+import json
+import logging
+from datetime import date, datetime, time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional, Set, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Key types json.dumps accepts for objects
+JSON_KEY_TYPES = (str, int, float, bool, type(None))
+
+# Codec (also the Content-Encoding value) -> key suffix appended after .json
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+JSON_KEY_SUFFIXES = ('.json',) + tuple('.json' + suffix for suffix in COMPRESSION_SUFFIXES.values())
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def encode_json(data: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON bytes, compact or indented by 2 spaces when pretty"""
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(data, default=_default, option=options)
+        except TypeError:
+            # orjson rejects some inputs json accepts (e.g. integers beyond 64 bits)
+            pass
+
+    if pretty:
+        return json.dumps(data, default=_default, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def decode_json(data: Union[bytes, bytearray, str]) -> Any:
+    """Parse JSON bytes or text, decompressing gzip/zstd bodies first"""
+    if isinstance(data, (bytes, bytearray)) and (data[:2] == _GZIP_MAGIC or data[:4] == _ZSTD_MAGIC):
+        data = decompress(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: Union[str, Path], data: Any, pretty: bool = False):
+    """Write data to a JSON file"""
+    with open(path, 'wb') as f:
+        f.write(encode_json(data, pretty=pretty))
+
+
+def check_codec(codec: Optional[str]) -> Optional[str]:
+    """Validate a compression codec name (None for uncompressed)"""
+    if codec is None:
+        return None
+    if codec not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression codec {codec!r}, expected one of {sorted(COMPRESSION_SUFFIXES)}")
+    if codec == 'zstd' and zstandard is None:
+        raise ImportError("zstandard is required for zstd compression (pip install zstandard)")
+    return codec
+
+
+def compress(data: bytes, codec: Optional[str]) -> bytes:
+    """Compress an encoded object with gzip or zstd, unchanged when codec is None"""
+    if check_codec(codec) is None:
+        return data
+    if codec == 'gzip':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return zstandard.ZstdCompressor(level=6).compress(data)
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress a gzip or zstd body, returning anything else unchanged"""
+    if data[:2] == _GZIP_MAGIC:
+        return gzip.decompress(data)
+    if data[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise ImportError("zstandard is required to read zstd objects (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def compressed_key(key: str, codec: Optional[str]) -> str:
+    """Key with the codec's suffix, e.g. batch.json -> batch.json.gz"""
+    return key + COMPRESSION_SUFFIXES[codec] if codec else key
+
+
+def is_json_key(key: str) -> bool:
+    """Whether a key holds a JSON document, compressed or not"""
+    return key.endswith(JSON_KEY_SUFFIXES)
+
+
+def _default(value: Any) -> Any:
+    """Types both backends encode the same way, orjson handles most of them natively"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def append_json_field(document: bytes, key: str, value: Any) -> bytes:
+    """Add a trailing top-level field to an encoded JSON object without re-encoding it"""
+    if not document.endswith(b'}'):
+        raise ValueError("Encoded document is not a JSON object")
+
+    field = encode_json(key) + b':' + encode_json(value)
+    if document == b'{}':
+        return b'{' + field + b'}'
+    return document[:-1] + b',' + field + b'}'
+
+
+def find_unserializable(data: Any, path: str = '$', _active: Optional[Set[int]] = None) -> Optional[str]:
+    """
+    Path of the first value encode_json cannot handle, None when encodable
+    Walks the structure directly instead of an encode/decode round trip:
+    leaf values are always encodable (str() fallback), so only object keys
+    and reference cycles can fail
+    """
+    if not isinstance(data, (dict, list, tuple)):
+        return None
+
+    active = _active if _active is not None else set()
+    if id(data) in active:
+        return f"{path} (circular reference)"
+    active.add(id(data))
+
+    try:
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if not isinstance(key, JSON_KEY_TYPES):
+                    return f"{path}.{key!r} (unsupported key type)"
+                problem = find_unserializable(value, f"{path}.{key}", active)
+                if problem:
+                    return problem
+        else:
+            for i, value in enumerate(data):
+                problem = find_unserializable(value, f"{path}[{i}]", active)
+                if problem:
+                    return problem
+        return None
+    finally:
+        active.discard(id(data))
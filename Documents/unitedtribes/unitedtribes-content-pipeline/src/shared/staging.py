@@ -0,0 +1,306 @@
+"""
+Local staging of scraped batches
+Scrapers write validated batches to a local directory (Lambda /tmp, cron
+host disk) and return at once; a background syncer uploads them through
+S3ContentUploader with bounded concurrency and retries and marks them
+committed. Items that fail to upload are staged again as a retry batch, and
+batches still pending after a crash are uploaded by the next sync
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from .cache_dirs import CACHE_ROOT, writable_dir
+    from .models import ScrapedContent, ScrapingBatch, Source
+    from .serialization import decode_json, encode_json
+except ImportError:
+    from cache_dirs import CACHE_ROOT, writable_dir
+    from models import ScrapedContent, ScrapingBatch, Source
+    from serialization import decode_json, encode_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGING_DIR = Path(os.environ.get("UT_STAGING_DIR", CACHE_ROOT / "staging"))
+
+# <batch_id>-retry<n>: the items of batch_id that failed to upload, staged again
+_RETRY_SUFFIX = re.compile(r'-retry(\d+)$')
+
+
+class LocalStagingStore:
+    """
+    Batches waiting for upload, one file per batch
+    pending/<batch_id>.json holds the batch; once uploaded it is replaced by
+    committed/<batch_id>.json with the upload results
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else writable_dir(DEFAULT_STAGING_DIR)
+        self.pending_dir = self.root / "pending"
+        self.committed_dir = self.root / "committed"
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        self.committed_dir.mkdir(parents=True, exist_ok=True)
+
+    def stage(self, batch: ScrapingBatch) -> Path:
+        """Write a batch durably (fsync + atomic rename), returns its pending path"""
+        header = encode_json({
+            "batch_id": batch.batch_id,
+            "source": batch.source.value if batch.source else None,
+            "created_at": batch.created_at.isoformat(),
+            "total_discovered": batch.total_discovered,
+            "staged_at": datetime.utcnow().isoformat()
+        })
+        # Items are embedded as their encoded v3 documents, which the upload reuses
+        body = (b'{"batch":' + header + b',"items":['
+                + b','.join(item.to_v3_bytes() for item in batch.content_items) + b']}')
+
+        path = self.pending_dir / f"{batch.batch_id}.json"
+        self._write_atomic(path, body)
+        logger.info(f"📥 Staged batch {batch.batch_id}: {len(batch.content_items)} items")
+        return path
+
+    def pending(self) -> List[str]:
+        """Batch ids waiting for upload, oldest first"""
+        paths = sorted(self.pending_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        return [path.stem for path in paths]
+
+    def load(self, batch_id: str) -> ScrapingBatch:
+        data = decode_json((self.pending_dir / f"{batch_id}.json").read_bytes())
+        header = data["batch"]
+        return ScrapingBatch(
+            batch_id=header["batch_id"],
+            source=Source(header["source"]) if header["source"] else None,
+            content_items=[ScrapedContent.from_v3_format(item) for item in data["items"]],
+            created_at=datetime.fromisoformat(header["created_at"]),
+            total_discovered=header["total_discovered"]
+        )
+
+    def commit(self, batch_id: str, upload_results: Dict[str, Any]):
+        """Record a batch as uploaded and drop its staged copy"""
+        self._write_atomic(self.committed_dir / f"{batch_id}.json", encode_json({
+            "batch_id": batch_id,
+            "committed_at": datetime.utcnow().isoformat(),
+            "run_id": upload_results.get("run_id"),
+            "successful_uploads": upload_results["successful_uploads"],
+            "failed_uploads": upload_results["failed_uploads"],
+            "uploaded_keys": upload_results["uploaded_keys"],
+            "manifest_key": upload_results.get("manifest_key"),
+            "errors": upload_results["errors"]
+        }))
+        (self.pending_dir / f"{batch_id}.json").unlink()
+
+    def quarantine(self, batch_id: str):
+        """Rename an unreadable batch out of the pending set, keeping it for inspection"""
+        path = self.pending_dir / f"{batch_id}.json"
+        path.rename(path.with_suffix(".json.unreadable"))
+
+    def is_committed(self, batch_id: str) -> bool:
+        return (self.committed_dir / f"{batch_id}.json").exists()
+
+    @staticmethod
+    def _write_atomic(path: Path, body: bytes):
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class StagingSyncer:
+    """
+    Uploads staged batches in the background
+    Up to max_concurrency batches are uploaded at once; a batch whose upload
+    raises, or that uploads nothing while items fail, stays pending and is
+    retried with backoff, then left for the next sync. When only some items
+    fail, those are staged again as a retry batch before the rest is committed
+    """
+
+    def __init__(
+        self,
+        store: LocalStagingStore,
+        uploader,
+        max_concurrency: int = 2,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        poll_interval: float = 30.0
+    ):
+        self.store = store
+        self.uploader = uploader
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+
+        self.stats = {"committed": 0, "uploaded_items": 0, "failed_batches": 0, "pending_items": 0, "errors": []}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._staged = False
+        self._in_flight = set()
+
+    async def stage(self, batch: ScrapingBatch) -> Path:
+        """Stage a batch and wake the background sync (started on first use)"""
+        # Staging writes and fsyncs the batch, so it runs on a thread like the rest of the store I/O
+        path = await asyncio.to_thread(self.store.stage, batch)
+        self.start()
+        self._staged = True
+        self._wakeup.set()
+        return path
+
+    def start(self):
+        """Run the sync loop as a task on the running event loop"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def drain(self) -> Dict[str, Any]:
+        """Upload everything still pending and stop the background task, returns the sync stats"""
+        if self._task is not None and not self._task.done():
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+        else:
+            await self.sync_pending()
+        return self.stats
+
+    async def stop(self):
+        """Cancel the background sync without uploading more, batches not yet committed stay pending"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def sync_pending(self) -> int:
+        """Upload the batches pending now, returns how many were committed"""
+        pending = await asyncio.to_thread(self.store.pending)
+        batch_ids = [batch_id for batch_id in pending if batch_id not in self._in_flight]
+        self._in_flight.update(batch_ids)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def sync(batch_id: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self._sync_batch(batch_id)
+                finally:
+                    self._in_flight.discard(batch_id)
+
+        results = await asyncio.gather(*(sync(batch_id) for batch_id in batch_ids))
+        return sum(results)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._staged = False
+            await self.sync_pending()
+            # Batches staged during the pass are picked up at once, failed ones at the next poll
+            if self._staged:
+                continue
+            if self._stopping:
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _sync_batch(self, batch_id: str) -> bool:
+        try:
+            batch = await asyncio.to_thread(self.store.load, batch_id)
+        except Exception as e:
+            logger.error(f"❌ Could not read staged batch {batch_id}, moving it aside: {e}")
+            await asyncio.to_thread(self.store.quarantine, batch_id)
+            self.stats["errors"].append(f"{batch_id}: {e}")
+            self.stats["failed_batches"] += 1
+            return False
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                results = await self.uploader.upload_batch(batch)
+                if results["successful_uploads"] == 0 and results["failed_uploads"] > 0:
+                    raise RuntimeError(f"all {results['failed_uploads']} uploads failed: {results['errors'][:3]}")
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logger.error(f"❌ Upload of staged batch {batch_id} failed, leaving it pending: {e}")
+                    self.stats["errors"].append(f"{batch_id}: {e}")
+                    self.stats["failed_batches"] += 1
+                    self.stats["pending_items"] += len(batch.content_items)
+                    return False
+                delay = self.retry_backoff * 2 ** (attempt - 1) * (0.5 + random.random())
+                logger.warning(f"⚠️ Retrying staged batch {batch_id} in {delay:.1f}s "
+                               f"(attempt {attempt}/{self.max_attempts}): {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            # Failed items are staged again before the batch's pending file goes away
+            failed = results.get("failed_indices", [])
+            if failed:
+                retry_id = await asyncio.to_thread(self._stage_retry, batch, failed)
+                logger.warning(f"⚠️ {len(failed)} items of staged batch {batch_id} failed, staged again as {retry_id}")
+                self.stats["pending_items"] += len(failed)
+            await asyncio.to_thread(self.store.commit, batch_id, results)
+            self.stats["committed"] += 1
+            self.stats["uploaded_items"] += results["successful_uploads"]
+            logger.info(f"✅ Committed staged batch {batch_id}: {results['successful_uploads']} items uploaded")
+            return True
+
+    def _stage_retry(self, batch: ScrapingBatch, indices: List[int]) -> str:
+        """Stage the given items of a batch as <batch_id>-retry<n>, picked up by the next sync"""
+        match = _RETRY_SUFFIX.search(batch.batch_id)
+        root = batch.batch_id[:match.start()] if match else batch.batch_id
+        attempt = int(match.group(1)) + 1 if match else 1
+        retry = ScrapingBatch(
+            batch_id=f"{root}-retry{attempt}",
+            source=batch.source,
+            content_items=[batch.content_items[i] for i in indices],
+            created_at=batch.created_at,
+            total_discovered=len(indices)
+        )
+        self.store.stage(retry)
+        return retry.batch_id
+
+
+def main():
+    """Upload batches left pending by earlier runs"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upload staged scraper batches to S3")
+    parser.add_argument("--staging-dir", help="Staging directory (default: $UT_STAGING_DIR or cache/staging)")
+    parser.add_argument("--bucket", default="ut-v2-prod-lake-east1", help="Data lake bucket")
+    parser.add_argument("--concurrency", type=int, default=2, help="Batches uploaded at once")
+    parser.add_argument("--list", action="store_true", help="List pending batches without uploading")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = LocalStagingStore(args.staging_dir)
+    pending = store.pending()
+    print(f"📦 {len(pending)} staged batches pending in {store.root}")
+    if args.list:
+        for batch_id in pending:
+            print(batch_id)
+        return 0
+
+    try:
+        from .s3_uploader import S3ContentUploader
+    except ImportError:
+        from s3_uploader import S3ContentUploader
+
+    syncer = StagingSyncer(store, S3ContentUploader(args.bucket), max_concurrency=args.concurrency)
+    stats = asyncio.run(syncer.drain())
+    print(f"✅ Committed {stats['committed']} batches ({stats['uploaded_items']} items), "
+          f"{stats['failed_batches']} batches and {stats['pending_items']} items still pending")
+    return 1 if stats["pending_items"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Incremental HTML parsing for streamed responses
+Builds a BeautifulSoup tree chunk by chunk through bs4's html.parser
+builder, the parser the buffered path uses, so parsing overlaps the
+download instead of waiting for the full body. This drives bs4 below its
+public API; on bs4 versions outside the tested range streaming is
+reported unavailable and callers parse the buffered body instead
+"""
+
+import logging
+from typing import Optional
+
+import bs4
+from bs4 import BeautifulSoup
+
+try:
+    from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+except ImportError:
+    BeautifulSoupHTMLParser = None
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_END_TAG = '</article'
+
+# bs4 releases whose tree-building internals this module was tested against;
+# 4.13 changed BeautifulSoupHTMLParser to take the soup as first argument
+_SUPPORTED_BS4 = ((4, 13), (4, 16))
+
+
+def _bs4_supported() -> bool:
+    try:
+        version = tuple(int(part) for part in bs4.__version__.split('.')[:2])
+    except ValueError:
+        return False
+    if not _SUPPORTED_BS4[0] <= version < _SUPPORTED_BS4[1] or BeautifulSoupHTMLParser is None:
+        return False
+    return all(hasattr(BeautifulSoup, name) for name in ('reset', 'endData', 'popTag'))
+
+
+_STREAMING_AVAILABLE = _bs4_supported()
+
+
+class IncrementalSoupBuilder:
+    """
+    Feeds decoded HTML chunks into bs4's html.parser tree builder
+    The resulting soup is the same tree BeautifulSoup(html, 'html.parser') builds.
+    If the parser fails part way, later chunks are ignored and close() returns None
+    """
+
+    def __init__(self, stop_at_article_end: bool = False, min_article_chars: int = 500):
+        if not _STREAMING_AVAILABLE:
+            raise ImportError(f"Incremental parsing is not supported with beautifulsoup4 {bs4.__version__}")
+
+        self.stop_at_article_end = stop_at_article_end
+        self.min_article_chars = min_article_chars
+
+        # The same steps BeautifulSoup.__init__ and _feed take, with feed() split over chunks
+        self.soup = BeautifulSoup("", "html.parser")
+        self.soup.reset()
+        builder = self.soup.builder
+        builder.reset()
+        args, kwargs = builder.parser_args
+        self._parser = BeautifulSoupHTMLParser(self.soup, *args, **kwargs)
+
+        self.chars_fed = 0
+        self.article_complete = False
+        self.failed = False
+        self._closed = False
+        self._tail = ''
+
+    def feed(self, chunk: str) -> bool:
+        """Parse one chunk, returns True once a complete article has been seen"""
+        if self._closed or self.failed or not chunk:
+            return self.article_complete
+
+        try:
+            self._parser.feed(chunk)
+        except Exception as e:
+            logger.warning(f"⚠️ Incremental parsing failed, the page will be parsed whole: {e}")
+            self.failed = True
+            return False
+        self.chars_fed += len(chunk)
+
+        if self.stop_at_article_end and not self.article_complete:
+            # Keep a short tail so a closing tag split across chunks is still seen
+            window = self._tail + chunk.lower()
+            self._tail = window[-len(ARTICLE_END_TAG):]
+            if ARTICLE_END_TAG in window:
+                self.article_complete = self._has_complete_article()
+
+        return self.article_complete
+
+    def close(self) -> Optional[BeautifulSoup]:
+        """Finish parsing and close any tags still open, None when parsing failed"""
+        if self.failed:
+            return None
+        if not self._closed:
+            self._closed = True
+            try:
+                self._parser.close()
+            except AssertionError as e:
+                # Truncated documents are expected when stopping early
+                logger.debug(f"Incremental parser close: {e}")
+            self._parser.already_closed_empty_element = []
+
+            self.soup.endData()
+            while self.soup.currentTag is not None and self.soup.currentTag.name != self.soup.ROOT_TAG_NAME:
+                self.soup.popTag()
+
+        return self.soup
+
+    def _has_complete_article(self) -> bool:
+        """True when no <article> is still open and the closed one has real text"""
+        open_tags = getattr(self.soup, 'open_tag_counter', None)
+        if open_tags is None or open_tags.get('article', 0) > 0:
+            return False
+
+        article = self.soup.find('article')
+        return article is not None and len(article.get_text(strip=True)) >= self.min_article_chars
+
+
+def streaming_available() -> bool:
+    """Whether the installed bs4 supports incremental parsing"""
+    return _STREAMING_AVAILABLE
+
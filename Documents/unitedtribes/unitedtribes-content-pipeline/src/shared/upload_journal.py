@@ -0,0 +1,246 @@
+"""
+Write-ahead upload journal
+Every key a run writes is appended to a local JSON Lines file before the
+put (fsynced) and marked committed after it, so a failed or crashed run
+can be rolled back by deleting exactly what it wrote. Rollbacks record the
+keys they deleted, which local listing caches read to drop them
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+from ulid import new
+
+try:
+    from .cache_dirs import CACHE_ROOT, writable_dir
+    from .serialization import decode_json, encode_json
+except ImportError:
+    from cache_dirs import CACHE_ROOT, writable_dir
+    from serialization import decode_json, encode_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_DIR = CACHE_ROOT / "upload_journals"
+
+# S3 object metadata naming the run that wrote the object
+RUN_ID_METADATA = "run-id"
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+INTENT = "intent"
+COMMITTED = "committed"
+DELETED = "deleted"
+
+
+class UploadJournal:
+    """
+    Append-only journal of the keys one run writes to a bucket
+    Intents are fsynced before the put so they survive a crash, commits are
+    only flushed. An intent without a commit (failed put, crash) is checked
+    against the object's run-id metadata at rollback
+    """
+
+    def __init__(self, run_id: Optional[str] = None, bucket_name: str = "ut-v2-prod-lake-east1",
+                 journal_dir: Optional[Path] = None):
+        self.run_id = run_id or f"run_{new()}"
+        self.bucket_name = bucket_name
+        self.journal_dir = Path(journal_dir) if journal_dir else writable_dir(DEFAULT_JOURNAL_DIR)
+        self.path = self.journal_dir / f"{self.run_id}.jsonl"
+        self._file = None
+        self._lock = threading.Lock()
+
+    def intent(self, s3_key: str):
+        """Record a key about to be written (durable before returning)"""
+        self._append(INTENT, s3_key, sync=True)
+
+    def committed(self, s3_key: str):
+        self._append(COMMITTED, s3_key)
+
+    def deleted(self, s3_keys: Iterable[str]):
+        """Record keys removed by a rollback (durable before returning)"""
+        for s3_key in s3_keys:
+            self._append(DELETED, s3_key)
+        self._append_sync()
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Records in write order, a torn last line from a crash is ignored"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    yield decode_json(line)
+                except ValueError:
+                    logger.warning(f"⚠️ Skipping unreadable journal line in {self.path}")
+
+    def written_keys(self) -> Tuple[List[str], List[str]]:
+        """(committed keys, keys with an intent but no commit), in first-write order, less deleted keys"""
+        states: Dict[str, str] = {}
+        for entry in self.entries():
+            if entry["op"] == DELETED or states.get(entry["key"]) != COMMITTED:
+                states[entry["key"]] = entry["op"]
+        committed = [key for key, op in states.items() if op == COMMITTED]
+        uncertain = [key for key, op in states.items() if op == INTENT]
+        return committed, uncertain
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _append(self, op: str, s3_key: str, sync: bool = False):
+        line = encode_json({
+            "op": op,
+            "key": s3_key,
+            "bucket": self.bucket_name,
+            "at": datetime.utcnow().isoformat()
+        }) + b'\n'
+
+        with self._lock:
+            if self._file is None:
+                # A journal dir that cannot be written (read-only package) falls back to the temp dir
+                journal_dir = writable_dir(self.journal_dir)
+                if journal_dir != self.journal_dir:
+                    logger.warning(f"⚠️ Cannot write upload journals to {self.journal_dir}, using {journal_dir}")
+                    self.journal_dir = journal_dir
+                    self.path = journal_dir / f"{self.run_id}.jsonl"
+                self._file = open(self.path, 'ab')
+            self._file.write(line)
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def _append_sync(self):
+        with self._lock:
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+
+
+def rollback_run(
+    journal: UploadJournal,
+    s3_client,
+    content_ledger=None,
+    near_duplicate_index=None,
+    partition_index=None,
+    listing_cache=None,
+    dry_run: bool = False,
+    workers: int = 4
+) -> Dict[str, Any]:
+    """
+    Delete every object the journal's run wrote, in DeleteObjects batches of up to 1000 keys
+    Keys whose put outcome was never recorded are only deleted when the
+    object carries this run's run-id metadata. Deletions are recorded in the
+    journal, and deleted documents are dropped from the listing cache, content
+    ledger, near-duplicate index and partition index when given
+    """
+    start = time.perf_counter()
+    committed, uncertain = journal.written_keys()
+    confirmed = [key for key in uncertain if _written_by(journal, key, s3_client)]
+    to_delete = committed + confirmed
+
+    result = {
+        "run_id": journal.run_id,
+        "bucket": journal.bucket_name,
+        "dry_run": dry_run,
+        "committed_keys": len(committed),
+        "unconfirmed_keys_skipped": len(uncertain) - len(confirmed),
+        "deleted_keys": [],
+        "errors": [],
+        "duration_seconds": 0.0
+    }
+
+    if dry_run:
+        result["deleted_keys"] = to_delete
+        logger.info(f"🔎 Rollback of {journal.run_id} would delete {len(to_delete)} objects")
+        return result
+
+    batches = [to_delete[i:i + DELETE_BATCH_SIZE] for i in range(0, len(to_delete), DELETE_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for deleted, errors in pool.map(lambda keys: _delete_batch(journal.bucket_name, keys, s3_client), batches):
+            result["deleted_keys"].extend(deleted)
+            result["errors"].extend(errors)
+
+    if result["deleted_keys"]:
+        journal.deleted(result["deleted_keys"])
+    if listing_cache is not None and result["deleted_keys"]:
+        listing_cache.forget(result["deleted_keys"])
+    if content_ledger is not None and result["deleted_keys"]:
+        try:
+            content_ledger.forget(result["deleted_keys"])
+            content_ledger.save()
+        except Exception as e:
+            result["errors"].append(f"Content ledger update failed: {e}")
+    if near_duplicate_index is not None and result["deleted_keys"]:
+        try:
+            near_duplicate_index.remove(result["deleted_keys"])
+            near_duplicate_index.save()
+        except Exception as e:
+            result["errors"].append(f"Near-duplicate index update failed: {e}")
+    if partition_index is not None and result["deleted_keys"]:
+        # Index entries are filed under the day of the upload, which the journal records
+        days = {datetime.fromisoformat(entry["at"]).date() for entry in journal.entries()}
+        days.add(datetime.utcnow().date())
+        try:
+            partition_index.remove(result["deleted_keys"], days)
+        except Exception as e:
+            result["errors"].append(f"Partition index update failed: {e}")
+
+    result["duration_seconds"] = time.perf_counter() - start
+    logger.info(f"🗑️ Rolled back {journal.run_id}: deleted {len(result['deleted_keys'])} objects "
+                f"in {len(batches)} requests ({len(result['errors'])} errors)")
+    return result
+
+
+def list_journals(journal_dir: Optional[Path] = None) -> List[str]:
+    """Run ids with a journal, oldest first"""
+    directory = Path(journal_dir) if journal_dir else writable_dir(DEFAULT_JOURNAL_DIR)
+    if not directory.exists():
+        return []
+    paths = sorted(directory.glob("*.jsonl"), key=lambda path: path.stat().st_mtime)
+    return [path.stem for path in paths]
+
+
+def deleted_keys_since(since: float, journal_dir: Optional[Path] = None) -> Set[str]:
+    """Keys rolled back in journals modified after since (a time.time() timestamp)"""
+    directory = Path(journal_dir) if journal_dir else writable_dir(DEFAULT_JOURNAL_DIR)
+    if not directory.exists():
+        return set()
+    deleted = set()
+    for path in directory.glob("*.jsonl"):
+        if path.stat().st_mtime > since:
+            journal = UploadJournal(path.stem, journal_dir=directory)
+            deleted.update(entry["key"] for entry in journal.entries() if entry["op"] == DELETED)
+    return deleted
+
+
+def _written_by(journal: UploadJournal, s3_key: str, s3_client) -> bool:
+    try:
+        response = s3_client.head_object(Bucket=journal.bucket_name, Key=s3_key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+    return response.get('Metadata', {}).get(RUN_ID_METADATA) == journal.run_id
+
+
+def _delete_batch(bucket_name: str, keys: List[str], s3_client) -> Tuple[List[str], List[str]]:
+    """One DeleteObjects request, returns (deleted keys, error messages)"""
+    try:
+        response = s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True}
+        )
+    except Exception as e:
+        return [], [f"DeleteObjects failed for {len(keys)} keys: {e}"]
+
+    failed = {error['Key']: f"{error['Key']}: {error.get('Code')} {error.get('Message', '')}".strip()
+              for error in response.get('Errors', [])}
+    return [key for key in keys if key not in failed], list(failed.values())
@@ -3,22 +3,40 @@ Comprehensive validation framework for content scrapers
 Ensures data lake and API stability through rigorous quality checks
 """
 
+import os
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 import hashlib
-import json
 from urllib.parse import urlparse
 
 try:
     from .models import ScrapedContent, ScrapingBatch, SourceAttribution
+    from .keyword_matcher import RELEVANCE_MATCHER
+    from .serialization import decode_json, find_unserializable
 except ImportError:
     from models import ScrapedContent, ScrapingBatch, SourceAttribution
+    from keyword_matcher import RELEVANCE_MATCHER
+    from serialization import decode_json, find_unserializable
 
 logger = logging.getLogger(__name__)
 
+# Bump when validation rules change so memoised results are recomputed
+VALIDATOR_VERSION = "3.1"
+
+# Items validate_many accepts: content objects or raw v3 documents (dict, JSON bytes/str, gzip/zstd bytes)
+ValidationInput = Union[ScrapedContent, Dict[str, Any], bytes, str]
+
+# Characters that do not count as text for the text ratio check
+_NON_TEXT = re.compile(r'[^a-zA-Z\s]')
+_NON_TEXT_ASCII = bytes(i for i in range(128) if _NON_TEXT.match(chr(i)))
+
 
 @dataclass
 class ValidationResult:
@@ -30,6 +48,86 @@ class ValidationResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Validation stages in the order they run, as reported by ValidationStats
+VALIDATION_STAGES = ('structure', 'quality', 'attribution', 'relevance', 'data_lake_compatibility')
+
+
+class ValidationStats:
+    """
+    Per-source, per-stage validation cost and hit counters
+    A stage "hits" when it reports an error or warning or lowers the score
+    """
+
+    def __init__(self):
+        # source -> stage -> [calls, hits, seconds]
+        self._stages: Dict[str, Dict[str, List[float]]] = {}
+        self._cache_hits: Dict[str, int] = {}
+
+    def record(self, source: str, stage: str, seconds: float, hit: bool):
+        counters = self._stages.get(source)
+        if counters is None:
+            counters = self._stages[source] = self._empty_counters()
+        entry = counters[stage]
+        entry[0] += 1
+        entry[1] += hit
+        entry[2] += seconds
+
+    def record_cache_hit(self, source: str):
+        self._cache_hits[source] = self._cache_hits.get(source, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Raw counters, picklable and mergeable into another ValidationStats"""
+        return {
+            'stages': {
+                source: {stage: list(entry) for stage, entry in counters.items()}
+                for source, counters in self._stages.items()
+            },
+            'cache_hits': dict(self._cache_hits)
+        }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        for source, counters in snapshot['stages'].items():
+            for stage, (calls, hits, seconds) in counters.items():
+                own = self._stages.setdefault(source, self._empty_counters())[stage]
+                own[0] += calls
+                own[1] += hits
+                own[2] += seconds
+        for source, hits in snapshot['cache_hits'].items():
+            self._cache_hits[source] = self._cache_hits.get(source, 0) + hits
+
+    def reset(self):
+        self._stages.clear()
+        self._cache_hits.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report form: per source, items validated, cache hits and per-stage cost and hit rate"""
+        report = {}
+        for source in sorted(set(self._stages) | set(self._cache_hits)):
+            counters = self._stages.get(source) or self._empty_counters()
+            total_seconds = sum(entry[2] for entry in counters.values())
+            report[source] = {
+                'items_validated': counters['structure'][0],
+                'cache_hits': self._cache_hits.get(source, 0),
+                'total_ms': total_seconds * 1000,
+                'stages': {
+                    name: {
+                        'calls': calls,
+                        'hits': hits,
+                        'hit_rate': hits / calls if calls else 0.0,
+                        'total_ms': seconds * 1000,
+                        'avg_us': seconds / calls * 1e6 if calls else 0.0,
+                        'time_share': seconds / total_seconds if total_seconds else 0.0
+                    }
+                    for name, (calls, hits, seconds) in counters.items()
+                }
+            }
+        return report
+
+    @staticmethod
+    def _empty_counters() -> Dict[str, List[float]]:
+        return {stage: [0, 0, 0.0] for stage in VALIDATION_STAGES}
+
+
 @dataclass
 class DataLakeCompatibilityCheck:
     """Validation result for data lake compatibility"""
@@ -69,6 +167,7 @@ class ContentValidator:
             r'sign in to continue',
             r'this content is not available'
         ]
+        self._suspicious_regexes = [(pattern, re.compile(pattern)) for pattern in self.suspicious_patterns]
 
         # Valid music publication sources
         self.valid_sources = {
@@ -76,19 +175,87 @@ class ContentValidator:
             'All Songs Considered', 'Fresh Air', 'Spotify', 'Apple Podcasts'
         }
 
+        # Results are memoised per item, keyed by rules version and thresholds
+        config = (
+            VALIDATOR_VERSION, self.min_content_length, self.max_content_length,
+            self.min_title_length, self.max_title_length,
+            tuple(self.suspicious_patterns), tuple(sorted(self.valid_sources))
+        )
+        self.cache_version = hashlib.sha1(repr(config).encode()).hexdigest()[:12]
+
+        # Stage timing and hit counters, per source
+        self.stats = ValidationStats()
+
     def validate_scraped_content(self, content: ScrapedContent) -> ValidationResult:
         """
         Comprehensive validation of scraped content
+        Reuses the result memoised on the item when nothing relevant changed
         """
+        cache_key = self._validation_cache_key(content)
+        cached = content.validation_cache
+        if cached is not None and cached[0] == cache_key:
+            self.stats.record_cache_hit(self._stats_source(content))
+            return self._copy_result(cached[1])
+
+        result = self._validate_uncached(content)
+        content.validation_cache = (cache_key, result)
+        return self._copy_result(result)
+
+    def _validation_cache_key(self, content: ScrapedContent) -> Tuple:
+        """Everything validation reads, confidence only as in/out of range"""
+        attribution = content.source_attribution
+        attribution_key = None
+        if attribution:
+            attribution_key = (
+                attribution.source, attribution.title, attribution.url, attribution.author,
+                attribution.publication_date, attribution.publication_type,
+                attribution.content_type, repr(attribution.episode_info)
+            )
+
+        confidence_ok = content.confidence_score is None or 0.0 <= content.confidence_score <= 1.0
+
+        return (
+            self.cache_version, content.content_hash, len(content.content), content.title,
+            content.url, bool(content.id), content.content_type, confidence_ok, attribution_key
+        )
+
+    @staticmethod
+    def _stats_source(content: ScrapedContent) -> str:
+        """Source name validation stats are aggregated under"""
+        attribution = content.source_attribution
+        return getattr(attribution, 'source', None) or 'unknown'
+
+    @staticmethod
+    def _copy_result(result: ValidationResult) -> ValidationResult:
+        """Callers may mutate results, hand out copies of cached ones"""
+        return ValidationResult(
+            passed=result.passed,
+            score=result.score,
+            errors=list(result.errors),
+            warnings=list(result.warnings),
+            metadata=dict(result.metadata)
+        )
+
+    def _validate_uncached(self, content: ScrapedContent) -> ValidationResult:
+        """Run every validation stage for one item"""
         errors = []
         warnings = []
         score = 1.0
+        clock = time.perf_counter
+        started = clock()
+
+        # Build the v3 document once for the structure and compatibility stages
+        try:
+            v3_format = content.to_v3_format()
+        except Exception:
+            v3_format = None
 
         # 1. Basic structure validation
-        structure_result = self._validate_structure(content)
+        structure_result = self._validate_structure(content, v3_format)
         if not structure_result.passed:
             errors.extend(structure_result.errors)
             score *= 0.3
+        structure_done = clock()
 
         # 2. Content quality validation
         quality_result = self._validate_content_quality(content)
@@ -96,23 +263,35 @@ class ContentValidator:
         warnings.extend(quality_result.warnings)
         if not quality_result.passed:
             errors.extend(quality_result.errors)
+        quality_done = clock()
 
         # 3. Source attribution validation
         attribution_result = self._validate_source_attribution(content.source_attribution)
         score *= attribution_result.score
         if not attribution_result.passed:
             errors.extend(attribution_result.errors)
+        attribution_done = clock()
 
         # 4. Music relevance validation
         relevance_result = self._validate_music_relevance(content)
         score *= relevance_result.score
         warnings.extend(relevance_result.warnings)
+        relevance_done = clock()
 
         # 5. Data lake compatibility check
-        compatibility_result = self._validate_data_lake_compatibility(content)
+        compatibility_result = self._validate_data_lake_compatibility(content, v3_format)
         if not compatibility_result.compatible:
             errors.extend(compatibility_result.errors)
             score *= 0.2
+        compatibility_done = clock()
+
+        source = self._stats_source(content)
+        record = self.stats.record
+        record(source, 'structure', structure_done - started, not structure_result.passed)
+        record(source, 'quality', quality_done - structure_done, quality_result.score < 1.0)
+        record(source, 'attribution', attribution_done - quality_done, attribution_result.score < 1.0 or not attribution_result.passed)
+        record(source, 'relevance', relevance_done - attribution_done, relevance_result.score < 1.0)
+        record(source, 'data_lake_compatibility', compatibility_done - relevance_done, not compatibility_result.compatible)
 
         return ValidationResult(
             passed=len(errors) == 0 and score > 0.5,
@@ -131,6 +310,7 @@ class ContentValidator:
     def validate_batch(self, batch: ScrapingBatch) -> ValidationResult:
         """
         Validate an entire scraping batch
+        Aggregates per-item results, reusing those memoised during scraping
         """
         errors = []
         warnings = []
@@ -178,13 +358,55 @@ class ContentValidator:
             }
         )
 
-    def _validate_structure(self, content: ScrapedContent) -> ValidationResult:
+    def validate_many(
+        self,
+        items: Iterable[ValidationInput],
+        workers: Optional[int] = None,
+        chunk_size: int = 256,
+        max_pending_chunks: Optional[int] = None
+    ) -> Iterator[ValidationResult]:
+        """
+        Validate a stream of items over a process pool, yielding results in input order
+        Items are read chunk by chunk and at most max_pending_chunks chunks
+        (default 2 per worker) are in flight, so memory stays bounded for
+        lake-sized inputs. Raw v3 documents are parsed in the workers; ones
+        that cannot be loaded get a failed result instead of an exception
+        """
+        workers = workers or os.cpu_count() or 1
+        chunks = _chunked(items, chunk_size)
+
+        if workers == 1:
+            for chunk in chunks:
+                yield from _validate_chunk_with(self, chunk)
+            return
+
+        max_pending_chunks = max_pending_chunks or workers * 2
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_validation_worker, initargs=(self,))
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_validate_chunk, chunk))
+                if len(pending) >= max_pending_chunks:
+                    yield from self._collect_chunk(pending.popleft())
+            while pending:
+                yield from self._collect_chunk(pending.popleft())
+        finally:
+            # Stop queued chunks if the caller abandons the generator early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _collect_chunk(self, future) -> List[ValidationResult]:
+        """Chunk results from a worker, folding its stage counters into ours"""
+        results, stats = future.result()
+        self.stats.merge(stats)
+        return results
+
+    def _validate_structure(self, content: ScrapedContent, v3_format: Optional[Dict[str, Any]] = None) -> ValidationResult:
         """Validate basic structure and required fields"""
         errors = []
         score = 1.0
 
         # Check required fields exist
-        content_dict = content.to_v3_format()
+        content_dict = v3_format if v3_format is not None else content.to_v3_format()
         for field in self.required_fields:
             if not content_dict.get(field):
                 errors.append(f"Missing required field: {field}")
@@ -236,21 +458,21 @@ class ContentValidator:
 
         # Check for suspicious patterns indicating scraping failures
         content_lower = content.content.lower()
-        for pattern in self.suspicious_patterns:
-            if re.search(pattern, content_lower):
+        for pattern, regex in self._suspicious_regexes:
+            if regex.search(content_lower):
                 errors.append(f"Suspicious content pattern detected: {pattern}")
                 score *= 0.2
                 break
 
+        total_sentences, unique_sentences, text_chars = self._text_profile(content.content)
+
         # Check content diversity (not just repeated text)
-        unique_sentences = len(set(content.content.split('.')))
-        total_sentences = len(content.content.split('.'))
         if total_sentences > 10 and unique_sentences / total_sentences < 0.5:
             warnings.append("Content appears repetitive")
             score *= 0.8
 
         # Check for actual textual content (not just HTML/metadata)
-        text_ratio = len(re.sub(r'[^a-zA-Z\s]', '', content.content)) / len(content.content)
+        text_ratio = text_chars / len(content.content)
         if text_ratio < 0.6:
             warnings.append("Low text content ratio - may contain too much markup")
             score *= 0.9
@@ -262,6 +484,19 @@ class ContentValidator:
             warnings=warnings
         )
 
+    @staticmethod
+    def _text_profile(text: str) -> Tuple[int, int, int]:
+        """Sentence count, unique sentence count and letter/whitespace count"""
+        sentences = text.split('.')
+
+        # ASCII text (the common case) can drop non-text bytes in C
+        if text.isascii():
+            text_chars = len(text.encode('ascii').translate(None, _NON_TEXT_ASCII))
+        else:
+            text_chars = len(_NON_TEXT.sub('', text))
+
+        return len(sentences), len(set(sentences)), text_chars
+
     def _validate_source_attribution(self, attribution: SourceAttribution) -> ValidationResult:
         """Validate source attribution for proper citations"""
         if not attribution:
@@ -317,16 +552,8 @@ class ContentValidator:
         warnings = []
         score = 1.0
 
-        # Music-related keywords
-        music_keywords = [
-            'music', 'album', 'song', 'artist', 'band', 'musician', 'singer',
-            'concert', 'tour', 'festival', 'record', 'recording', 'studio',
-            'genre', 'jazz', 'rock', 'pop', 'hip-hop', 'classical', 'folk',
-            'guitar', 'piano', 'drums', 'vocals', 'lyrics', 'melody'
-        ]
-
-        content_lower = (content.title + ' ' + content.content).lower()
-        music_mentions = sum(1 for keyword in music_keywords if keyword in content_lower)
+        # Distinct music-related keywords in title and body
+        music_mentions = RELEVANCE_MATCHER.scan(content.title + ' ' + content.content).count('music')
 
         if music_mentions == 0:
             warnings.append("No music-related keywords found")
@@ -341,19 +568,20 @@ class ContentValidator:
             warnings=warnings
         )
 
-    def _validate_data_lake_compatibility(self, content: ScrapedContent) -> DataLakeCompatibilityCheck:
+    def _validate_data_lake_compatibility(self, content: ScrapedContent,
+                                          v3_format: Optional[Dict[str, Any]] = None) -> DataLakeCompatibilityCheck:
         """Ensure content is compatible with existing data lake format"""
         errors = []
 
         try:
-            # Test serialization to v3 format
-            v3_format = content.to_v3_format()
-
-            # Test JSON serialization
-            json_str = json.dumps(v3_format, default=str)
+            # Test conversion to v3 format
+            if v3_format is None:
+                v3_format = content.to_v3_format()
 
-            # Test deserialization
-            json.loads(json_str)
+            # Check the document encodes, structurally rather than by round trip
+            problem = find_unserializable(v3_format)
+            if problem:
+                raise TypeError(f"v3 document is not JSON serializable at {problem}")
 
             # Check required v3 fields
             required_v3_fields = ['id', 'source_attribution', 'metadata']
@@ -393,13 +621,65 @@ class ContentValidator:
             )
 
 
+# Validator each process pool worker uses, set by _init_validation_worker
+_worker_validator: Optional[ContentValidator] = None
+
+
+def _init_validation_worker(validator: ContentValidator):
+    global _worker_validator
+    _worker_validator = validator
+
+
+def _validate_chunk(chunk: List[ValidationInput]) -> Tuple[List[ValidationResult], Dict[str, Any]]:
+    """Validate a chunk in a worker, returning its results and stage counters"""
+    _worker_validator.stats.reset()
+    results = _validate_chunk_with(_worker_validator, chunk)
+    return results, _worker_validator.stats.snapshot()
+
+
+def _validate_chunk_with(validator: ContentValidator, chunk: List[ValidationInput]) -> List[ValidationResult]:
+    """Load raw documents and validate the chunk, unloadable documents fail individually"""
+    results: List[Optional[ValidationResult]] = [None] * len(chunk)
+    loaded = []
+    positions = []
+
+    for i, item in enumerate(chunk):
+        try:
+            loaded.append(_load_validation_input(item))
+            positions.append(i)
+        except Exception as e:
+            results[i] = ValidationResult(passed=False, score=0.0, errors=[f"Invalid v3 document: {e}"])
+
+    for i, item in zip(positions, loaded):
+        results[i] = validator.validate_scraped_content(item)
+    return results
+
+
+def _load_validation_input(item: ValidationInput) -> ScrapedContent:
+    if isinstance(item, ScrapedContent):
+        return item
+    if isinstance(item, (bytes, str)):
+        item = decode_json(item)
+    return ScrapedContent.from_v3_format(item)
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 class SafetyChecker:
     """
     Additional safety checks for data lake and API protection
     """
 
-    def __init__(self):
-        self.validator = ContentValidator()
+    def __init__(self, validator: Optional[ContentValidator] = None):
+        # Share the scraper's validator so memoised results and stats are reused
+        self.validator = validator or ContentValidator()
 
     def pre_processing_safety_check(self, batch: ScrapingBatch) -> Tuple[bool, List[str]]:
         """
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Offline extraction benchmark
+Runs EnhancedContentExtractor over the versioned page corpus in
+testing/extraction_corpus and reports throughput, per-page latency and
+field accuracy, failing when either regresses past the recorded baseline.
+Timing is gated relative to a fixed reference workload timed in the same
+run, so a baseline recorded on one host holds on another
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from bs4 import BeautifulSoup
+
+from extractor import EnhancedContentExtractor
+
+CORPUS_DIR = Path(__file__).parent / "extraction_corpus"
+DEFAULT_CORPUS_VERSION = "v1"
+
+FIELDS = ["title", "author", "date", "body"]
+
+
+def load_corpus(version: str = DEFAULT_CORPUS_VERSION) -> Dict[str, Any]:
+    """Load a corpus manifest and the HTML for each page"""
+    corpus_dir = CORPUS_DIR / version
+    with open(corpus_dir / "manifest.json", 'r') as f:
+        manifest = json.load(f)
+
+    for page in manifest["pages"]:
+        page["html"] = (corpus_dir / page["file"]).read_text(encoding='utf-8')
+
+    return manifest
+
+
+def _normalize(text: Optional[str]) -> str:
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def score_fields(page: Dict[str, Any], result) -> Dict[str, bool]:
+    """Compare one extraction result against the expected fields of a page"""
+    expected = page["expected"]
+    if not result.success or not result.content:
+        return {field: False for field in FIELDS}
+
+    content = result.content
+    attribution = content.source_attribution
+    body = _normalize(content.content)
+
+    body_ok = len(content.content) >= expected.get("min_body_length", 0)
+    body_ok = body_ok and all(_normalize(snippet) in body for snippet in expected.get("body_contains", []))
+    body_ok = body_ok and not any(_normalize(snippet) in body for snippet in expected.get("body_excludes", []))
+
+    return {
+        "title": _normalize(content.title) == _normalize(expected.get("title")),
+        "author": _normalize(attribution.author) == _normalize(expected.get("author")),
+        "date": (attribution.publication_date or "")[:10] == expected.get("date"),
+        "body": body_ok
+    }
+
+
+def reference_workload(page: Dict[str, Any]):
+    """Fixed work per page that extractor changes do not touch: parse it and flatten its text"""
+    BeautifulSoup(page["html"], 'html.parser').get_text(' ')
+
+
+def _p95(latencies: List[float]) -> float:
+    latencies = sorted(latencies)
+    return latencies[max(0, int(round(0.95 * len(latencies))) - 1)]
+
+
+def run_benchmark(manifest: Dict[str, Any], iterations: int = 20, warmup: int = 2) -> Dict[str, Any]:
+    """Extract every corpus page repeatedly and collect timing and accuracy"""
+    extractor = EnhancedContentExtractor()
+    pages = manifest["pages"]
+
+    for _ in range(warmup):
+        for page in pages:
+            reference_workload(page)
+            extractor.extract_content(page["html"], page["url"], page["source"])
+
+    # Reference and extraction passes alternate so both see the same host load
+    latencies: List[float] = []
+    reference_latencies: List[float] = []
+    for _ in range(iterations):
+        for page in pages:
+            page_start = time.perf_counter()
+            reference_workload(page)
+            reference_latencies.append(time.perf_counter() - page_start)
+        for page in pages:
+            page_start = time.perf_counter()
+            extractor.extract_content(page["html"], page["url"], page["source"])
+            latencies.append(time.perf_counter() - page_start)
+    elapsed = sum(latencies)
+    reference_elapsed = sum(reference_latencies)
+
+    # Accuracy is deterministic, one pass is enough
+    page_results = {}
+    field_hits = {field: 0 for field in FIELDS}
+    for page in pages:
+        result = extractor.extract_content(page["html"], page["url"], page["source"])
+        fields = score_fields(page, result)
+        page_results[page["id"]] = {
+            "method": result.method,
+            "fields": fields
+        }
+        for field, ok in fields.items():
+            field_hits[field] += int(ok)
+
+    return {
+        "corpus_version": manifest.get("corpus_version"),
+        "pages": len(pages),
+        "iterations": iterations,
+        "pages_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_latency_ms": statistics.median(latencies) * 1000,
+        "p95_latency_ms": _p95(latencies) * 1000,
+        # Host-independent: extraction time in units of reference workload time
+        "relative_cost": elapsed / reference_elapsed if reference_elapsed > 0 else 0.0,
+        "relative_p95": _p95(latencies) / _p95(reference_latencies),
+        "field_accuracy": {field: hits / len(pages) for field, hits in field_hits.items()},
+        "page_results": page_results
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        throughput_tolerance: float, accuracy_tolerance: float) -> List[str]:
+    """
+    Return a list of regressions against the baseline, empty when within thresholds
+    Only timing relative to the reference workload is compared; absolute
+    pages/s and latencies depend on the host and are reported only
+    """
+    regressions = []
+
+    if "relative_cost" in baseline:
+        max_cost = baseline["relative_cost"] / (1 - throughput_tolerance)
+        if report["relative_cost"] > max_cost:
+            regressions.append(
+                f"Extraction costs {report['relative_cost']:.2f}x the reference workload, "
+                f"baseline {baseline['relative_cost']:.2f}x (max {max_cost:.2f}x)"
+            )
+
+        max_p95 = baseline["relative_p95"] * (1 + throughput_tolerance)
+        if report["relative_p95"] > max_p95:
+            regressions.append(
+                f"p95 latency {report['relative_p95']:.2f}x the reference p95, "
+                f"baseline {baseline['relative_p95']:.2f}x (max {max_p95:.2f}x)"
+            )
+
+    for field, accuracy in report["field_accuracy"].items():
+        baseline_accuracy = baseline["field_accuracy"].get(field, 0.0)
+        if accuracy < baseline_accuracy - accuracy_tolerance:
+            regressions.append(
+                f"{field} accuracy {accuracy:.0%} below baseline {baseline_accuracy:.0%}"
+            )
+
+    return regressions
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n📊 Extraction Benchmark (corpus {report['corpus_version']}, "
+          f"{report['pages']} pages x {report['iterations']} iterations)")
+    print(f"=====================================================")
+    print(f"Throughput: {report['pages_per_second']:.1f} pages/s")
+    print(f"Latency p50: {report['p50_latency_ms']:.2f}ms  p95: {report['p95_latency_ms']:.2f}ms")
+    print(f"Relative to reference workload: cost {report['relative_cost']:.2f}x  p95 {report['relative_p95']:.2f}x")
+
+    print(f"\nField accuracy:")
+    for field, accuracy in report["field_accuracy"].items():
+        print(f"  {field:<8} {accuracy:.0%}")
+
+    print(f"\nPer page:")
+    for page_id, result in report["page_results"].items():
+        misses = [field for field, ok in result["fields"].items() if not ok]
+        status = "✅" if not misses else f"❌ missed {', '.join(misses)}"
+        print(f"  {page_id:<28} {result['method']:<16} {status}")
+
+
+async def capture_page(url: str, source: str, page_id: str, version: str):
+    """Fetch a live page into the corpus and add a manifest entry to fill in"""
+    from fetcher import EnhancedFetcher
+
+    corpus_dir = CORPUS_DIR / version
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = corpus_dir / "manifest.json"
+
+    if manifest_file.exists():
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    else:
+        manifest = {"corpus_version": version, "pages": []}
+
+    async with EnhancedFetcher() as fetcher:
+        result = await fetcher.fetch_with_fallbacks(url)
+
+    if not result.success:
+        print(f"❌ Capture failed for {url}: {result.error_message}")
+        return False
+
+    filename = f"{page_id}.html"
+    (corpus_dir / filename).write_text(result.content, encoding='utf-8')
+
+    # Seed expectations from the current extractor, to be reviewed by hand
+    extraction = EnhancedContentExtractor().extract_content(result.content, url, source)
+    expected = {"title": None, "author": None, "date": None, "body_contains": [], "body_excludes": []}
+    if extraction.success:
+        attribution = extraction.content.source_attribution
+        expected.update({
+            "title": extraction.content.title,
+            "author": attribution.author,
+            "date": (attribution.publication_date or "")[:10] or None
+        })
+
+    manifest["pages"] = [page for page in manifest["pages"] if page["id"] != page_id]
+    manifest["pages"].append({
+        "id": page_id,
+        "source": source,
+        "url": url,
+        "file": filename,
+        "captured_at": datetime.utcnow().isoformat(),
+        "expected": expected
+    })
+
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✅ Captured {url} -> {corpus_dir / filename}")
+    print(f"   Review the expected fields in {manifest_file} before updating the baseline")
+    return True
+
+
+def main():
+    """Command line interface for the extraction benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark content extraction against the offline corpus")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_VERSION, help="Corpus version directory")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed passes over the corpus")
+    parser.add_argument("--throughput-tolerance", type=float, default=0.25,
+                        help="Allowed fractional drop in throughput (and rise in p95) relative to the reference workload")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.0,
+                        help="Allowed drop in per-field accuracy before failing")
+    parser.add_argument("--update-baseline", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument("--json", help="Write the full report to this file")
+    parser.add_argument("--capture", metavar="URL", help="Fetch a live page into the corpus instead of benchmarking")
+    parser.add_argument("--source", help="Source name for --capture (e.g. Pitchfork)")
+    parser.add_argument("--page-id", help="Corpus page id for --capture")
+
+    args = parser.parse_args()
+
+    if args.capture:
+        if not args.source or not args.page_id:
+            parser.error("--capture requires --source and --page-id")
+        success = asyncio.run(capture_page(args.capture, args.source, args.page_id, args.corpus))
+        sys.exit(0 if success else 1)
+
+    manifest = load_corpus(args.corpus)
+    report = run_benchmark(manifest, iterations=args.iterations)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline_file = CORPUS_DIR / args.corpus / "baseline.json"
+
+    if args.update_baseline:
+        baseline = {key: value for key, value in report.items() if key != "page_results"}
+        baseline["recorded_at"] = datetime.utcnow().isoformat()
+        with open(baseline_file, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n📝 Baseline updated: {baseline_file}")
+        sys.exit(0)
+
+    if not baseline_file.exists():
+        print(f"\n⚠️  No baseline at {baseline_file}, run with --update-baseline to record one")
+        sys.exit(0)
+
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(report, baseline, args.throughput_tolerance, args.accuracy_tolerance)
+
+    if regressions:
+        print(f"\n❌ FAIL: extraction regressed against baseline")
+        for regression in regressions:
+            print(f"  • {regression}")
+        sys.exit(1)
+
+    print(f"\n✅ PASS: within thresholds of baseline recorded {baseline.get('recorded_at', 'unknown')}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Model memory benchmark
+Measures with tracemalloc how much a scraping run's ScrapedContent and
+SourceAttribution objects hold, comparing the slotted, interned models
+against dict-backed equivalents of the same dataclasses
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+import models
+from models import ScrapedContent, SourceAttribution, ContentType
+
+CORPUS_DIR = Path(__file__).parent / "extraction_corpus" / "v1"
+
+
+def dict_backed(cls):
+    """The same dataclass with a per-instance __dict__, as the models were before slotting"""
+    namespace = {
+        name: value for name, value in cls.__dict__.items()
+        if name != '__slots__' and name not in cls.__slots__
+    }
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@contextmanager
+def interning_disabled():
+    original = models._intern
+    models._intern = lambda value: value
+    try:
+        yield
+    finally:
+        models._intern = original
+
+
+def load_bodies() -> List[Dict[str, str]]:
+    """Title/body/source samples from the extraction corpus manifest"""
+    with open(CORPUS_DIR / "manifest.json", 'r') as f:
+        manifest = json.load(f)
+    return [
+        {
+            "source": page["source"],
+            "title": page["expected"]["title"],
+            "author": page["expected"].get("author") or "",
+            # Roughly article length, built from the page's known body phrases
+            "body": ". ".join(page["expected"].get("body_contains", [])) * 40
+        }
+        for page in manifest["pages"]
+    ]
+
+
+def build_items(content_cls, attribution_cls, samples: List[Dict[str, str]], count: int) -> List[Any]:
+    """Items as a scraping run builds them: fresh strings per article, as parsed from HTML"""
+    items = []
+    for i in range(count):
+        sample = samples[i % len(samples)]
+        url = ''.join(["https://example.com/", sample["source"].lower(), f"/{i}"])
+        title = ''.join([sample["title"], f" {i}"])
+        attribution = attribution_cls(
+            source=''.join(sample["source"]),
+            title=title,
+            url=url,
+            author=''.join(sample["author"]) or None,
+            publication_date=''.join(["2024-01-", f"{i % 28 + 1:02d}"]),
+            content_type=''.join("review")
+        )
+        items.append(content_cls(
+            url=url,
+            title=title,
+            content=''.join([sample["body"], f" {i}"]),
+            content_type=ContentType.REVIEW,
+            source_attribution=attribution,
+            extraction_method=''.join("trafilatura")
+        ))
+    return items
+
+
+def measure(content_cls, attribution_cls, samples: List[Dict[str, str]], count: int) -> Dict[str, float]:
+    """Bytes retained by count items, total and excluding the article bodies"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        items = build_items(content_cls, attribution_cls, samples, count)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    bodies = sum(sys.getsizeof(item.content) for item in items)
+    return {
+        "total_bytes": total,
+        "bytes_per_item": total / count,
+        "overhead_per_item": (total - bodies) / count
+    }
+
+
+def run_benchmark(count: int = 1000) -> Dict[str, Any]:
+    samples = load_bodies()
+
+    with interning_disabled():
+        reference = measure(dict_backed(ScrapedContent), dict_backed(SourceAttribution), samples, count)
+    current = measure(ScrapedContent, SourceAttribution, samples, count)
+
+    return {
+        "items": count,
+        "dict_backed": reference,
+        "slotted_interned": current,
+        "overhead_saved_per_item": reference["overhead_per_item"] - current["overhead_per_item"],
+        "overhead_reduction": 1 - current["overhead_per_item"] / reference["overhead_per_item"]
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n🧠 Model memory for {report['items']} items")
+    print("=" * 50)
+    for name in ("dict_backed", "slotted_interned"):
+        result = report[name]
+        print(f"{name:18} {result['bytes_per_item']:10.0f} B/item  "
+              f"{result['overhead_per_item']:8.0f} B/item excluding bodies")
+    print(f"\nSaved {report['overhead_saved_per_item']:.0f} B/item "
+          f"({report['overhead_reduction']:.0%} of per-item overhead)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory held by ScrapedContent models")
+    parser.add_argument("--items", type=int, default=1000, help="Items per measurement")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.items)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
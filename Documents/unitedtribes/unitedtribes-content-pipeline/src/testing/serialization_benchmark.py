@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark
+Runs a full knowledge graph rebuild against an in-memory lake and compares
+the shared encoder (orjson when installed, compact output) with the
+previous stdlib json.dumps(indent=2) / json.loads, end to end and for the
+graph encode and document decode steps alone. With --compression the
+lake's documents are also stored compressed, as the uploader writes them
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any
+
+# Add shared modules and the builder to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+sys.path.append(str(Path(__file__).parent.parent))
+
+import serialization
+import knowledge_graph_builder
+from knowledge_graph_builder import EmergencyKnowledgeGraphRebuilder
+
+ARTISTS = [
+    'John Coltrane', 'Lee Morgan', 'Art Blakey', 'Horace Silver', 'Charlie Parker',
+    'Miles Davis', 'Bill Evans', 'Thelonious Monk', 'Duke Ellington', 'Dizzy Gillespie'
+]
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+VOCABULARY_WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+class InMemoryLake:
+    """The subset of the S3 client the knowledge graph builder uses"""
+
+    def __init__(self, objects: Dict[str, bytes]):
+        self.objects = objects
+
+    def get_paginator(self, operation: str):
+        return self
+
+    def paginate(self, Bucket: str, Prefix: str):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        for start in range(0, len(keys), 1000):
+            yield {'Contents': [{'Key': key} for key in keys[start:start + 1000]]}
+
+    def get_object(self, Bucket: str, Key: str):
+        return {'Body': io.BytesIO(self.objects[Key])}
+
+    def put_object(self, Bucket: str, Key: str, Body, **kwargs):
+        self.objects[Key] = Body if isinstance(Body, bytes) else Body.encode('utf-8')
+
+
+def build_lake(videos: int, articles: int, book_relationships: int, seed: int = 7) -> Dict[str, bytes]:
+    """Synthetic lake shaped like production: video analyses, scraped v3 documents, current graph"""
+    rng = random.Random(seed)
+    objects = {}
+
+    for i in range(videos):
+        artist = rng.choice(ARTISTS)
+        video = {
+            'source_info': {'artist': artist, 'title': f"{artist} documentary part {i}",
+                            'youtube_url': f"https://youtube.com/watch?v={i:011d}", 'source': 'YouTube'},
+            'entities': {'people': [{'name': f"Musician {rng.randrange(2000)}", 'confidence': rng.random()}
+                                    for _ in range(20)]}
+        }
+        objects[f"video_analysis/video_{i}.json"] = json.dumps(video, indent=2).encode('utf-8')
+
+    for i in range(articles):
+        mentioned = rng.sample(ARTISTS, 3)
+        # Zipf-distributed vocabulary, so bodies compress roughly like prose rather than repeated text
+        words = rng.choices(VOCABULARY, weights=VOCABULARY_WEIGHTS, k=1500)
+        body = ' '.join(f"{artist} recorded with the quintet that year." for artist in mentioned) + ' ' + ' '.join(words)
+        document = {
+            'id': f"01HX{i:022d}", 'url': f"https://www.npr.org/{i}", 'title': f"Jazz story {i}",
+            'content': body, 'content_type': 'article',
+            'source_attribution': {'source': 'NPR', 'title': f"Jazz story {i}", 'url': f"https://www.npr.org/{i}",
+                                   'author': 'Staff', 'publication_date': '2024-01-01'},
+            'metadata': {'word_count': len(body.split())}
+        }
+        objects[f"scraped-content/npr/article_{i}.json"] = json.dumps(document).encode('utf-8')
+
+    graph = {
+        'relationships': [
+            {'source_entity': rng.choice(ARTISTS), 'target_entity': f"Book {i}", 'relationship_type': 'written_about',
+             'confidence': 0.9, 'evidence': f"Chapter {i % 40} discusses the sessions in detail",
+             'metadata': {'themes': ['music', 'history'], 'source_file': f"books/book_{i % 300}.json"}}
+            for i in range(book_relationships)
+        ],
+        'metadata': {'source_files': []}
+    }
+    objects['enhanced-knowledge-graph/current/latest.json'] = json.dumps(graph, indent=2).encode('utf-8')
+    return objects
+
+
+def _legacy_encode(data: Any) -> bytes:
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+@contextmanager
+def legacy_serialization():
+    """Swap the builder back to stdlib json with indented output"""
+    original = knowledge_graph_builder.encode_json, knowledge_graph_builder.decode_json
+    knowledge_graph_builder.encode_json, knowledge_graph_builder.decode_json = _legacy_encode, json.loads
+    try:
+        yield
+    finally:
+        knowledge_graph_builder.encode_json, knowledge_graph_builder.decode_json = original
+
+
+def compress_lake(objects: Dict[str, bytes], codec: str) -> Dict[str, bytes]:
+    """Compressed copies of the lake's video and scraped documents, keyed with the codec suffix"""
+    return {
+        (key if key.startswith('enhanced-knowledge-graph/') else serialization.compressed_key(key, codec)):
+        (body if key.startswith('enhanced-knowledge-graph/') else serialization.compress(body, codec))
+        for key, body in objects.items()
+    }
+
+
+def time_build(objects: Dict[str, bytes], repeats: int) -> Dict[str, Any]:
+    """Best-of-repeats wall time of a full rebuild including scraped content"""
+    best = None
+    graph_bytes = 0
+    for _ in range(repeats):
+        lake = InMemoryLake(dict(objects))
+        builder = EmergencyKnowledgeGraphRebuilder(s3_client=lake)
+        start = time.perf_counter()
+        builder.rebuild_enhanced_knowledge_graph(include_scraped_content=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        graph_bytes = len(lake.objects['enhanced-knowledge-graph/current/latest.json'])
+    return {"seconds": best, "graph_bytes": graph_bytes}
+
+
+def time_steps(objects: Dict[str, bytes], repeats: int) -> Dict[str, Any]:
+    """Encode of the built graph and decode of every input document, old vs new"""
+    lake = InMemoryLake(dict(objects))
+    graph = EmergencyKnowledgeGraphRebuilder(s3_client=lake).rebuild_enhanced_knowledge_graph(True)
+    documents = list(objects.values())
+
+    def best(fn):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    return {
+        "encode_legacy_s": best(lambda: _legacy_encode(graph)),
+        "encode_compact_s": best(lambda: serialization.encode_json(graph)),
+        "encode_pretty_s": best(lambda: serialization.encode_json(graph, pretty=True)),
+        "decode_legacy_s": best(lambda: [json.loads(d) for d in documents]),
+        "decode_s": best(lambda: [serialization.decode_json(d) for d in documents]),
+    }
+
+
+def run_benchmark(videos: int, articles: int, book_relationships: int, repeats: int,
+                  compression: str = None) -> Dict[str, Any]:
+    objects = build_lake(videos, articles, book_relationships)
+
+    with legacy_serialization():
+        legacy = time_build(objects, repeats)
+    current = time_build(objects, repeats)
+
+    compressed = None
+    if compression:
+        documents = {key: body for key, body in objects.items() if not key.startswith('enhanced-knowledge-graph/')}
+        compressed_documents = compress_lake(documents, compression)
+        compressed = {
+            "codec": compression,
+            "document_bytes": sum(len(body) for body in documents.values()),
+            "compressed_bytes": sum(len(body) for body in compressed_documents.values()),
+            "build": time_build(compress_lake(objects, compression), repeats)
+        }
+
+    return {
+        "backend": "orjson" if serialization.orjson is not None else "json",
+        "lake": {"videos": videos, "articles": articles, "book_relationships": book_relationships,
+                 "input_bytes": sum(len(body) for body in objects.values())},
+        "build_legacy": legacy,
+        "build_current": current,
+        "build_speedup": legacy["seconds"] / current["seconds"],
+        "steps": time_steps(objects, repeats),
+        "compressed": compressed
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    lake = report["lake"]
+    steps = report["steps"]
+    print(f"\n🧾 Serialization benchmark ({report['backend']} backend)")
+    print("=" * 60)
+    print(f"Lake: {lake['videos']} videos, {lake['articles']} articles, "
+          f"{lake['book_relationships']} book relationships ({lake['input_bytes'] / 1e6:.1f} MB)")
+    print(f"Full KG build:  legacy {report['build_legacy']['seconds']:.2f}s  "
+          f"current {report['build_current']['seconds']:.2f}s  ({report['build_speedup']:.2f}x)")
+    print(f"Graph size:     legacy {report['build_legacy']['graph_bytes'] / 1e6:.1f} MB  "
+          f"current {report['build_current']['graph_bytes'] / 1e6:.1f} MB")
+    print(f"Graph encode:   legacy {steps['encode_legacy_s'] * 1000:.0f}ms  compact "
+          f"{steps['encode_compact_s'] * 1000:.0f}ms  pretty {steps['encode_pretty_s'] * 1000:.0f}ms")
+    print(f"Input decode:   legacy {steps['decode_legacy_s'] * 1000:.0f}ms  current {steps['decode_s'] * 1000:.0f}ms")
+
+    compressed = report["compressed"]
+    if compressed:
+        print(f"{compressed['codec']} documents: {compressed['document_bytes'] / 1e6:.1f} MB -> "
+              f"{compressed['compressed_bytes'] / 1e6:.1f} MB "
+              f"({1 - compressed['compressed_bytes'] / compressed['document_bytes']:.0%} smaller), "
+              f"full KG build {compressed['build']['seconds']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding on a full knowledge graph build")
+    parser.add_argument("--videos", type=int, default=500, help="Video analysis documents")
+    parser.add_argument("--articles", type=int, default=2000, help="Scraped v3 documents")
+    parser.add_argument("--book-relationships", type=int, default=50000, help="Relationships in the current graph")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed repeats, best is reported")
+    parser.add_argument("--compression", choices=sorted(serialization.COMPRESSION_SUFFIXES),
+                        help="Also build from a lake stored with this codec")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    # The builder logs every few documents
+    import logging
+    logging.getLogger(knowledge_graph_builder.__name__).setLevel(logging.WARNING)
+
+    report = run_benchmark(args.videos, args.articles, args.book_relationships, args.repeats, args.compression)
+    print_report(report)
+
+    if args.json:
+        serialization.write_json(args.json, report, pretty=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Upload benchmark
+Uploads a batch through S3ContentUploader.upload_batch into a local S3
+stand-in with simulated request latency and throttling, comparing
+one-at-a-time uploads with the concurrent upload engine
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+
+from botocore.exceptions import ClientError
+
+# Add shared modules to path
+sys.path.append(str(Path(__file__).parent.parent / "shared"))
+
+from models import ScrapedContent, SourceAttribution, ScrapingBatch, ContentType, Source
+from s3_uploader import S3ContentUploader
+
+ARTISTS = ['Miles Davis', 'John Coltrane', 'Nina Simone', 'Patti Smith', 'Kendrick Lamar']
+
+
+class LocalS3:
+    """
+    Thread-safe in-memory bucket with a fixed delay per request and random
+    SlowDown errors on puts; honours If-None-Match / If-Match like S3
+    """
+
+    def __init__(self, latency: float, throttle_rate: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.objects: Dict[str, bytes] = {}
+        self.metadata: Dict[str, Dict[str, str]] = {}
+        self.requests = 0
+        self.requests_by_operation: Dict[str, int] = {}
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self, operation: str):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            self.requests_by_operation[operation] = self.requests_by_operation.get(operation, 0) + 1
+            if operation == 'PutObject' and self._rng.random() < self.throttle_rate:
+                self.throttled += 1
+                raise ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Reduce your request rate'}}, operation)
+
+    def head_object(self, Bucket: str, Key: str):
+        self._request('HeadObject')
+        with self._lock:
+            if Key not in self.objects:
+                raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+            return {'ETag': _etag(self.objects[Key]), 'Metadata': self.metadata.get(Key, {})}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, IfNoneMatch: str = None, IfMatch: str = None,
+                   Metadata: Dict[str, str] = None, **kwargs):
+        self._request('PutObject')
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+        with self._lock:
+            exists = Key in self.objects
+            if (IfNoneMatch == '*' and exists) or (IfMatch and (not exists or _etag(self.objects[Key]) != IfMatch)):
+                raise ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': 'At least one of the '
+                                             'pre-conditions you specified did not hold'}}, 'PutObject')
+            self.objects[Key] = Body
+            self.metadata[Key] = Metadata or {}
+        return {'ETag': _etag(Body)}
+
+    def delete_objects(self, Bucket: str, Delete: Dict[str, Any]):
+        self._request('DeleteObjects')
+        with self._lock:
+            for obj in Delete['Objects']:
+                self.objects.pop(obj['Key'], None)
+                self.metadata.pop(obj['Key'], None)
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, IfNoneMatch: str = None):
+        self._request('GetObject')
+        with self._lock:
+            if Key not in self.objects:
+                raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'Not Found'}}, 'GetObject')
+            body = self.objects[Key]
+            metadata = self.metadata.get(Key, {})
+        if IfNoneMatch and IfNoneMatch == _etag(body):
+            raise ClientError({'Error': {'Code': '304', 'Message': 'Not Modified'}}, 'GetObject')
+        return {'Body': io.BytesIO(body), 'ETag': _etag(body), 'Metadata': metadata}
+
+    def get_paginator(self, operation: str):
+        return self
+
+    def paginate(self, Bucket: str, Prefix: str, StartAfter: str = ''):
+        self._request('ListObjectsV2')
+        with self._lock:
+            objects = sorted((key, len(body), _etag(body)) for key, body in self.objects.items()
+                             if key.startswith(Prefix) and key > StartAfter)
+        yield {'Contents': [{'Key': key, 'Size': size, 'ETag': etag} for key, size, etag in objects]}
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def build_batch(items: int, seed: int = 7) -> ScrapingBatch:
+    """Distinct articles, except every tenth repeats the one before it to exercise unique key allocation"""
+    rng = random.Random(seed)
+    scraped_at = datetime(2024, 1, 19, 6, 0)
+    contents = []
+    for i in range(items):
+        artist = ARTISTS[i % len(ARTISTS)]
+        if i % 10 == 9:
+            title, body = contents[-1].title, contents[-1].content
+        else:
+            title = f"{artist}: Interview {i}"
+            body = f"{artist} talks about the record. " + ' '.join(f"w{rng.randrange(100000)}" for _ in range(400))
+        contents.append(ScrapedContent(
+            url=f"https://www.npr.org/{i}",
+            title=title,
+            content=body,
+            content_type=ContentType.INTERVIEW,
+            source_attribution=SourceAttribution(source="NPR", title=title, url=f"https://www.npr.org/{i}"),
+            scraped_at=scraped_at
+        ))
+    return ScrapingBatch(source=Source.NPR, content_items=contents)
+
+
+def run_upload(concurrency: int, items: int, latency: float, throttle_rate: float,
+               existing: Dict[str, bytes] = None) -> Dict[str, Any]:
+    s3 = LocalS3(latency, throttle_rate)
+    s3.objects.update(existing or {})
+    uploader = S3ContentUploader(skip_near_duplicates=False, skip_known_content=False, write_parquet=False,
+                                 max_concurrency=concurrency, retry_backoff=0.01)
+    uploader.s3_client = s3
+    batch = build_batch(items)
+
+    start = time.perf_counter()
+    results = asyncio.run(uploader.upload_batch(batch))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "items_per_second": items / elapsed,
+        "successful_uploads": results["successful_uploads"],
+        "failed_uploads": results["failed_uploads"],
+        "requests": s3.requests,
+        "requests_by_operation": s3.requests_by_operation,
+        "throttled": s3.throttled,
+        "objects": len(s3.objects),
+        "uploaded_keys": sorted(results["uploaded_keys"])
+    }
+
+
+def run_benchmark(items: int, concurrency: List[int], latency: float, throttle_rate: float) -> Dict[str, Any]:
+    # A re-run of the same batch, so every key collides with one already in the bucket
+    first_run = S3ContentUploader(skip_near_duplicates=False, skip_known_content=False, write_parquet=False)
+    first_run.s3_client = LocalS3(0.0)
+    asyncio.run(first_run.upload_batch(build_batch(items)))
+    existing = first_run.s3_client.objects
+
+    runs = [run_upload(level, items, latency, throttle_rate, existing) for level in concurrency]
+    serial_keys = runs[0]["uploaded_keys"]
+    for run in runs:
+        run["speedup"] = runs[0]["seconds"] / run["seconds"]
+        # Which of two colliding items gets the suffix may differ, the set of keys may not
+        run["same_keys_as_first"] = run.pop("uploaded_keys") == serial_keys
+    return {"items": items, "latency_ms": latency * 1000, "throttle_rate": throttle_rate, "runs": runs}
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n📤 Upload benchmark: {report['items']} items, {report['latency_ms']:.0f}ms per request, "
+          f"{report['throttle_rate']:.0%} puts throttled")
+    print("=" * 70)
+    for run in report["runs"]:
+        print(f"concurrency {run['concurrency']:3}  {run['seconds']:6.2f}s  {run['items_per_second']:7.1f} items/s  "
+              f"{run['speedup']:5.1f}x  uploaded {run['successful_uploads']}/{report['items']}  "
+              f"{run['requests']} requests  retried {run['throttled']}  keys match: {run['same_keys_as_first']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent S3 uploads against a local stand-in")
+    parser.add_argument("--items", type=int, default=100, help="Items in the batch")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32], help="Upload threads to compare")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated latency per request")
+    parser.add_argument("--throttle-rate", type=float, default=0.02, help="Fraction of puts answered with SlowDown")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.items, args.concurrency, args.latency_ms / 1000, args.throttle_rate)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())